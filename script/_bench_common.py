@@ -0,0 +1,24 @@
+"""Helpers shared by the benchmarks.
+
+The benchmarks build their devices from the quirk signatures with
+`device_from_quirk` from `tests/conftest.py`, which the
+`zigpy_device_from_quirk` fixture wraps, on the controller of `mock_app`.
+"""
+import timeit
+from typing import Any, Callable
+
+from tests.conftest import MockApp
+
+
+def mock_app() -> MockApp:
+    """Create the controller the benchmark devices are added to."""
+
+    config = MockApp.SCHEMA({"device": {"path": "/dev/null"}, "database": None})
+    return MockApp(config)
+
+
+def best_time(func: Callable[[], Any], number: int = 1, repeat: int = 5) -> float:
+    """Best time in seconds to call the function once."""
+
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
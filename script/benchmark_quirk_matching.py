@@ -0,0 +1,89 @@
+"""Benchmark finding the quirk of a device with the signature index.
+
+Run from the repository root:
+
+    python -m script.benchmark_quirk_matching [--repeat 5]
+
+For every class in `ALL_QUIRK_CLASSES` from `tests/test_quirks.py` a device
+matching its signature is created. The quirk of each device is looked up with
+zigpy's registry, which compares the device with every candidate quirk and
+applies the one matching, and with the `SignatureIndex`. The time to build
+the index, the best time per device for both lookups and the time to apply
+the quirks are printed, as well as devices for which both lookups disagree.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import zigpy.device
+import zigpy.quirks
+import zigpy.types
+
+from script._bench_common import best_time, mock_app
+from zhaquirks.registry import SignatureIndex
+
+from tests.conftest import device_from_quirk
+from tests.test_quirks import ALL_QUIRK_CLASSES
+
+
+async def run(repeat: int) -> int:
+    """Run the benchmark, return the number of mismatching devices."""
+
+    app = mock_app()
+    devices = [
+        device_from_quirk(
+            app,
+            quirk,
+            zigpy.types.EUI64(num.to_bytes(8, "little")),
+            apply_quirk=False,
+        )
+        for num, quirk in enumerate(ALL_QUIRK_CLASSES)
+    ]
+    registry = zigpy.quirks._DEVICE_REGISTRY
+
+    start = time.perf_counter()
+    index = SignatureIndex()
+    build = time.perf_counter() - start
+
+    mismatches = 0
+    for device in devices:
+        quirk = type(registry.get_device(device))
+        if index.get_quirk(device) is not quirk:
+            mismatches += 1
+            print(f"Mismatch for {device.manufacturer} {device.model}: {quirk}")
+
+    def applied_quirk(device):
+        return index.get_quirk(device)(app, device.ieee, device.nwk, device)
+
+    count = len(devices)
+    print(f"{count} devices, {index.quirks} quirks, {len(index)} index keys")
+    print(f"{'build index':<25} {build * 1000:>9.2f} ms")
+    for name, func in (
+        ("zigpy get_device", registry.get_device),
+        ("index get_quirk", index.get_quirk),
+        ("index and apply quirk", applied_quirk),
+    ):
+        seconds = best_time(lambda: [func(device) for device in devices], 1, repeat)
+        print(
+            f"{name:<25} {seconds * 1000:>9.2f} ms {seconds / count * 1e6:>9.1f} us/device"
+        )
+
+    # let the tasks created by the quirks run before the loop goes away
+    await asyncio.sleep(0)
+    return mismatches
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per lookup")
+    args = parser.parse_args()
+
+    mismatches = asyncio.run(run(args.repeat))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Replay recorded ZCL traffic through quirks and measure the frame throughput.
+
+Run from the repository root:
+
+    python -m script.benchmark_replay [--rounds 200] [--instrument] [captures ...]
+
+A capture file names the quirk the frames were recorded from and lists one
+frame per line as the source endpoint, the cluster id and the ZCL payload in
+hex, optionally followed by a comment::
+
+    # comment
+    quirk zhaquirks.tuya.ts0601_trv.MoesHY368_Type1
+    1 0xEF00 097002000203020004000000b3  # temperature
+
+The quirk is applied to a device built from its signature on the `MockApp`
+controller of `tests/conftest.py`, like the `zigpy_device_from_quirk` fixture
+does, and every frame is handed to `Device.handle_message`, which runs the
+whole deserialize, cluster handler, attribute update and bus path. Frames are
+replayed back to back for a number of rounds and the throughput, latency
+percentiles and memory allocated per frame are printed per capture. Tasks
+created by the quirks, e.g. to send default responses, run between rounds and
+are not part of the latency. Every frame is handled once before the timed
+rounds, and a capture fails when a frame can't be parsed or when handling it
+logs a warning or an error, so only the normal path of the quirks is timed. All captures in `script/captures` are replayed
+when none are given. With `--instrument` the cluster methods are measured with
+`zhaquirks.instrumentation` during an extra round and the most expensive ones
+are printed per capture.
+"""
+import argparse
+import asyncio
+import dataclasses
+import importlib
+import logging
+import pathlib
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import List, Tuple
+
+import zigpy.device
+import zigpy.types
+from zigpy.zcl import foundation
+
+from script._bench_common import mock_app
+from zhaquirks import instrumentation
+
+from tests.conftest import MockApp, device_from_quirk
+
+CAPTURES_PATH = pathlib.Path(__file__).parent / "captures"
+
+
+@dataclasses.dataclass
+class Capture:
+    """Frames recorded from a device."""
+
+    name: str
+    quirk: type
+    # source endpoint, cluster id, ZCL payload
+    frames: List[Tuple[int, int, bytes]]
+
+
+class NullDatabaseListener:
+    """Database listener persisting nothing."""
+
+    def attribute_updated(self, cluster, attrid, value):
+        """Attribute updated."""
+
+
+def load_capture(path: pathlib.Path) -> Capture:
+    """Load a capture file."""
+
+    quirk = None
+    frames = []
+    for num, line in enumerate(path.read_text().splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        fields = line.split()
+        if fields[0] == "quirk" and len(fields) == 2:
+            modname, _, clsname = fields[1].rpartition(".")
+            quirk = getattr(importlib.import_module(modname), clsname)
+        elif len(fields) == 3:
+            frames.append(
+                (int(fields[0], 0), int(fields[1], 0), bytes.fromhex(fields[2]))
+            )
+        else:
+            raise ValueError(f"{path}:{num}: can't parse {line!r}")
+
+    if quirk is None:
+        raise ValueError(f"{path}: no quirk given")
+    return Capture(path.stem, quirk, frames)
+
+
+class LoggedErrors(logging.Handler):
+    """Count the warnings and errors logged.
+
+    zigpy logs the exceptions raised by the listeners of a bus as warnings.
+    """
+
+    def __init__(self):
+        """Init."""
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Count a record."""
+        self.count += 1
+
+
+def check_frames(
+    device: zigpy.device.Device, capture: Capture, errors: LoggedErrors
+) -> int:
+    """Print the frames the device can't parse or handle, return their number."""
+
+    failed = 0
+    for src_ep, cluster_id, payload in capture.frames:
+        try:
+            device.deserialize(src_ep, cluster_id, payload)
+        except (KeyError, ValueError) as exc:
+            failed += 1
+            print(f"{capture.name}: can't parse {payload.hex()}: {exc!r}")
+            continue
+
+        logged = errors.count
+        profile_id = device.endpoints[src_ep].profile_id
+        device.handle_message(profile_id, cluster_id, src_ep, src_ep, payload)
+        if errors.count > logged:
+            failed += 1
+            print(
+                f"{capture.name}: {errors.count - logged} errors logged"
+                f" handling {payload.hex()}"
+            )
+    return failed
+
+
+async def replay(
+    app: MockApp, capture: Capture, rounds: int
+) -> Tuple[List[int], float, float]:
+    """Replay the capture, return latencies in ns and memory per frame."""
+
+    errors = LoggedErrors()
+    logging.getLogger().addHandler(errors)
+    try:
+        return await _replay(app, capture, rounds, errors)
+    finally:
+        logging.getLogger().removeHandler(errors)
+
+
+async def _replay(
+    app: MockApp, capture: Capture, rounds: int, errors: LoggedErrors
+) -> Tuple[List[int], float, float]:
+    device = device_from_quirk(app, capture.quirk, app.ieee)
+    # let the tasks created when applying the quirk run
+    await asyncio.sleep(0)
+    if check_frames(device, capture, errors):
+        return [], 0, 0
+    frames = [
+        (device.endpoints[src_ep].profile_id, cluster_id, src_ep, payload)
+        for src_ep, cluster_id, payload in capture.frames
+    ]
+    await asyncio.sleep(0)
+
+    latencies = []
+    for _ in range(rounds):
+        for profile_id, cluster_id, src_ep, payload in frames:
+            start = time.perf_counter_ns()
+            device.handle_message(profile_id, cluster_id, src_ep, src_ep, payload)
+            latencies.append(time.perf_counter_ns() - start)
+        await asyncio.sleep(0)
+
+    # allocations are traced in a separate round, it slows down the replay
+    peak = retained = 0
+    tracemalloc.start()
+    for profile_id, cluster_id, src_ep, payload in frames:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        device.handle_message(profile_id, cluster_id, src_ep, src_ep, payload)
+        now, frame_peak = tracemalloc.get_traced_memory()
+        peak += frame_peak - current
+        retained += now - current
+    tracemalloc.stop()
+    await asyncio.sleep(0)
+
+    if errors.count:
+        print(f"{capture.name}: {errors.count} errors logged during the replay")
+        return [], 0, 0
+    return latencies, peak / len(frames), retained / len(frames)
+
+
+async def instrumented_replay(app: MockApp, capture: Capture, top: int) -> None:
+    """Replay the capture once with instrumentation, print the slowest methods."""
+
+    device = device_from_quirk(app, capture.quirk, app.ieee)
+    await asyncio.sleep(0)
+
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        for src_ep, cluster_id, payload in capture.frames:
+            profile_id = device.endpoints[src_ep].profile_id
+            device.handle_message(profile_id, cluster_id, src_ep, src_ep, payload)
+        await asyncio.sleep(0)
+    finally:
+        instrumentation.disable()
+
+    stats = sorted(
+        instrumentation.get_stats(device.ieee).items(),
+        key=lambda item: -item[1].total_ns,
+    )
+    for (_, endpoint_id, cluster_id, method), method_stats in stats[:top]:
+        print(
+            f"{'':<22} {endpoint_id}/0x{cluster_id:04x} {method:<24}"
+            f" {method_stats.count:>6} calls {method_stats.mean_us:>8.1f} us"
+            f" {method_stats.max_ns / 1000:>8.1f} us max"
+        )
+
+
+def percentile(latencies: List[int], pct: float) -> float:
+    """Latency percentile in microseconds."""
+    return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))] / 1000
+
+
+async def run(paths: List[pathlib.Path], rounds: int, instrument: bool) -> int:
+    """Replay all captures, return the number of captures which failed."""
+
+    app = mock_app()
+
+    async def success(*args, **kwargs):
+        return foundation.Status.SUCCESS, None
+
+    # don't record every request sent by the quirks
+    app.request = success
+    # clusters of the devices listen to the database listener, which doesn't
+    # exist without a database and would log an error for every update
+    app._dblistener = NullDatabaseListener()
+
+    print(
+        f"{'capture':<22} {'frames':>6} {'frames/s':>10} {'p50 us':>8} {'p90 us':>8}"
+        f" {'p99 us':>8} {'max us':>8} {'peak B':>8} {'kept B':>8}"
+    )
+    failed = 0
+    for path in paths:
+        capture = load_capture(path)
+        latencies, peak, retained = await replay(app, capture, rounds)
+        if not latencies:
+            failed += 1
+            continue
+        throughput = len(latencies) / (sum(latencies) / 1e9)
+        latencies.sort()
+        print(
+            f"{capture.name:<22} {len(capture.frames):>6} {throughput:>10.0f}"
+            f" {percentile(latencies, 50):>8.1f} {percentile(latencies, 90):>8.1f}"
+            f" {percentile(latencies, 99):>8.1f} {latencies[-1] / 1000:>8.1f}"
+            f" {peak:>8.0f} {retained:>8.0f}"
+        )
+        print(
+            f"{'':<22} mean {statistics.mean(latencies) / 1000:.1f} us per frame,"
+            f" {rounds} rounds"
+        )
+        if instrument:
+            await instrumented_replay(app, capture, top=5)
+
+    return failed
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200, help="replays per capture")
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="print the most expensive cluster methods of each capture",
+    )
+    parser.add_argument(
+        "captures",
+        nargs="*",
+        type=pathlib.Path,
+        help="capture files, all captures in script/captures by default",
+    )
+    args = parser.parse_args()
+
+    paths = args.captures or sorted(CAPTURES_PATH.glob("*.replay"))
+    failed = asyncio.run(run(paths, args.rounds, args.instrument))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""Benchmark the import cost of the quirk modules loaded by `zhaquirks.setup()`.
+
+Run from the repository root, in a fresh interpreter:
+
+    python -m script.benchmark_setup [--top 20] [--devices] [--max-total-ms 2000]
+
+Every quirk module is imported in the same order as `zhaquirks.setup()` does,
+recording the import time, the allocated memory and what the module builds at
+module level: zigpy cluster subclasses, quirk classes, enums and dicts. Results
+are summed per vendor package and the most expensive modules are listed.
+
+With `--devices` every registered quirk is also instantiated against the
+`MockApp` controller from `tests/conftest.py`. The exit code is 1 when one of
+the `--max-*` budgets is exceeded, so the script can guard against regressions.
+"""
+import argparse
+import asyncio
+import collections
+import dataclasses
+import enum
+import importlib
+import inspect
+import pkgutil
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Set
+
+import zigpy.device
+import zigpy.quirks
+import zigpy.types
+from zigpy.zcl import Cluster
+
+from script._bench_common import mock_app
+import zhaquirks
+from zhaquirks.const import LAZY_QUIRKS_LOADING
+
+from tests.conftest import device_from_quirk
+
+PACKAGE = zhaquirks.__name__
+
+
+@dataclasses.dataclass
+class ImportStats:
+    """Cost of importing a single module, or a sum of them."""
+
+    name: str
+    modules: int = 0
+    seconds: float = 0
+    memory: int = 0
+    clusters: int = 0
+    quirks: int = 0
+    enums: int = 0
+    dicts: int = 0
+    dict_items: int = 0
+
+    def add(self, other: "ImportStats") -> None:
+        """Add the cost of another import to this one."""
+        for field in dataclasses.fields(self):
+            if field.name != "name":
+                setattr(
+                    self,
+                    field.name,
+                    getattr(self, field.name) + getattr(other, field.name),
+                )
+
+
+def module_contents(stats: ImportStats, module, seen: Set[int]) -> None:
+    """Count what a module builds at module level, skipping objects seen before."""
+
+    for name, obj in vars(module).items():
+        if name.startswith("__") or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, dict):
+            stats.dicts += 1
+            stats.dict_items += len(obj)
+        elif not inspect.isclass(obj):
+            continue
+        # zigpy enums don't know the module they are defined in
+        elif not obj.__module__.startswith(PACKAGE) and obj.__module__ != "<unknown>":
+            continue
+        elif issubclass(obj, Cluster):
+            stats.clusters += 1
+        elif issubclass(obj, zigpy.quirks.CustomDevice):
+            stats.quirks += 1
+        elif issubclass(obj, enum.Enum):
+            stats.enums += 1
+
+
+def import_quirk_modules(trace_memory: bool) -> List[ImportStats]:
+    """Import all quirk modules the way `zhaquirks.setup()` does."""
+
+    results = []
+    seen: Set[int] = set()
+    for _, modname, _ in pkgutil.walk_packages(
+        path=zhaquirks.__path__, prefix=PACKAGE + "."
+    ):
+        stats = ImportStats(modname, modules=1)
+        results.append(stats)
+        if modname in sys.modules:
+            # imported by a previous module, its import cost is accounted there
+            module_contents(stats, sys.modules[modname], seen)
+            continue
+
+        memory = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+        start = time.perf_counter()
+        module = importlib.import_module(modname)
+        stats.seconds = time.perf_counter() - start
+        if trace_memory:
+            stats.memory = tracemalloc.get_traced_memory()[0] - memory
+
+        module_contents(stats, module, seen)
+
+    return results
+
+
+def per_vendor(results: List[ImportStats]) -> Dict[str, ImportStats]:
+    """Sum the import cost per vendor package."""
+
+    vendors: Dict[str, ImportStats] = collections.OrderedDict()
+    for stats in results:
+        vendor = stats.name.split(".")[1]
+        vendors.setdefault(vendor, ImportStats(vendor)).add(stats)
+    return vendors
+
+
+async def instantiate_quirks() -> Dict[str, ImportStats]:
+    """Time the creation of every registered quirk device per vendor."""
+
+    app = mock_app()
+
+    quirks = {
+        quirk
+        for models in zigpy.quirks._DEVICE_REGISTRY.registry.values()
+        for quirk_list in models.values()
+        for quirk in quirk_list
+    }
+
+    vendors: Dict[str, ImportStats] = {}
+    for num, quirk in enumerate(sorted(quirks, key=lambda q: q.__module__)):
+        vendor = quirk.__module__.split(".")[1]
+        ieee = zigpy.types.EUI64(num.to_bytes(8, "little"))
+        stats = vendors.setdefault(vendor, ImportStats(vendor))
+        start = time.perf_counter()
+        try:
+            device_from_quirk(app, quirk, ieee)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Failed to instantiate {quirk}: {exc!r}", file=sys.stderr)
+            continue
+        stats.seconds += time.perf_counter() - start
+        stats.quirks += 1
+
+    # let the tasks created by the quirks run before the loop goes away
+    await asyncio.sleep(0)
+    return vendors
+
+
+def print_table(title: str, rows: List[ImportStats]) -> None:
+    """Print import statistics as a table."""
+
+    print(f"\n{title}")
+    print(
+        f"{'name':<45} {'mods':>5} {'ms':>8} {'KiB':>8} "
+        f"{'clust':>6} {'quirk':>6} {'enum':>5} {'dicts':>6} {'items':>6}"
+    )
+    for row in rows:
+        print(
+            f"{row.name:<45} {row.modules:>5} {row.seconds * 1000:>8.2f} "
+            f"{row.memory / 1024:>8.1f} {row.clusters:>6} {row.quirks:>6} "
+            f"{row.enums:>5} {row.dicts:>6} {row.dict_items:>6}"
+        )
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="modules to list")
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="don't trace memory allocations, which slows down imports",
+    )
+    parser.add_argument(
+        "--devices", action="store_true", help="also instantiate every quirk"
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="only time zhaquirks.setup() with lazy quirk loading",
+    )
+    parser.add_argument("--max-total-ms", type=float, help="total import budget")
+    parser.add_argument("--max-module-ms", type=float, help="per module budget")
+    parser.add_argument("--max-total-kib", type=float, help="total memory budget")
+    args = parser.parse_args()
+
+    if args.lazy:
+        start = time.perf_counter()
+        zhaquirks.setup({LAZY_QUIRKS_LOADING: True})
+        seconds = time.perf_counter() - start
+        print(f"Lazy zhaquirks.setup(): {seconds * 1000:.2f} ms")
+        return 0
+
+    if not args.no_memory:
+        tracemalloc.start()
+    results = import_quirk_modules(trace_memory=not args.no_memory)
+    tracemalloc.stop()
+
+    vendors = per_vendor(results)
+    total = ImportStats("total")
+    for stats in vendors.values():
+        total.add(stats)
+
+    print_table(
+        "Per vendor package",
+        sorted(vendors.values(), key=lambda s: s.seconds, reverse=True) + [total],
+    )
+    print_table(
+        f"Top {args.top} modules",
+        sorted(results, key=lambda s: s.seconds, reverse=True)[: args.top],
+    )
+
+    if args.devices:
+        devices = asyncio.run(instantiate_quirks())
+        print("\nQuirk instantiation per vendor package")
+        for stats in sorted(devices.values(), key=lambda s: s.seconds, reverse=True):
+            print(
+                f"{stats.name:<45} {stats.quirks:>5} quirks "
+                f"{stats.seconds * 1000:>8.2f} ms"
+            )
+
+    failures = []
+    if args.max_total_ms is not None and total.seconds * 1000 > args.max_total_ms:
+        failures.append(
+            f"total import time {total.seconds * 1000:.2f} ms"
+            f" exceeds {args.max_total_ms} ms"
+        )
+    if args.max_module_ms is not None:
+        failures.extend(
+            f"{stats.name} import time {stats.seconds * 1000:.2f} ms"
+            f" exceeds {args.max_module_ms} ms"
+            for stats in results
+            if stats.seconds * 1000 > args.max_module_ms
+        )
+    if args.max_total_kib is not None and total.memory / 1024 > args.max_total_kib:
+        failures.append(
+            f"total import memory {total.memory / 1024:.1f} KiB"
+            f" exceeds {args.max_total_kib} KiB"
+        )
+
+    for failure in failures:
+        print(f"Budget exceeded: {failure}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Benchmark the shared timer wheel against per-event `call_later` timers.
+
+Run from the repository root:
+
+    python -m script.benchmark_timers [--sensors 500] [--events 20]
+
+Every simulated motion sensor restarts its reset timer on each motion event,
+like the self resetting motion and occupancy clusters do. The time taken to
+restart all timers and the size of the scheduler heap of the event loop are
+printed for the `TimerWheel` and for a `call_later` timer per sensor.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict
+
+from zhaquirks import TimerWheel
+
+
+def reset() -> None:
+    """Reset a sensor, the timers never fire during the benchmark."""
+
+
+async def call_later_timers(sensors: int, events: int, reset_s: float) -> float:
+    """Restart the timers with `call_later`, cancelling the previous handle."""
+
+    loop = asyncio.get_running_loop()
+    handles: Dict[int, asyncio.TimerHandle] = {}
+    order = [random.randrange(sensors) for _ in range(sensors * events)]
+
+    start = time.perf_counter()
+    for sensor in order:
+        handle = handles.get(sensor)
+        if handle is not None:
+            handle.cancel()
+        handles[sensor] = loop.call_later(reset_s, reset)
+    seconds = time.perf_counter() - start
+
+    print_heap("call_later", seconds, len(order))
+    for handle in handles.values():
+        handle.cancel()
+    return seconds
+
+
+async def timer_wheel_timers(sensors: int, events: int, reset_s: float) -> float:
+    """Restart the timers in a timer wheel."""
+
+    wheel = TimerWheel()
+    order = [random.randrange(sensors) for _ in range(sensors * events)]
+
+    start = time.perf_counter()
+    for sensor in order:
+        wheel.schedule(sensor, reset_s, reset)
+    seconds = time.perf_counter() - start
+
+    print_heap("timer wheel", seconds, len(order))
+    for sensor in range(sensors):
+        wheel.cancel(sensor)
+    return seconds
+
+
+def print_heap(name: str, seconds: float, events: int) -> None:
+    """Print the time per event and the size of the scheduler heap."""
+
+    loop = asyncio.get_running_loop()
+    heap = len(getattr(loop, "_scheduled", ()))
+    print(
+        f"{name:<12} {seconds * 1000:>9.2f} ms {seconds / events * 1e9:>9.0f} ns/event"
+        f" {heap:>9} scheduled callbacks"
+    )
+
+
+async def run(sensors: int, events: int, reset_s: float) -> None:
+    """Run both benchmarks."""
+
+    await call_later_timers(sensors, events, reset_s)
+    # let the loop drop the cancelled handles
+    await asyncio.sleep(0)
+    await timer_wheel_timers(sensors, events, reset_s)
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensors", type=int, default=500, help="motion sensors")
+    parser.add_argument("--events", type=int, default=20, help="events per sensor")
+    parser.add_argument("--reset-s", type=float, default=120, help="reset delay")
+    args = parser.parse_args()
+
+    random.seed(0)
+    asyncio.run(run(args.sensors, args.events, args.reset_s))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Benchmark the declared Tuya data point converters against lambdas.
+
+Run from the repository root:
+
+    python -m script.benchmark_tuya_converters [--number 200000] [--tolerance 0.2]
+
+Every converter is applied the way `DPToAttributeMapping` does, through the
+function built when the converter is created, and compared with the lambda it
+replaces in the quirks, defined in a namespace of its own like in a quirk
+module. The best time per conversion is printed, and the exit code is 1 when a
+converter is slower than its lambda by more than the tolerance.
+"""
+import argparse
+import sys
+from typing import Any, Tuple
+
+from script._bench_common import best_time
+from zhaquirks.tuya import LinearConverter
+
+# name, converter, lambda it replaces, reported value
+CONVERSIONS: Tuple[Tuple[str, LinearConverter, str, Any], ...] = (
+    (
+        "level",
+        LinearConverter(255, 1000, integer=True),
+        "lambda x: (x * 255) // 1000",
+        553,
+    ),
+    (
+        "level write",
+        LinearConverter(1000, 255, integer=True),
+        "lambda x: (x * 1000) // 255",
+        141,
+    ),
+    ("decidegree", LinearConverter(10), "lambda x: x * 10", 215),
+    ("distance", LinearConverter(1, 100), "lambda x: x / 100", 161),
+    (
+        "clamped",
+        LinearConverter(2, offset=-10, minimum=0, maximum=100),
+        "lambda x: min(max(x * 2 - 10, 0), 100)",
+        40,
+    ),
+)
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--number", type=int, default=200000, help="conversions per run"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per converter")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="slowdown allowed against the lambda, 0.2 is 20%%",
+    )
+    args = parser.parse_args()
+
+    print(f"{'conversion':<12} {'lambda ns':>10} {'converter ns':>13} {'ratio':>7}")
+    slower = 0
+    for name, converter, source, value in CONVERSIONS:
+        # defined in a module of its own, like the lambdas of the quirks
+        func = eval(source, {})
+        if converter.convert(value) != func(value):
+            print(f"{name}: {converter.convert(value)} != {func(value)}")
+            slower += 1
+            continue
+        convert = converter.convert
+        # runs alternate, in both orders, so both functions see the same load
+        times = {func: float("inf"), convert: float("inf")}
+        for run in range(args.repeat * 2):
+            for timed in (func, convert) if run % 2 else (convert, func):
+                times[timed] = min(
+                    times[timed], best_time(lambda: timed(value), args.number, 1)
+                )
+        lambda_s, converter_s = times[func], times[convert]
+        ratio = converter_s / lambda_s
+        print(
+            f"{name:<12} {lambda_s * 1e9:>10.1f} {converter_s * 1e9:>13.1f}"
+            f" {ratio:>7.2f}"
+        )
+        if ratio > 1 + args.tolerance:
+            slower += 1
+
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Benchmark the encoding of the Tuya datapoints sent by the MCU clusters.
+
+Run from the repository root:
+
+    python -m script.benchmark_tuya_encode [--number 20000] [--repeat 5]
+
+Every datapoint value is encoded to a set_data `TuyaCommand` with
+`encode_tuya_command`, and the way `TuyaMCUCluster.from_cluster_data` did
+before: through `Data.from_value`, which serializes the value in little endian
+and reverses it, and `t.LVBytes.deserialize` to get the bytes back. The best
+time per command and the allocated memory are printed for each datapoint type,
+the benchmark exits with an error if both commands don't serialize the same.
+"""
+import argparse
+import sys
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import zigpy.types as t
+
+from script._bench_common import best_time
+from zhaquirks.tuya import Data, TuyaCommand, TuyaData
+from zhaquirks.tuya.mcu import TuyaDPType, encode_tuya_command
+
+# datapoint type, value written by the quirks
+DATAPOINTS: Tuple[Tuple[TuyaDPType, Any], ...] = (
+    (TuyaDPType.BOOL, True),
+    (TuyaDPType.VALUE, 882),
+    (TuyaDPType.ENUM, 2),
+    (TuyaDPType.BITMAP, t.bitmap16(0x0102)),
+)
+
+
+def legacy_command(tsn: int, dp: int, dp_type: TuyaDPType, value: Any) -> TuyaCommand:
+    """Encode the command through a little endian round trip."""
+
+    tuya_data = TuyaData()
+    tuya_data.dp_type = dp_type
+    tuya_data.function = 0
+    if dp_type.ztype:
+        value = dp_type.ztype(value)
+    tuya_data.raw = t.LVBytes.deserialize(Data.from_value(value))[0]
+
+    cmd_payload = TuyaCommand()
+    cmd_payload.status = 0
+    cmd_payload.tsn = tsn
+    cmd_payload.dp = dp
+    cmd_payload.data = tuya_data
+    return cmd_payload
+
+
+def allocated(encode: Callable, dp_type: TuyaDPType, value: Any) -> int:
+    """Peak memory in bytes allocated to encode the value once."""
+
+    encode(0x42, 2, dp_type, value)
+    tracemalloc.start()
+    encode(0x42, 2, dp_type, value)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="commands per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per datapoint")
+    args = parser.parse_args()
+
+    print(
+        f"{'datapoint':<10} {'legacy us':>10} {'direct us':>10} {'speedup':>8}"
+        f" {'legacy B':>9} {'direct B':>9}"
+    )
+    mismatches = 0
+    for dp_type, value in DATAPOINTS:
+        direct = encode_tuya_command(0x42, 2, dp_type, value).serialize()
+        if direct != legacy_command(0x42, 2, dp_type, value).serialize():
+            mismatches += 1
+            print(f"{dp_type.name}: {direct.hex()} differs from the legacy encoding")
+            continue
+
+        legacy_s = best_time(
+            lambda: legacy_command(0x42, 2, dp_type, value), args.number, args.repeat
+        )
+        direct_s = best_time(
+            lambda: encode_tuya_command(0x42, 2, dp_type, value),
+            args.number,
+            args.repeat,
+        )
+        print(
+            f"{dp_type.name:<10} {legacy_s * 1e6:>10.2f} {direct_s * 1e6:>10.2f}"
+            f" {legacy_s / direct_s:>7.1f}x"
+            f" {allocated(legacy_command, dp_type, value):>9}"
+            f" {allocated(encode_tuya_command, dp_type, value):>9}"
+        )
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
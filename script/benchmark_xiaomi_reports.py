@@ -0,0 +1,87 @@
+"""Benchmark the parsing of recorded Xiaomi attribute reports.
+
+Run from the repository root:
+
+    python -m script.benchmark_xiaomi_reports [--number 2000] [--repeat 5]
+
+Every recorded report is deserialized by the Xiaomi `BasicCluster`, which
+repairs the wrong string lengths of the 0xFF01 and 0xFF02 attributes. The
+best time per frame is printed for each report, for reports chaining several
+Xiaomi attributes and for the whole set.
+"""
+import argparse
+import sys
+from typing import Dict
+from unittest import mock
+
+import zigpy.zcl.foundation as foundation
+
+from script._bench_common import best_time
+from zhaquirks.xiaomi import BasicCluster
+
+# attribute reports recorded from Xiaomi devices, see tests/test_xiaomi.py
+RECORDED_REPORTS: Dict[str, str] = {
+    "weather, wrong length": (
+        "01FF42220121D10B0328190421A81305212D0006240200000000082104020A21A4B4641000"
+    ),
+    "motion, model and attributes": (
+        "050042166C756D692E73656E736F725F6D6F74696F6E2E61713201FF42210121950B032816"
+        "0421A83105214400062401000000000A217CBE6410000B210900"
+    ),
+    "mija 0xFF02": "02FF4C0600100121BA0B21A813240100000000215D062058",
+    "plug, long report": (
+        "01FF424403282305212E0008212E12092100106410006510006E20006F200094200295390A"
+        "078C41963999EB0C4597390030683B983980BB873C9B2100009C20010A2100000C280000"
+    ),
+    "short report": "01FF42090421A8130A212759",
+}
+
+
+def report_frame(raw_report: bytes) -> bytes:
+    """Prepend a manufacturer specific attribute report header."""
+
+    hdr = foundation.ZCLHeader.general(
+        manufacturer=0x115F,
+        tsn=127,
+        command_id=foundation.GeneralCommand.Report_Attributes,
+    )
+    return hdr.serialize() + raw_report
+
+
+def main() -> int:
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="frames per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per frame")
+    parser.add_argument(
+        "--chain", type=int, default=8, help="most Xiaomi attributes in one report"
+    )
+    args = parser.parse_args()
+
+    cluster = BasicCluster(mock.MagicMock())
+    frames = {
+        name: report_frame(bytes.fromhex(raw_report))
+        for name, raw_report in RECORDED_REPORTS.items()
+    }
+
+    # reports chaining several Xiaomi attributes, each with a wrong length
+    broken = bytes.fromhex(RECORDED_REPORTS["weather, wrong length"])
+    for count in range(2, args.chain + 1, 2):
+        frames[f"{count} Xiaomi attributes"] = report_frame(broken * count)
+
+    print(f"{'report':<35} {'bytes':>6} {'us/frame':>10}")
+    total = 0.0
+    for name, frame in frames.items():
+        seconds = best_time(
+            lambda: cluster.deserialize(frame), args.number, args.repeat
+        )
+        total += seconds
+        print(f"{name:<35} {len(frame):>6} {seconds * 1e6:>10.1f}")
+    print(f"{'total':<35} {'':>6} {total * 1e6:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
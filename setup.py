@@ -19,6 +19,7 @@ setup(
     license="Apache License Version 2.0",
     keywords="zha quirks homeassistant hass",
     packages=find_packages(exclude=["tests"]),
+    package_data={"zhaquirks": ["quirk_index.json"]},
     python_requires=">=3",
     install_requires=["zigpy>=0.45.1"],
     tests_require=["pytest"],
@@ -105,6 +105,45 @@ def zigpy_device_mock(MockAppController, ieee_mock):
     return _dev
 
 
+def device_from_quirk(app, quirk, ieee, nwk=zigpy.types.NWK(0x1234), apply_quirk=True):
+    """Create zigpy device from Quirk's signature, used by fixtures and benchmarks."""
+
+    models_info = quirk.signature.get(
+        MODELS_INFO,
+        (
+            (
+                quirk.signature.get(MANUFACTURER, "Mock Manufacturer"),
+                quirk.signature.get(MODEL, "Mock Model"),
+            ),
+        ),
+    )
+    manufacturer, model = models_info[0]
+
+    raw_device = zigpy.device.Device(app, ieee, nwk)
+    raw_device.manufacturer = manufacturer
+    raw_device.model = model
+
+    endpoints = quirk.signature.get(ENDPOINTS, {})
+    for ep_id, ep_data in endpoints.items():
+        ep = raw_device.add_endpoint(ep_id)
+        ep.profile_id = ep_data.get(PROFILE_ID, 0x0260)
+        ep.device_type = ep_data.get(DEVICE_TYPE, 0xFEDB)
+        in_clusters = ep_data.get(INPUT_CLUSTERS, [])
+        for cluster_id in in_clusters:
+            ep.add_input_cluster(cluster_id)
+        out_clusters = ep_data.get(OUTPUT_CLUSTERS, [])
+        for cluster_id in out_clusters:
+            ep.add_output_cluster(cluster_id)
+
+    if not apply_quirk:
+        return raw_device
+
+    device = quirk(app, ieee, nwk, raw_device)
+    app.devices[ieee] = device
+
+    return device
+
+
 @pytest.fixture
 def zigpy_device_from_quirk(MockAppController, ieee_mock):
     """Create zigpy device from Quirk's signature."""
@@ -112,40 +151,7 @@ def zigpy_device_from_quirk(MockAppController, ieee_mock):
     def _dev(quirk, ieee=None, nwk=zigpy.types.NWK(0x1234), apply_quirk=True):
         if ieee is None:
             ieee = ieee_mock
-        models_info = quirk.signature.get(
-            MODELS_INFO,
-            (
-                (
-                    quirk.signature.get(MANUFACTURER, "Mock Manufacturer"),
-                    quirk.signature.get(MODEL, "Mock Model"),
-                ),
-            ),
-        )
-        manufacturer, model = models_info[0]
-
-        raw_device = zigpy.device.Device(MockAppController, ieee, nwk)
-        raw_device.manufacturer = manufacturer
-        raw_device.model = model
-
-        endpoints = quirk.signature.get(ENDPOINTS, {})
-        for ep_id, ep_data in endpoints.items():
-            ep = raw_device.add_endpoint(ep_id)
-            ep.profile_id = ep_data.get(PROFILE_ID, 0x0260)
-            ep.device_type = ep_data.get(DEVICE_TYPE, 0xFEDB)
-            in_clusters = ep_data.get(INPUT_CLUSTERS, [])
-            for cluster_id in in_clusters:
-                ep.add_input_cluster(cluster_id)
-            out_clusters = ep_data.get(OUTPUT_CLUSTERS, [])
-            for cluster_id in out_clusters:
-                ep.add_output_cluster(cluster_id)
-
-        if not apply_quirk:
-            return raw_device
-
-        device = quirk(MockAppController, ieee, nwk, raw_device)
-        MockAppController.devices[ieee] = device
-
-        return device
+        return device_from_quirk(MockAppController, quirk, ieee, nwk, apply_quirk)
 
     return _dev
 
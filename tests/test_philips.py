@@ -0,0 +1,54 @@
+"""Tests for Philips quirks."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+import zhaquirks
+from zhaquirks.const import PRESS_TYPE
+import zhaquirks.philips.rwlfirstgen
+
+zhaquirks.setup()
+
+
+def press(button):
+    """Notification of a press of the button."""
+    return (
+        bytes([0x1D, 0x0B, 0x10, 0x01, 0x00, button]) + b"\x30\x00\x00\x00\x00\x00\x00"
+    )
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.philips.rwlfirstgen.PhilipsRWLFirstGen,))
+async def test_multi_press(zigpy_device_from_quirk, quirk):
+    """Test multiple presses are derived per remote."""
+
+    remotes = [zigpy_device_from_quirk(quirk) for _ in range(2)]
+    events = []
+    for num, remote in enumerate(remotes):
+        cluster = remote.endpoints[2].philips_remote_cluster
+        cluster.multi_press.threshold = 0.05
+        listener = mock.MagicMock()
+        listener.zha_send_event.side_effect = lambda action, args, num=num: (
+            events.append((num, action, args[PRESS_TYPE]))
+        )
+        cluster.add_listener(listener)
+
+    def notify(remote, button):
+        cluster = remote.endpoints[2].philips_remote_cluster
+        hdr, args = cluster.deserialize(press(button))
+        cluster.handle_message(hdr, args)
+
+    # presses on one remote don't drop the presses of another one
+    notify(remotes[0], 1)
+    notify(remotes[1], 1)
+    notify(remotes[0], 1)
+    notify(remotes[1], 4)
+    assert events == [(1, "on_press", "press")]
+
+    await asyncio.sleep(0.1)
+    assert sorted(events) == [
+        (0, "on_double_press", "double_press"),
+        (1, "off_press", "press"),
+        (1, "on_press", "press"),
+    ]
@@ -1,10 +1,12 @@
 """General quirk tests."""
 from __future__ import annotations
 
+import asyncio
 import collections
 import importlib
 import json
 from pathlib import Path
+import sys
 from unittest import mock
 
 import pytest
@@ -48,6 +50,7 @@ from zhaquirks.const import (
     PROFILE_ID,
     SKIP_CONFIGURATION,
 )
+import zhaquirks.registry
 from zhaquirks.xiaomi import XIAOMI_NODE_DESC
 
 zhaquirks.setup()
@@ -704,3 +707,376 @@ def test_attributes_updated_not_replaced(quirk: CustomDevice) -> None:
                     f"Cluster {cluster} deletes parent class's attributes instead of"
                     f" extending them: {base_cluster}"
                 )
+
+
+def test_quirk_index_up_to_date() -> None:
+    """Ensure the quirk index used for lazy loading matches the quirk signatures."""
+
+    assert (
+        zhaquirks.registry.load_quirk_index() == zhaquirks.registry.build_quirk_index()
+    ), "Quirk index is outdated, regenerate it with `python -m zhaquirks.registry`"
+
+
+LAZY_QUIRK_MODULE = """
+from zigpy.quirks import CustomDevice
+
+from zhaquirks.const import (
+    DEVICE_TYPE,
+    ENDPOINTS,
+    INPUT_CLUSTERS,
+    MODELS_INFO,
+    OUTPUT_CLUSTERS,
+    PROFILE_ID,
+)
+
+
+class LazyQuirk(CustomDevice):
+    signature = {{
+        MODELS_INFO: [("Lazy Manufacturer", "{model}")],
+        ENDPOINTS: {{
+            1: {{
+                PROFILE_ID: 0x0104,
+                DEVICE_TYPE: 0x0100,
+                INPUT_CLUSTERS: [0x0000],
+                OUTPUT_CLUSTERS: [],
+            }}
+        }},
+    }}
+
+    replacement = signature
+"""
+
+
+def test_lazy_quirk_loading(
+    zigpy_device_mock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test quirk modules are imported only when a matching device is looked up."""
+
+    monkeypatch.setattr(zq, "_DEVICE_REGISTRY", zq.DeviceRegistry())
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    (tmp_path / "lazy_quirks").mkdir()
+    (tmp_path / "lazy_quirks/__init__.py").touch()
+    for name, model in (("first", "Model A"), ("second", "Model B")):
+        (tmp_path / f"lazy_quirks/{name}.py").write_text(
+            LAZY_QUIRK_MODULE.format(model=model)
+        )
+
+    index = {
+        "version": zhaquirks.registry.QUIRK_INDEX_VERSION,
+        "modules": ["lazy_quirks", "lazy_quirks.first", "lazy_quirks.second"],
+        "eager": [],
+        "quirks": [
+            ["Lazy Manufacturer", "Model A", ["lazy_quirks.first"]],
+            ["Lazy Manufacturer", "Model B", ["lazy_quirks.second"]],
+        ],
+    }
+
+    try:
+        zhaquirks.registry.LazyQuirkLoader(index).install()
+        assert "lazy_quirks.first" not in sys.modules
+
+        device = zigpy_device_mock()
+        device.manufacturer = "Lazy Manufacturer"
+        device.model = "Model A"
+        ep = device.add_endpoint(1)
+        ep.profile_id = 0x0104
+        ep.device_type = 0x0100
+        ep.add_input_cluster(0x0000)
+
+        quirked = zq.get_device(device)
+        assert type(quirked).__module__ == "lazy_quirks.first"
+        assert "lazy_quirks.second" not in sys.modules
+
+        # custom quirks registered before the lazy load still take priority
+        class CustomLazyQuirk(CustomDevice):
+            signature = {
+                MODELS_INFO: [("Lazy Manufacturer", "Model B")],
+                ENDPOINTS: quirked.signature[ENDPOINTS],
+            }
+            replacement = signature
+
+        device.model = "Model B"
+        assert type(zq.get_device(device)) is CustomLazyQuirk
+        assert "lazy_quirks.second" in sys.modules
+    finally:
+        for modname in ("lazy_quirks", "lazy_quirks.first", "lazy_quirks.second"):
+            sys.modules.pop(modname, None)
+
+
+def test_lazy_signature_index(
+    zigpy_device_mock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the signature index includes the quirks not lazily loaded yet."""
+
+    monkeypatch.setattr(zq, "_DEVICE_REGISTRY", zq.DeviceRegistry())
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    (tmp_path / "lazy_index_quirks").mkdir()
+    (tmp_path / "lazy_index_quirks/__init__.py").touch()
+    (tmp_path / "lazy_index_quirks/first.py").write_text(
+        LAZY_QUIRK_MODULE.format(model="Model A")
+    )
+
+    index = {
+        "version": zhaquirks.registry.QUIRK_INDEX_VERSION,
+        "modules": ["lazy_index_quirks", "lazy_index_quirks.first"],
+        "eager": [],
+        "quirks": [["Lazy Manufacturer", "Model A", ["lazy_index_quirks.first"]]],
+    }
+
+    try:
+        zhaquirks.registry.LazyQuirkLoader(index).install()
+        assert "lazy_index_quirks.first" not in sys.modules
+
+        signature_index = zhaquirks.registry.SignatureIndex()
+        assert "lazy_index_quirks.first" in sys.modules
+        assert signature_index.quirks == 1
+
+        device = zigpy_device_mock()
+        device.manufacturer = "Lazy Manufacturer"
+        device.model = "Model A"
+        ep = device.add_endpoint(1)
+        ep.profile_id = 0x0104
+        ep.device_type = 0x0100
+        ep.add_input_cluster(0x0000)
+        quirk = signature_index.get_quirk(device)
+        assert quirk.__module__ == "lazy_index_quirks.first"
+        assert type(zq.get_device(device)) is quirk
+    finally:
+        for modname in ("lazy_index_quirks", "lazy_index_quirks.first"):
+            sys.modules.pop(modname, None)
+
+
+async def test_timer_wheel() -> None:
+    """Test timers run from the shared timer wheel."""
+
+    wheel = zhaquirks.TimerWheel(tick=0.05, slots=4)
+    fired = []
+
+    wheel.schedule("a", 0.1, lambda: fired.append("a"))
+    wheel.schedule("b", 0.1, lambda: fired.append("b"))
+    # later than a whole revolution of the wheel
+    wheel.schedule("c", 0.35, lambda: fired.append("c"))
+    # rescheduled and cancelled timers don't fire
+    wheel.schedule("b", 0.25, lambda: fired.append("b2"))
+    wheel.schedule("d", 0.1, lambda: fired.append("d"))
+    wheel.cancel("d")
+    wheel.cancel("unknown")
+    # shorter than a tick
+    wheel.schedule("e", 0, lambda: fired.append("e"))
+    assert len(wheel) == 4
+
+    await asyncio.sleep(0.025)
+    assert fired == ["e"]
+    await asyncio.sleep(0.15)
+    assert fired == ["e", "a"]
+    await asyncio.sleep(0.15)
+    assert fired == ["e", "a", "b2"]
+    await asyncio.sleep(0.15)
+    assert fired == ["e", "a", "b2", "c"]
+    assert len(wheel) == 0
+
+    # the wheel stops ticking without timers
+    assert wheel._handle is None
+    wheel.schedule("a", 0.05, lambda: fired.append("a"))
+    await asyncio.sleep(0.15)
+    assert fired[-1] == "a"
+    assert zhaquirks.get_timer_wheel() is zhaquirks.get_timer_wheel()
+
+
+async def test_event_channels() -> None:
+    """Test event buses are created on first use and dispatch to listeners."""
+
+    class Listener:
+        def __init__(self):
+            self.values = []
+
+        def value_reported(self, value):
+            self.values.append(value)
+            return value
+
+        def broken(self, value):
+            raise ValueError(value)
+
+        async def async_reported(self, value):
+            return value * 2
+
+    class Device:
+        value_bus = zhaquirks.EventChannel()
+        unused_bus = zhaquirks.EventChannel()
+
+        def __init__(self):
+            self.plain_bus = zhaquirks.Bus()
+
+    device = Device()
+    assert "value_bus" not in vars(device)
+    assert zhaquirks.listener_counts(device) == {
+        "value_bus": 0,
+        "unused_bus": 0,
+        "plain_bus": 0,
+    }
+
+    first, second = Listener(), Listener()
+    device.value_bus.add_listener(first)
+    assert device.value_bus is vars(device)["value_bus"]
+    assert device.value_bus.listener_event("value_reported", 1) == [1]
+    assert first.values == [1]
+
+    # listeners added later are bound on the next event
+    device.value_bus.add_listener(second)
+    device.value_bus.add_listener(object())
+    assert device.value_bus.listener_event("value_reported", 2) == [2, 2]
+    assert device.value_bus.listener_event("broken", 3) == []
+    assert await device.value_bus.async_event("async_reported", 4) == [8, 8]
+
+    # methods replaced on the listener instance take precedence
+    with mock.patch.object(first, "value_reported", return_value=5) as patched:
+        assert device.value_bus.listener_event("value_reported", 6) == [5, 6]
+    patched.assert_called_once_with(6)
+    assert device.value_bus.listener_event("value_reported", 7) == [7, 7]
+    assert first.values == [1, 2, 7]
+
+    assert zhaquirks.listener_counts(device) == {
+        "value_bus": 3,
+        "unused_bus": 0,
+        "plain_bus": 0,
+    }
+    assert "unused_bus" not in vars(device)
+
+
+async def test_multi_press_detector() -> None:
+    """Test multiple presses of a button are counted until it's released."""
+
+    events = []
+    detector = zhaquirks.MultiPressDetector(
+        lambda button, press_type, data: events.append((button, press_type, data)),
+        {1: "single", 2: "double", 3: "triple"},
+        threshold=0.05,
+    )
+
+    detector.press("a", 1)
+    detector.press("a", 2)
+    await asyncio.sleep(0.1)
+    assert events == [("a", "double", 2)]
+
+    # counts above the highest mapped count use its press type
+    for num in range(5):
+        detector.press("a", num)
+    await asyncio.sleep(0.1)
+    assert events[-1] == ("a", "triple", 4)
+
+    # pressing another button reports the pending presses right away
+    detector.press("a")
+    detector.press("b")
+    assert events[-1] == ("a", "single", None)
+    detector.press("b")
+    detector.cancel()
+    await asyncio.sleep(0.1)
+    assert len(events) == 3
+
+
+@pytest.mark.parametrize("quirk", ALL_QUIRK_CLASSES)
+async def test_signature_index(zigpy_device_from_quirk, quirk: CustomDevice) -> None:
+    """Test the signature index finds the quirk zigpy applies."""
+
+    # other tests register custom quirks, index the current registry
+    index = zhaquirks.registry.SignatureIndex()
+    raw_device = zigpy_device_from_quirk(quirk, apply_quirk=False)
+    device = zq._DEVICE_REGISTRY.get_device(raw_device)
+    assert device is not raw_device
+    assert index.get_quirk(raw_device) is type(device)
+
+    # an additional cluster doesn't match the signature anymore
+    endpoint = next(ep for eid, ep in raw_device.endpoints.items() if eid)
+    endpoint.add_input_cluster(0xFC7F)
+    device = zq._DEVICE_REGISTRY.get_device(raw_device)
+    expected = None if device is raw_device else type(device)
+    assert index.get_quirk(raw_device) is expected
+
+
+async def test_instrumentation(zigpy_device_from_quirk) -> None:
+    """Test cluster methods are only measured while instrumentation is enabled."""
+
+    from zhaquirks import instrumentation
+    from zhaquirks.xiaomi import XiaomiCluster
+
+    heartbeat = b"\x1c_\x11I\n" + bytes.fromhex(
+        "01FF42250121630B0421A81305217D2F06240100000000642905006521631D662B4D7F0100"
+        "0A2157DE"
+    )
+    device = zigpy_device_from_quirk(zhaquirks.xiaomi.aqara.weather.Weather)
+    deserialize = XiaomiCluster.__dict__["deserialize"]
+
+    instrumentation.reset()
+    device.handle_message(0x260, 0x0000, 1, 1, heartbeat)
+    assert instrumentation.get_stats() == {}
+
+    instrumentation.enable()
+    try:
+        assert instrumentation.is_enabled()
+        device.handle_message(0x260, 0x0000, 1, 1, heartbeat)
+        device.handle_message(0x260, 0x0000, 1, 1, heartbeat)
+        await device.endpoints[1].basic.command(0x0000, expect_reply=False)
+
+        # cluster classes created while enabled are measured too
+        class LateCluster(zhaquirks.xiaomi.BasicCluster):
+            def deserialize(self, data):
+                return super().deserialize(data)
+
+        assert hasattr(LateCluster.__dict__["deserialize"], "__instrumented__")
+        LateCluster(device.endpoints[1]).deserialize(heartbeat)
+    finally:
+        instrumentation.disable()
+
+    assert not instrumentation.is_enabled()
+    assert not hasattr(LateCluster.__dict__["deserialize"], "__instrumented__")
+    assert "__init_subclass__" not in zq.CustomCluster.__dict__
+    assert XiaomiCluster.__dict__["deserialize"] is deserialize
+    assert "deserialize" not in zhaquirks.xiaomi.aqara.weather.BasicCluster.__dict__
+
+    stats = instrumentation.get_stats(device.ieee)
+    # overridden methods calling their base class are measured once
+    assert stats[device.ieee, 1, 0x0000, "deserialize"].count == 3
+    assert stats[device.ieee, 1, 0x0000, "_update_attribute"].count == 2
+    assert stats[device.ieee, 1, 0x0402, "_update_attribute"].count == 2
+    command = stats[device.ieee, 1, 0x0000, "command"]
+    assert command.count == 1
+    assert sum(command.buckets) == 1
+    assert command.mean_us > 0
+    assert (
+        instrumentation.get_stats(zigpy.types.EUI64.convert("00:00:00:00:00:00:00:01"))
+        == {}
+    )
+
+    device.handle_message(0x260, 0x0000, 1, 1, heartbeat)
+    assert instrumentation.get_stats(device.ieee) == stats
+    instrumentation.reset()
+    assert instrumentation.get_stats() == {}
+
+
+def test_frame_trace(monkeypatch) -> None:
+    """Test the frame trace keeps the last frames of a device."""
+
+    device = zigpy.device.Device(mock.MagicMock(), mock.sentinel.ieee, 0x1234)
+    assert zhaquirks.dump_frame_trace(device) == []
+
+    trace = zhaquirks.get_frame_trace(device)
+    assert zhaquirks.get_frame_trace(device) is trace
+    monkeypatch.setattr(zhaquirks.time, "time", lambda: 1000.0)
+    for value in range(zhaquirks.FRAME_TRACE_SIZE + 2):
+        trace.record(1, 0xEF00, 0x02, 0x03, value)
+    trace.record(1, 0x0006, 0x01)
+
+    records = zhaquirks.dump_frame_trace(device)
+    assert len(records) == len(trace) == zhaquirks.FRAME_TRACE_SIZE
+    assert records[0] == zhaquirks.FrameRecord(1000.0, 1, 0xEF00, 0x02, 0x03, 3)
+    assert records[-1].dp is None
+    assert records[-1].value is None
+
+    lines = trace.format()
+    assert lines[0].endswith(" 1/0xef00 cmd 0x02 dp 3 3")
+    assert lines[-1].endswith(" 1/0x0006 cmd 0x01")
+
+    trace.clear()
+    assert zhaquirks.dump_frame_trace(device) == []
@@ -25,6 +25,7 @@ from zhaquirks.const import (
 from zhaquirks.tuya import Data, TuyaManufClusterAttributes
 import zhaquirks.tuya.ts0042
 import zhaquirks.tuya.ts0043
+import zhaquirks.tuya.ts0601_cover
 import zhaquirks.tuya.ts0601_electric_heating
 import zhaquirks.tuya.ts0601_motion
 import zhaquirks.tuya.ts0601_siren
@@ -453,7 +454,7 @@ async def test_siren_send_attribute(zigpy_device_from_quirk, quirk):
 
 
 @pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_trv.ZonnsmartTV01_ZG,))
-async def test_zonnsmart_state_report(zigpy_device_from_quirk, quirk):
+async def test_zonnsmart_state_report(zigpy_device_from_quirk, quirk, caplog):
     """Test thermostatic valves standard reporting from incoming commands."""
 
     valve_dev = zigpy_device_from_quirk(quirk)
@@ -474,6 +475,8 @@ async def test_zonnsmart_state_report(zigpy_device_from_quirk, quirk):
         hdr, args = tuya_cluster.deserialize(frame)
         tuya_cluster.handle_message(hdr, args)
 
+    # the temperature reported before the target one doesn't fail
+    assert "state_temp_change" not in caplog.text
     assert len(thermostat_listener.cluster_commands) == 0
     assert len(thermostat_listener.attribute_updates) == 11
     assert thermostat_listener.attribute_updates[0][0] == 0x0000  # TEMP
@@ -1405,3 +1408,143 @@ def test_ts0601_valve_signature(assert_signature_matches_quirk):
         "class": "ts0601_valve.TuyaValve",
     }
     assert_signature_matches_quirk(zhaquirks.tuya.ts0601_valve.TuyaValve, signature)
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_cover.TuyaZemismartSmartCover0601,)
+)
+async def test_cover_command_coalescing(zigpy_device_from_quirk, quirk):
+    """Test only the latest position of a burst of cover commands is sent."""
+
+    cover_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = cover_dev.endpoints[1].tuya_manufacturer
+    cover_cluster = cover_dev.endpoints[1].window_covering
+    cover_cluster.coalescer.window = 0.05
+
+    async def async_success(*args, **kwargs):
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=async_success
+    ) as m1:
+        for position in (10, 20, 30):
+            rsp = await cover_cluster.command(0x0005, position)
+            assert rsp.status == foundation.Status.SUCCESS
+        await asyncio.sleep(0)
+
+        assert m1.call_count == 1
+        assert m1.call_args[0][2][-1] == 100 - 10
+
+        await asyncio.sleep(0.2)
+        assert m1.call_count == 2
+        assert m1.call_args[0][2][-1] == 100 - 30
+        assert cover_cluster.coalescer.suppressed == 1
+
+        # stop drops the position held back
+        await cover_cluster.command(0x0005, 40)
+        await cover_cluster.command(0x0005, 50)
+        await cover_cluster.command(0x0002)
+        await asyncio.sleep(0.2)
+        assert m1.call_count == 4
+        assert cover_cluster.coalescer.suppressed == 2
+
+
+async def test_spell_scheduler():
+    """Test spells are deduplicated, retried and run with bounded concurrency."""
+
+    scheduler = zhaquirks.tuya.TuyaSpellScheduler(
+        concurrency=2, tries=3, backoff=0.01, jitter=0
+    )
+    running = []
+    max_running = 0
+    calls = {}
+
+    def device(num):
+        dev = mock.MagicMock()
+        dev.ieee = t.EUI64(num.to_bytes(8, "little"))
+        dev.node_desc.is_receiver_on_when_idle = True
+        return dev
+
+    def spell(num, failures=0):
+        async def cast():
+            nonlocal max_running
+            calls[num] = calls.get(num, 0) + 1
+            running.append(num)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0.01)
+            running.remove(num)
+            if calls[num] <= failures:
+                raise asyncio.TimeoutError
+
+        return cast
+
+    devices = [device(num) for num in range(5)]
+    tasks = [scheduler.cast(dev, spell(num)) for num, dev in enumerate(devices)]
+    # a device has only one spell pending
+    assert scheduler.cast(devices[0], spell(0)) is tasks[0]
+    assert scheduler.stats.deduplicated == 1
+
+    assert await asyncio.gather(*tasks) == [True] * 5
+    assert max_running == 2
+    assert calls == {num: 1 for num in range(5)}
+
+    # failed spells are retried until they run out of tries
+    assert await scheduler.cast(device(5), spell(5, failures=2))
+    assert not await scheduler.cast(device(6), spell(6, failures=3))
+    assert calls[5] == 3
+    assert calls[6] == 3
+
+    assert scheduler.stats.cast == 7
+    assert scheduler.stats.succeeded == 6
+    assert scheduler.stats.failed == 1
+    assert scheduler.stats.retries == 4
+    assert scheduler.stats.mean_latency > 0
+    assert scheduler.stats.max_latency >= scheduler.stats.mean_latency
+
+    # a finished spell can be cast again
+    assert await scheduler.cast(devices[0], spell(0))
+    assert calls[0] == 2
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_cover.TuyaZemismartSmartCover0601,)
+)
+async def test_tuya_profile(zigpy_device_from_quirk, quirk):
+    """Test the manufacturer profile is resolved once and used by the covers."""
+
+    profile = zhaquirks.tuya.get_tuya_profile("_TZE200_xuzcvlku")
+    assert profile.cover_command == {0x0000: 0x0000, 0x0001: 0x0002, 0x0002: 0x0001}
+    assert profile.cover_inverted
+    assert profile.time_epoch is None
+    assert zhaquirks.tuya.get_tuya_profile("_TZE200_xuzcvlku") is profile
+
+    profile = zhaquirks.tuya.get_tuya_profile("_some_random_manuf", 1970, 2000)
+    assert profile.cover_command == {}
+    assert not profile.cover_inverted
+    assert profile.time_epoch == datetime.datetime(1970, 1, 1)
+    assert profile.local_time_epoch == datetime.datetime(2000, 1, 1)
+
+    cover_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = cover_dev.endpoints[1].tuya_manufacturer
+    cover_cluster = cover_dev.endpoints[1].window_covering
+    assert cover_cluster.tuya_profile is zhaquirks.tuya.get_tuya_profile(
+        "_TZE200_fzo2pocs"
+    )
+    # a single profile per device
+    assert cover_cluster.tuya_profile is tuya_cluster.tuya_profile
+    assert cover_dev.tuya_profile is tuya_cluster.tuya_profile
+
+    async def async_success(*args, **kwargs):
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=async_success
+    ) as m1:
+        # stop and close are swapped for this manufacturer
+        await cover_cluster.command(0x0002)
+        assert m1.call_args[0][2][-1] == 0x01
+        await cover_cluster.command(0x0001)
+        assert m1.call_args[0][2][-1] == 0x02
+        # the profile of another manufacturer is used when given
+        await cover_cluster.command(0x0000, manufacturer="_TZE200_rddyvrci")
+        assert m1.call_args[0][2][-1] == 0x02
@@ -3,6 +3,7 @@
 from unittest import mock
 
 import pytest
+import zigpy.types as t
 import zigpy.zcl.foundation as zcl_f
 
 from zhaquirks.tuya import (
@@ -10,6 +11,7 @@ from zhaquirks.tuya import (
     TUYA_GET_DATA,
     TUYA_SET_DATA_RESPONSE,
     TUYA_SET_TIME,
+    DPToAttributeMapping,
     TuyaCommand,
     TuyaData,
     TuyaNewManufCluster,
@@ -193,3 +195,94 @@ def test_tuya_cluster_request_no_handler(default_rsp_mock, TuyaCluster):
 
     assert default_rsp_mock.call_count == 1
     assert default_rsp_mock.call_args[1]["status"] == zcl_f.Status.UNSUP_CLUSTER_COMMAND
+
+
+def test_tuya_dp_handlers_compiled():
+    """Test data point handlers are compiled when the cluster class is created."""
+
+    class TestManufCluster(TuyaNewManufCluster):
+        dp_to_attribute = {
+            1: DPToAttributeMapping("on_off", "on_off"),
+            2: DPToAttributeMapping("on_off", "on_off", endpoint_id=2),
+        }
+        data_point_handlers = {2: "handle_dp_2", 3: "handle_dp_3", 4: "no_such_handler"}
+
+        def handle_dp_2(self, command):
+            pass
+
+        def handle_dp_3(self, command):
+            pass
+
+    assert TestManufCluster._dp_handlers == {
+        1: TuyaNewManufCluster._dp_2_attr_update,
+        2: TestManufCluster.handle_dp_2,
+        3: TestManufCluster.handle_dp_3,
+    }
+
+
+def test_tuya_dp_handler_dispatch(TuyaCluster):
+    """Test get_data reports are dispatched through the compiled handlers."""
+
+    command = TuyaCommand(0, 2, 2, TuyaData(1, 0, b"\x01\x01"))
+    assert TuyaCluster.handle_get_data(command) == zcl_f.Status.UNSUPPORTED_ATTRIBUTE
+
+    handler = mock.MagicMock()
+    with mock.patch.object(TuyaCluster, "_dp_handlers", {2: handler}):
+        assert TuyaCluster.handle_get_data(command) == zcl_f.Status.SUCCESS
+    handler.assert_called_once_with(TuyaCluster, command)
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b"\x02\x00\x04\x00\x00\x02\xdb",
+        b"\x02\x00\x04\xff\xff\xff\xff",
+        b"\x02\x00\x02\x01\x02",
+        b"\x01\x00\x01\x01",
+        b"\x01\x00\x01\x00",
+        b"\x04\x00\x01\x40",
+        b"\x03\x00\x04Tuya",
+        b"\x05\x00\x01\x40",
+        b"\x05\x00\x02\x40\x02",
+        b"\x05\x00\x04\x40\x02\x80\x01",
+    ),
+)
+def test_tuya_data_fast_decode(data):
+    """Test the decoded payload matches the zigpy types deserialization."""
+
+    extra = b"extra data"
+    r, rest = TuyaData.deserialize(memoryview(data + extra))
+    assert rest == extra
+
+    r2 = TuyaData(dp_type=r.dp_type, function=r.function, raw=r.raw)
+    try:
+        expected = r2.payload
+    except ValueError:
+        with pytest.raises(ValueError):
+            r.payload
+        return
+
+    assert r.payload == expected
+    assert type(r.payload) is type(expected)
+
+
+def test_tuya_data_payload_cache():
+    """Test the payload is decoded once and redecoded when the value changes."""
+
+    r, _ = TuyaData.deserialize(b"\x02\x00\x04\x00\x00\x02\xdb")
+    payload = r.payload
+    assert payload == 731
+    assert r.payload is payload
+
+    r.raw = t.LVBytes(b"\x01\x00\x00\x00")
+    assert r.payload == 1
+
+
+def test_tuya_data_too_short():
+    """Test deserializing truncated data."""
+
+    with pytest.raises(ValueError):
+        TuyaData.deserialize(b"\x02\x00")
+
+    with pytest.raises(ValueError):
+        TuyaData.deserialize(b"\x02\x00\x04\x00\x00")
@@ -1,5 +1,6 @@
 """Tests for Tuya quirks."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -208,3 +209,69 @@ async def test_doubledimmer_state_report(zigpy_device_from_quirk, quirk):
     assert len(dimmer2_listener.attribute_updates) == 2
     assert dimmer2_listener.attribute_updates[1][0] == 0x0000
     assert dimmer2_listener.attribute_updates[1][1] == 170
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_command_coalescing(zigpy_device_from_quirk, quirk):
+    """Test only the latest level of a burst of level commands is sent."""
+
+    dimmer_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = dimmer_dev.endpoints[1].tuya_manufacturer
+    dimmer1_cluster = dimmer_dev.endpoints[1].level
+    dimmer1_cluster.coalescer.window = 0.05
+
+    with mock.patch.object(tuya_cluster, "tuya_mcu_command") as m1:
+        for level in range(10, 110, 10):
+            rsp = await dimmer1_cluster.command(0x0000, level)
+            assert rsp.status == foundation.Status.SUCCESS
+
+        # the first level is sent right away, the others are held back
+        assert m1.call_count == 1
+        assert m1.call_args[0][0].attr_value == 10
+
+        await asyncio.sleep(0.2)
+        assert m1.call_count == 2
+        assert m1.call_args[0][0].attr_value == 100
+        assert dimmer1_cluster.coalescer.sent == 2
+        assert dimmer1_cluster.coalescer.suppressed == 8
+
+        # nothing left to send when the window ends
+        await asyncio.sleep(0.2)
+        assert m1.call_count == 2
+
+        # the window is closed, next level is sent right away
+        await dimmer1_cluster.command(0x0000, 50)
+        assert m1.call_count == 3
+        assert m1.call_args[0][0].attr_value == 50
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_command_coalescing_off(zigpy_device_from_quirk, quirk):
+    """Test an off command drops the level commands held back before it."""
+
+    dimmer_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = dimmer_dev.endpoints[1].tuya_manufacturer
+    dimmer1_cluster = dimmer_dev.endpoints[1].level
+    switch1_cluster = dimmer_dev.endpoints[1].on_off
+    dimmer1_cluster.coalescer.window = 0.05
+
+    with mock.patch.object(tuya_cluster, "tuya_mcu_command") as m1:
+        # move_to_level_with_on_off, the second one is held back
+        await dimmer1_cluster.command(0x0004, 50, 1)
+        await dimmer1_cluster.command(0x0004, 80, 1)
+        assert m1.call_count == 2
+
+        rsp = await switch1_cluster.command(0x0000)
+        assert rsp.status == foundation.Status.SUCCESS
+        assert m1.call_count == 3
+        assert m1.call_args[0][0].cluster_attr == "on_off"
+        assert m1.call_args[0][0].attr_value == 0
+
+        # the held back level doesn't turn the dimmer on again
+        await asyncio.sleep(0.2)
+        assert m1.call_count == 3
+        assert dimmer1_cluster.coalescer.suppressed == 2
@@ -1,5 +1,6 @@
 """Tests for Tuya quirks."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -7,13 +8,27 @@ import zigpy.types as t
 from zigpy.zcl import foundation
 
 import zhaquirks
-from zhaquirks.tuya import TUYA_MCU_VERSION_RSP
+from zhaquirks.tuya import (
+    TUYA_MCU_VERSION_RSP,
+    TUYA_SET_DATA,
+    Data,
+    DPReportFilter,
+    EnumConverter,
+    LinearConverter,
+    TuyaReportFilter,
+    TuyaWriteTracker,
+    conversion_mismatches,
+)
 from zhaquirks.tuya.mcu import (
     ATTR_MCU_VERSION,
+    DPToAttributeMapping,
     TuyaClusterData,
     TuyaDPType,
     TuyaMCUCluster,
+    encode_tuya_command,
+    encode_tuya_data,
 )
+import zhaquirks.tuya.ts0601_motion
 
 from tests.common import ClusterListener
 
@@ -137,3 +152,411 @@ async def test_tuya_mcu_classes():
         TuyaClusterData(manufacturer="xiaomi")
     with pytest.raises(ValueError):
         TuyaClusterData(manufacturer=b"")
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+@pytest.mark.parametrize("cluster_cls", set(_subclasses(TuyaMCUCluster)))
+def test_tuya_dp_reverse_index(cluster_cls):
+    """Test the reverse DP index agrees with a search of dp_to_attribute."""
+
+    cluster = mock.MagicMock(spec=cluster_cls)
+    cluster.endpoint.endpoint_id = 1
+    cluster._dp_reverse_index = cluster_cls._dp_reverse_index
+    cluster._dp_reverse_ambiguous = cluster_cls._dp_reverse_ambiguous
+    cluster.dp_to_attribute = cluster_cls.dp_to_attribute
+
+    for dp, dp_mapping in cluster_cls.dp_to_attribute.items():
+        endpoint_id = dp_mapping.endpoint_id or 1
+        expected = next(
+            dp
+            for dp, mapping in cluster_cls.dp_to_attribute.items()
+            if mapping.attribute_name == dp_mapping.attribute_name
+            and (mapping.endpoint_id or 1) == endpoint_id
+        )
+        found_dp, found_mapping = TuyaMCUCluster.get_dp_mapping(
+            cluster, endpoint_id, dp_mapping.attribute_name
+        )
+        assert found_dp == expected
+        assert found_mapping is cluster_cls.dp_to_attribute[expected]
+
+
+def test_tuya_dp_reverse_index_ambiguous():
+    """Test DP mappings for the same endpoint and attribute are flagged."""
+
+    class AmbiguousManufCluster(TuyaMCUCluster):
+        dp_to_attribute = {
+            1: DPToAttributeMapping("on_off", "on_off", TuyaDPType.BOOL),
+            2: DPToAttributeMapping("on_off", "on_off", TuyaDPType.BOOL),
+            3: DPToAttributeMapping("on_off", "on_off", TuyaDPType.BOOL, endpoint_id=2),
+        }
+
+    assert AmbiguousManufCluster._dp_reverse_index == {
+        (None, "on_off"): 1,
+        (2, "on_off"): 3,
+    }
+    assert AmbiguousManufCluster._dp_reverse_ambiguous == {(None, "on_off")}
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_batch_set_data(zigpy_device_from_quirk, quirk):
+    """Test all data points of a write_attributes call sent in one set_data."""
+
+    dimmer_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = dimmer_dev.endpoints[1].tuya_manufacturer
+    dimmer1_cluster = dimmer_dev.endpoints[1].level
+    tuya_cluster.batch_set_data = True
+
+    async def async_success(*args, **kwargs):
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=async_success
+    ) as m1:
+        (status,) = await dimmer1_cluster.write_attributes(
+            {"minimum_level": 25, "bulb_type": 1}
+        )
+        m1.assert_called_once()
+        assert m1.call_args[0][0] == tuya_cluster.cluster_id
+        assert m1.call_args[0][2][2] == 0x00  # set_data
+        assert m1.call_args[0][2][5:] == (
+            b"\x03\x02\x00\x04\x00\x00\x00b" b"\x04\x04\x00\x01\x01"
+        )
+        assert status == [
+            foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)
+        ]
+
+        # attributes without data point are reported, the others still sent
+        m1.reset_mock()
+        (status,) = await dimmer1_cluster.write_attributes(
+            {"minimum_level": 25, "on_level": 10}
+        )
+        m1.assert_called_once()
+        assert m1.call_args[0][2][5:] == b"\x03\x02\x00\x04\x00\x00\x00b"
+        assert status == [
+            foundation.WriteAttributesStatusRecord(
+                foundation.Status.UNSUPPORTED_ATTRIBUTE, 0x0011
+            )
+        ]
+
+        # nothing is sent without any data point
+        m1.reset_mock()
+        (status,) = await dimmer1_cluster.write_attributes({"on_level": 10})
+        m1.assert_not_called()
+
+        # failures of every listener are reported
+        async def failed_second(cluster_data):
+            return [foundation.Status.SUCCESS, foundation.Status.FAILURE]
+
+        second_listener = mock.Mock()
+        second_listener.tuya_mcu_set_datapoints.side_effect = failed_second
+        dimmer_dev.command_bus.add_listener(second_listener)
+        (status,) = await dimmer1_cluster.write_attributes(
+            {"minimum_level": 25, "bulb_type": 1}
+        )
+        assert status == [
+            foundation.WriteAttributesStatusRecord(foundation.Status.FAILURE, 0xEF02)
+        ]
+
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=asyncio.TimeoutError
+    ):
+        (status,) = await dimmer1_cluster.write_attributes(
+            {"minimum_level": 25, "bulb_type": 1}
+        )
+        assert status == [
+            foundation.WriteAttributesStatusRecord(foundation.Status.FAILURE, 0xEF01),
+            foundation.WriteAttributesStatusRecord(foundation.Status.FAILURE, 0xEF02),
+        ]
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_frame_trace(zigpy_device_from_quirk, quirk):
+    """Test received and sent data points are recorded in the frame trace."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+
+    hdr, args = tuya_cluster.deserialize(ZCL_TUYA_VERSION_RSP)
+    tuya_cluster.handle_message(hdr, args)
+    # on_off of the second gang
+    hdr, args = tuya_cluster.deserialize(b"\x09\x07\x02\x00\x07\x07\x01\x00\x01\x01")
+    tuya_cluster.handle_message(hdr, args)
+    tuya_cluster.from_cluster_data(
+        TuyaClusterData(endpoint_id=2, cluster_attr="minimum_level", attr_value=25)
+    )
+
+    version, report, sent = zhaquirks.dump_frame_trace(tuya_device)
+    assert (version.cluster_id, version.command_id, version.dp) == (
+        0xEF00,
+        TUYA_MCU_VERSION_RSP,
+        None,
+    )
+    assert (report.command_id, report.dp) == (0x02, 7)
+    assert report.value.payload == t.Bool.true
+    assert tuya_device.endpoints[2].on_off.get("on_off") == t.Bool.true
+    assert (sent.command_id, sent.dp) == (0x00, 9)
+    assert sent.value.raw == b"\x00\x00\x00b"
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_confirmed_writes(zigpy_device_from_quirk, quirk):
+    """Test writes wait for their set_data_response and are retried."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    tuya_cluster.confirm_writes = True
+    tuya_cluster.write_tracker.timeout = 0.05
+    sent = []
+    # DP 7 is lost the first time
+    lost = {7}
+
+    async def command(command_id, tuya_command, **kwargs):
+        assert command_id == TUYA_SET_DATA
+        sent.append((tuya_command.tsn, tuya_command.dp))
+        if tuya_command.dp in lost:
+            lost.discard(tuya_command.dp)
+            return
+        # set_data_response echoing the TSN of the command
+        frame = bytes([0x09, 0x10, 0x02, 0x00, tuya_command.tsn, tuya_command.dp])
+        asyncio.get_running_loop().call_soon(
+            tuya_cluster.handle_message,
+            *tuya_cluster.deserialize(frame + b"\x01\x00\x01\x01"),
+        )
+
+    on_off = [
+        TuyaClusterData(
+            endpoint_id=endpoint_id,
+            cluster_attr="on_off",
+            attr_value=1,
+            expect_reply=False,
+            manufacturer=None,
+        )
+        for endpoint_id in (1, 2)
+    ]
+    with mock.patch.object(tuya_cluster, "command", side_effect=command):
+        statuses = await tuya_cluster.tuya_mcu_set_datapoints(on_off)
+
+    assert statuses == [foundation.Status.SUCCESS, foundation.Status.SUCCESS]
+    assert [dp for _, dp in sent] == [1, 7, 7]
+    # the retry is sent with a new TSN
+    assert sent[1][0] != sent[2][0]
+    assert tuya_device.endpoints[2].on_off.get("on_off") == t.Bool.true
+    assert tuya_cluster.write_tracker.retries == 1
+    assert tuya_cluster.write_tracker.confirmed == 2
+    assert len(tuya_cluster.write_tracker) == 0
+
+    # writes never confirmed time out
+    async def lost_command(*args, **kwargs):
+        sent.append(None)
+
+    with mock.patch.object(tuya_cluster, "command", side_effect=lost_command):
+        statuses = await tuya_cluster.tuya_mcu_set_datapoints(on_off[:1])
+    assert statuses == [foundation.Status.TIMEOUT]
+    assert sent[3:] == [None] * tuya_cluster.write_tracker.tries
+    assert tuya_cluster.write_tracker.failed == 1
+
+    # values the data point can't hold are reported, not raised
+    level = [
+        TuyaClusterData(
+            endpoint_id=1,
+            cluster_attr=cluster_attr,
+            attr_value=value,
+            expect_reply=False,
+            manufacturer=None,
+        )
+        for cluster_attr, value in (("minimum_level", -25), ("bulb_type", 1))
+    ]
+    with mock.patch.object(tuya_cluster, "command", side_effect=command):
+        statuses = await tuya_cluster.tuya_mcu_set_datapoints(level)
+    assert statuses == [foundation.Status.INVALID_VALUE, foundation.Status.SUCCESS]
+    assert sent[-1][1] == 4
+
+
+async def test_tuya_write_tracker():
+    """Test the table of pending writes is bounded and expires entries."""
+
+    tracker = TuyaWriteTracker(max_pending=2, expiry=0.05)
+    first = tracker.track(1)
+    second = tracker.track(2)
+    third = tracker.track(3)
+    # the oldest write is dropped when the table is full
+    assert len(tracker) == 2
+    with pytest.raises(asyncio.TimeoutError):
+        await first
+    assert tracker.resolve(2)
+    assert await second == foundation.Status.SUCCESS
+    assert not tracker.resolve(2)
+
+    # stale writes are dropped
+    await asyncio.sleep(0.1)
+    tracker.track(4)
+    assert len(tracker) == 1
+    with pytest.raises(asyncio.TimeoutError):
+        await third
+
+
+def test_dp_report_filter():
+    """Test the reports dropped by the data point filters."""
+
+    report_filter = TuyaReportFilter(
+        {
+            1: DPReportFilter(),
+            2: DPReportFilter(deadband=5, max_interval=10),
+            3: DPReportFilter(relative_deadband=0.1, min_interval=1),
+        }
+    )
+
+    with mock.patch("time.monotonic", return_value=100):
+        # first reports are forwarded, unchanged values are dropped
+        assert report_filter.accept(1, True)
+        assert not report_filter.accept(1, True)
+        assert report_filter.accept(1, False)
+        # data points without filter are forwarded
+        assert report_filter.accept(4, 1)
+        assert report_filter.accept(4, 1)
+
+        assert report_filter.accept(2, 100)
+        assert not report_filter.accept(2, 104)
+        assert report_filter.accept(2, 95)
+        # forced reports always pass and become the reference
+        assert report_filter.accept(2, 96, forced=True)
+        assert not report_filter.accept(2, 100)
+
+        assert report_filter.accept(3, 100)
+        assert not report_filter.accept(3, 200)
+
+    with mock.patch("time.monotonic", return_value=110):
+        # forwarded again after max_interval
+        assert report_filter.accept(2, 96)
+        assert not report_filter.accept(3, 105)
+        assert report_filter.accept(3, 111)
+        # non numeric values aren't compared with the deadband
+        assert report_filter.accept(2, "text")
+
+    assert report_filter.dropped == 5
+    assert report_filter.forwarded == 9
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_motion.MmwRadarMotion,))
+async def test_dp_report_filter_cluster(zigpy_device_from_quirk, quirk):
+    """Test repeated target distance reports of the radar are dropped."""
+
+    device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = device.endpoints[1].tuya_manufacturer
+    distance_listener = ClusterListener(device.endpoints[1].analog_input)
+
+    def report(command_id, distance):
+        # dp 9, value, 4 bytes
+        data = b"\x09\x01" + bytes([command_id]) + b"\x00\x01\x09\x02\x00\x04"
+        device.handle_message(
+            0x0104,
+            tuya_cluster.cluster_id,
+            1,
+            1,
+            data + distance.to_bytes(4, "big"),
+        )
+
+    report(0x02, 161)
+    report(0x02, 161)
+    report(0x06, 163)
+    assert distance_listener.attribute_updates == [(0x0055, 1.61)]
+    assert tuya_cluster.report_filter.dropped == 2
+
+    report(0x06, 170)
+    # responses to data queries are forwarded
+    report(0x01, 170)
+    assert distance_listener.attribute_updates[1:] == [(0x0055, 1.7), (0x0055, 1.7)]
+
+
+def test_converters():
+    """Test the declarative converters are inverted automatically."""
+
+    level = LinearConverter(255, 1000, integer=True)
+    assert level(1000) == 255
+    assert level(553) == 141
+    assert level.invert(25) == 99
+    assert conversion_mismatches(level, level.invert, range(256)) == []
+    # inverse rounding down, like the dimmers have always been written
+    floor = LinearConverter(255, 1000, integer=True, round_up=False)
+    assert floor.invert(25) == 98
+    assert all(floor.invert(x) == (x * 1000) // 255 for x in range(256))
+    assert conversion_mismatches(floor, floor.invert, range(256))[:2] == [
+        (1, 0),
+        (2, 1),
+    ]
+
+    mapping = DPToAttributeMapping("level", "current_level", TuyaDPType.VALUE, level)
+    # the mapping calls the specialised functions, not the converter
+    assert mapping.converter is level.convert
+    assert mapping.dp_converter is level.invert
+    mapping = DPToAttributeMapping(
+        "level", "current_level", TuyaDPType.VALUE, level, lambda x: x
+    )
+    assert mapping.dp_converter(25) == 25
+
+    distance = LinearConverter(1, 100)
+    assert distance(161) == 1.61
+    assert distance.invert(1.61) == 161
+
+    clamped = LinearConverter(2, offset=-10, minimum=0, maximum=100)
+    assert clamped(4) == 0
+    assert clamped(20) == 30
+    assert clamped(60) == 100
+    assert clamped.invert(30) == 20
+    assert clamped.invert(150) == 55
+    assert LinearConverter(3, offset=2, integer=True).invert(7) == 2
+    assert LinearConverter(10).invert(215) == 21.5
+    assert LinearConverter(10, maximum=300)(215) == 300
+
+    with pytest.raises(ValueError):
+        LinearConverter(float("inf"))
+
+    with pytest.raises(ValueError):
+        LinearConverter(0)
+
+    invert = EnumConverter({False: True, True: False})
+    assert invert(t.Bool.true) is False
+    assert invert.invert(1) is False
+    assert invert("unknown") == "unknown"
+    assert conversion_mismatches(invert, invert.invert, (False, True)) == []
+
+    with pytest.raises(ValueError):
+        EnumConverter({0: "off", 1: "off"})
+
+
+@pytest.mark.parametrize(
+    "dp_type, value, raw",
+    (
+        (TuyaDPType.BOOL, True, b"\x01"),
+        (TuyaDPType.VALUE, 553, b"\x00\x00\x02\x29"),
+        (TuyaDPType.ENUM, 2, b"\x02"),
+        (TuyaDPType.BITMAP, t.bitmap16(0x0102), b"\x01\x02"),
+    ),
+)
+def test_encode_tuya_data(dp_type, value, raw):
+    """Test datapoint values are encoded like Data.from_value did."""
+
+    data = encode_tuya_data(dp_type, value)
+    assert data.raw == raw
+    legacy_value = dp_type.ztype(value) if dp_type.ztype else value
+    assert data.raw == t.LVBytes.deserialize(Data.from_value(legacy_value))[0]
+    assert data.serialize() == bytes([dp_type, 0, len(raw)]) + raw
+    if dp_type.ztype:
+        assert data.payload == value
+
+    command = encode_tuya_command(0x12, 7, dp_type, value)
+    assert command.serialize() == b"\x00\x12\x07" + data.serialize()
+
+    with pytest.raises(ValueError):
+        encode_tuya_data(TuyaDPType.VALUE, -1)
@@ -0,0 +1,242 @@
+"""Tests for XBee quirks."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+from zigpy.zcl import foundation
+from zigpy.zcl.clusters.general import LevelControl
+
+import zhaquirks
+from zhaquirks.xbee import (
+    XBEE_AT_ENDPOINT,
+    XBEE_AT_REQUEST_CLUSTER,
+    XBEE_AT_RESPONSE_CLUSTER,
+    XBEE_DATA_CLUSTER,
+    XBEE_DATA_ENDPOINT,
+    XBEE_IO_CLUSTER,
+    XBEE_PROFILE_ID,
+)
+import zhaquirks.xbee.xbee_io
+
+from tests.common import ClusterListener
+
+zhaquirks.setup()
+
+
+def test_io_sample_deserialize():
+    """Test IO sample reports with several sample sets are decoded."""
+
+    io_sample = zhaquirks.xbee.XBeeCommon.DigitalIOCluster.IOSample
+    sample, rest = io_sample.deserialize(
+        bytes.fromhex("02 0003 81 0001 0100 0ce4 0002 0200 0ce5 ff")
+    )
+    assert rest == b"\xff"
+    assert sample.digital_mask == 0x0003
+    assert sample.analog_mask == 0x81
+    assert sample.samples == ((0x01, (0x100, 0xCE4)), (0x02, (0x200, 0xCE5)))
+
+    # no digital samples block without digital pins
+    sample, rest = io_sample.deserialize(bytes.fromhex("01 0000 80 0ce4"))
+    assert rest == b""
+    assert sample.samples == ((0, (0xCE4,)),)
+
+    with pytest.raises(ValueError):
+        io_sample.deserialize(bytes.fromhex("02 0003 01 0001 0100"))
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.xbee.xbee_io.XBeeSensor,))
+async def test_io_sample_report(zigpy_device_from_quirk, quirk):
+    """Test the pins are updated for every sample set, only when they change."""
+
+    device = zigpy_device_from_quirk(quirk)
+    dio0 = ClusterListener(device.endpoints[0xD0].on_off)
+    dio1 = ClusterListener(device.endpoints[0xD1].on_off)
+    ad0 = ClusterListener(device.endpoints[0xD0].analog_input)
+
+    def report(payload):
+        device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_IO_CLUSTER,
+            XBEE_DATA_ENDPOINT,
+            XBEE_DATA_ENDPOINT,
+            bytes.fromhex(payload),
+        )
+
+    # DIO0 and DIO1 toggle between the two sets, AD0 doesn't change
+    report("02 0003 01 0001 0100 0002 0100")
+    assert dio0.attribute_updates == [(0x0000, 1), (0x0000, 0)]
+    assert dio1.attribute_updates == [(0x0000, 0), (0x0000, 1)]
+    assert ad0.attribute_updates == [(0x0055, 0x100 / 10.23)]
+
+    # only DIO0 changed
+    report("01 0003 01 0003 0100")
+    assert dio0.attribute_updates[2:] == [(0x0000, 1)]
+    assert dio1.attribute_updates[2:] == []
+    assert ad0.attribute_updates[1:] == []
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.xbee.xbee_io.XBeeSensor,))
+async def test_remote_at_pipelined(zigpy_device_from_quirk, quirk, monkeypatch):
+    """Test remote AT commands are pipelined, cleaned up and cached."""
+
+    device = zigpy_device_from_quirk(quirk)
+    at_request = device.endpoints[XBEE_AT_ENDPOINT].out_clusters[
+        XBEE_AT_REQUEST_CLUSTER
+    ]
+    at_response = device.endpoints[XBEE_AT_ENDPOINT].in_clusters[
+        XBEE_AT_RESPONSE_CLUSTER
+    ]
+    values = {b"VR": b"\x10\x0b", b"SH": b"\x00\x13\xa2\x00", b"D0": b"\x03"}
+    sent = []
+
+    async def request(device, profile, cluster, src_ep, dst_ep, seq, data, **kw):
+        # frame type, frame id, options, frame id, addresses, command
+        sent.append((data[3], bytes(data[14:16])))
+
+    def respond(frame_id, command):
+        device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_AT_RESPONSE_CLUSTER,
+            XBEE_AT_ENDPOINT,
+            XBEE_AT_ENDPOINT,
+            bytes([frame_id]) + command + b"\x00" + values[command],
+        )
+
+    async def wait_sent(count):
+        while len(sent) < count:
+            await asyncio.sleep(0)
+
+    monkeypatch.setattr(device.application, "request", request)
+
+    query = asyncio.ensure_future(device.remote_at_query("VR", "SH", "D0"))
+    await asyncio.wait_for(wait_sent(3), 1)
+    # all requests are sent before the first response
+    assert [command for _, command in sent] == [b"VR", b"SH", b"D0"]
+    for frame_id, command in reversed(sent):
+        respond(frame_id, command)
+    assert await query == {"VR": 0x100B, "SH": 0x0013A200, "D0": 3}
+    assert not at_response._awaiting
+
+    # read only values are cached
+    assert await device.remote_at_query("VR", "SH") == {"VR": 0x100B, "SH": 0x0013A200}
+    assert len(sent) == 3
+
+    # timed out requests are forgotten, their late response is ignored
+    monkeypatch.setattr(zhaquirks.xbee, "REMOTE_AT_COMMAND_TIMEOUT", 0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await device.remote_at("D0")
+    assert not at_response._awaiting
+    respond(*sent[-1])
+
+    # frame ids of requests in flight are skipped on wraparound
+    at_request._seq = 255
+    at_response.save_at_request(1, asyncio.get_running_loop().create_future())
+    queries = asyncio.gather(device.remote_at("D0"), device.remote_at("D0"))
+    await asyncio.wait_for(wait_sent(6), 1)
+    assert [frame_id for frame_id, _ in sent[-2:]] == [255, 2]
+    for frame_id, command in sent[-2:]:
+        respond(frame_id, command)
+    assert await queries == [3, 3]
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.xbee.xbee_io.XBeeSensor,))
+async def test_serial_stream(zigpy_device_from_quirk, quirk, monkeypatch):
+    """Test the serial data is streamed as bytes while a stream is open."""
+
+    device = zigpy_device_from_quirk(quirk)
+    serial = device.endpoints[XBEE_DATA_ENDPOINT].xbee_serial_data
+    relay = mock.MagicMock()
+    device.endpoints[XBEE_DATA_ENDPOINT].out_clusters[
+        LevelControl.cluster_id
+    ].add_listener(relay)
+    sent = []
+
+    async def request(device, profile, cluster, src_ep, dst_ep, seq, data, **kw):
+        await asyncio.sleep(0)
+        sent.append(data)
+        return foundation.Status.SUCCESS, "sent"
+
+    def receive(data):
+        device.handle_message(
+            XBEE_PROFILE_ID, XBEE_DATA_CLUSTER, XBEE_DATA_ENDPOINT, 0xE8, data
+        )
+
+    monkeypatch.setattr(device.application, "request", request)
+
+    receive(b"\xffevent")
+    relay.zha_send_event.assert_called_once_with("receive_data", "\xffevent")
+
+    reader, writer = serial.open_stream(high_water=100)
+    with pytest.raises(RuntimeError):
+        serial.open_stream()
+
+    # received frames are reassembled in the reader
+    receive(b"temp=21.5;hum")
+    receive(b"=48\n\x00\xff")
+    assert await reader.readline() == b"temp=21.5;hum=48\n"
+    assert await reader.readexactly(2) == b"\x00\xff"
+    relay.zha_send_event.assert_called_once()
+
+    # written data is sent in chunks of the maximum payload
+    writer.write(bytes(range(100)))
+    writer.write(bytes(range(100, 200)))
+    await writer.drain()
+    assert sent == [bytes(range(84)), bytes(range(84, 168)), bytes(range(168, 200))]
+    writer.write(b"end")
+    await writer.drain()
+    assert len(sent) == 3
+    writer.close()
+    await writer.wait_closed()
+    assert sent[-1] == b"end"
+    assert writer.is_closing()
+    assert await reader.read() == b""
+    with pytest.raises(RuntimeError):
+        writer.write(b"closed")
+
+    # events are relayed again, long data is sent in chunks
+    receive(b"again")
+    relay.zha_send_event.assert_called_with("receive_data", "again")
+    assert await serial.command(0x0000, "x" * 100) == (
+        foundation.Status.SUCCESS,
+        "sent",
+    )
+    assert sent[-2:] == [b"x" * 84, b"x" * 16]
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.xbee.xbee_io.XBeeSensor,))
+async def test_serial_stream_overflow(zigpy_device_from_quirk, quirk, monkeypatch):
+    """Test received data is dropped while the stream reader is full."""
+
+    device = zigpy_device_from_quirk(quirk)
+    serial = device.endpoints[XBEE_DATA_ENDPOINT].xbee_serial_data
+    sent = []
+
+    async def request(device, profile, cluster, src_ep, dst_ep, seq, data, **kw):
+        sent.append(data)
+        return foundation.Status.SUCCESS, "sent"
+
+    def receive(data):
+        device.handle_message(
+            XBEE_PROFILE_ID, XBEE_DATA_CLUSTER, XBEE_DATA_ENDPOINT, 0xE8, data
+        )
+
+    monkeypatch.setattr(device.application, "request", request)
+
+    reader, writer = serial.open_stream(limit=8)
+    receive(b"0123456789")
+    receive(b"abcdefghij")
+    receive(b"klmnop")
+    # at most twice the limit is buffered
+    assert serial.rx_dropped == 10
+    assert await reader.readexactly(16) == b"0123456789klmnop"
+
+    # data is buffered again once read
+    receive(b"qrstuvwxyz")
+    assert await reader.readexactly(10) == b"qrstuvwxyz"
+    assert serial.rx_dropped == 10
+    serial.close_stream()
+
+    # empty data is still sent
+    assert await serial.command(0x0000, "") == (foundation.Status.SUCCESS, "sent")
+    assert sent == [b""]
@@ -31,6 +31,7 @@ from zhaquirks.xiaomi import (
 )
 import zhaquirks.xiaomi.aqara.motion_aq2
 import zhaquirks.xiaomi.aqara.motion_aq2b
+import zhaquirks.xiaomi.aqara.opple_remote
 import zhaquirks.xiaomi.mija.motion
 
 from tests.common import ZCL_OCC_ATTR_RPT_OCC, ClusterListener
@@ -306,6 +307,41 @@ async def test_mija_battery(zigpy_device_from_quirk, voltage, bpr):
     assert power_cluster["battery_percentage_remaining"] == bpr
 
 
+async def test_xiaomi_weather_heartbeat(zigpy_device_from_quirk):
+    """Test the measurements of a weather sensor heartbeat reach their clusters."""
+    data = b"\x1c_\x11I\n" + bytes.fromhex(
+        "01FF42250121630B0421A81305217D2F06240100000000642905006521631D662B4D7F0100"
+        "0A2157DE"
+    )
+
+    device = zigpy_device_from_quirk(zhaquirks.xiaomi.aqara.weather.Weather)
+    assert device.model == "lumi.weather"
+    basic_listener = ClusterListener(device.endpoints[1].basic)
+    device.handle_message(0x260, 0x0000, 1, 1, data)
+
+    attributes = basic_listener.attribute_updates[0][1]
+    assert device.endpoints[1].basic._parse_aqara_attributes(attributes) == {
+        "battery_voltage_mV": 2915,
+        "X-attrib-4": 5032,
+        "X-attrib-5": 12157,
+        "X-attrib-6": 1,
+        "temperature_measurement": 5,
+        "humidity_measurement": 7523,
+        "pressure_measurement": 98125,
+        "path": 56919,
+    }
+    assert device.endpoints[1].temperature["measured_value"] == 5
+    assert device.endpoints[1].humidity["measured_value"] == 7523
+    assert device.endpoints[1].pressure["measured_value"] == 981.25
+    assert device.endpoints[1].power["battery_voltage"] == 29.1
+
+    # keys without a name for the model are reported by number
+    device.model = "lumi.sensor_magnet"
+    attributes = device.endpoints[1].basic._parse_aqara_attributes(attributes)
+    assert attributes["0xff01-100"] == 5
+    assert "temperature_measurement" not in attributes
+
+
 @pytest.mark.parametrize(
     "quirk, batt_size",
     (
@@ -426,3 +462,67 @@ def test_attribute_parsing(raw_report):
     # The only remaining data should be the data type and the length.
     # Everything else is passed through unmodified.
     assert len(raw_report) == 2 * len(reports[0])
+
+
+def test_attribute_parsing_chained():
+    """Test reports with many Xiaomi attributes of wrong length are parsed."""
+    # the length of the 0xFF01 attribute is one byte too long
+    raw_report = bytes.fromhex(
+        "01FF42220121D10B0328190421A81305212D0006240200000000082104020A21A4B4641000"
+    )
+    cluster = BasicCluster(mock.MagicMock())
+
+    attributes, count = cluster._interpret_attr_reports(raw_report * 20)
+    assert count == 1
+    assert len(attributes) == 20
+    for attribute in attributes:
+        assert attribute.attrid == 0xFF01
+        assert attribute.value.value == raw_report[4:]
+
+    hdr = foundation.ZCLHeader.general(
+        manufacturer=4447,
+        tsn=127,
+        command_id=foundation.GeneralCommand.Report_Attributes,
+    )
+    hdr, reports = cluster.deserialize(hdr.serialize() + raw_report * 20)
+    assert not hdr.frame_control.is_reply
+    assert [attr.serialize() for attr in reports.attribute_reports] == [
+        attr.serialize() for attr in attributes
+    ]
+
+    attributes, count = cluster._interpret_attr_reports(raw_report[:20])
+    assert attributes is None
+    assert count == 0
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.xiaomi.aqara.opple_remote.RemoteB286OPCN01,)
+)
+async def test_opple_remote_multi_press(zigpy_device_from_quirk, quirk):
+    """Test multiple presses derived from single presses of an Opple remote."""
+
+    with mock.patch.object(
+        zhaquirks.xiaomi.aqara.opple_remote.MultistateInputCluster,
+        "multi_press_threshold",
+        0.05,
+    ):
+        remote = zigpy_device_from_quirk(quirk)
+
+    events = []
+    for endpoint_id in (1, 2):
+        listener = mock.MagicMock()
+        listener.zha_send_event.side_effect = lambda action, args: events.append(action)
+        remote.endpoints[endpoint_id].multistate_input.add_listener(listener)
+
+    multistate_1 = remote.endpoints[1].multistate_input
+    multistate_2 = remote.endpoints[2].multistate_input
+    multistate_1.update_attribute(0x0055, 1)
+    multistate_1.update_attribute(0x0055, 1)
+    multistate_2.update_attribute(0x0055, 1)
+    # presses reported by the remote are sent right away
+    multistate_2.update_attribute(0x0055, 0)
+    assert events == ["2_hold"]
+
+    await asyncio.sleep(0.1)
+    assert events == ["2_hold", "1_double", "2_single"]
+    assert multistate_1._current_state == "double"
@@ -1,16 +1,30 @@
 """Quirks implementations for the ZHA component of Homeassistant."""
 import asyncio
+import collections
+import datetime
 import importlib
 import logging
+import math
 import pathlib
 import pkgutil
-from typing import Any, Dict, List, Optional, Union
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+import weakref
 
 import zigpy.device
 import zigpy.endpoint
 from zigpy.quirks import CustomCluster, CustomDevice
 import zigpy.types as t
-from zigpy.util import ListenableMixin
 from zigpy.zcl import foundation
 from zigpy.zcl.clusters.general import PowerConfiguration
 from zigpy.zcl.clusters.measurement import OccupancySensing
@@ -26,6 +40,7 @@ from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
     INPUT_CLUSTERS,
+    LAZY_QUIRKS_LOADING,
     MANUFACTURER,
     MODEL,
     MODELS_INFO,
@@ -46,13 +61,393 @@ from zhaquirks.const import (
 _LOGGER = logging.getLogger(__name__)
 
 
-class Bus(ListenableMixin):
-    """Event bus implementation."""
+class Bus:
+    """Event bus implementation.
+
+    Compatible with zigpy's `ListenableMixin`, but the listener methods of an
+    event are looked up once and kept bound until a listener is added. A
+    method set on the listener instance, e.g. by `mock.patch.object`, still
+    takes precedence over the bound one.
+    """
+
+    __slots__ = ("_listeners", "_handlers")
 
     def __init__(self, *args, **kwargs):
         """Init event bus."""
-        super().__init__(*args, **kwargs)
-        self._listeners = {}
+        self._listeners: Dict[int, Tuple[Any, bool]] = {}
+        self._handlers: Dict[str, List[Tuple[Dict[str, Any], Callable, bool]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of listeners."""
+        return len(self._listeners)
+
+    def _add_listener(self, listener: Any, include_context: bool) -> int:
+        id_ = id(listener)
+        while id_ in self._listeners:
+            id_ += 1
+        self._listeners[id_] = (listener, include_context)
+        self._handlers.clear()
+        return id_
+
+    def add_listener(self, listener: Any) -> int:
+        """Add a listener, its methods are called with the event arguments."""
+        return self._add_listener(listener, include_context=False)
+
+    def add_context_listener(self, listener: Any) -> int:
+        """Add a listener, its methods are called with the bus and the arguments."""
+        return self._add_listener(listener, include_context=True)
+
+    def _bind(self, method_name: str) -> List[Tuple[Dict[str, Any], Callable, bool]]:
+        """Bind the listener methods handling the event."""
+
+        handlers = []
+        for listener, include_context in self._listeners.values():
+            method = getattr(listener, method_name, None)
+            if method:
+                handlers.append(
+                    (getattr(listener, "__dict__", {}), method, include_context)
+                )
+        self._handlers[method_name] = handlers
+        return handlers
+
+    def listener_event(self, method_name: str, *args) -> List[Any]:
+        """Call the listener methods handling the event, return their results."""
+
+        handlers = self._handlers.get(method_name)
+        if handlers is None:
+            handlers = self._bind(method_name)
+
+        result = []
+        for overrides, method, include_context in handlers:
+            method = overrides.get(method_name, method)
+            try:
+                if include_context:
+                    result.append(method(self, *args))
+                else:
+                    result.append(method(*args))
+            except Exception as exc:  # pylint: disable=broad-except
+                _LOGGER.warning("Error calling listener.%s: %s", method_name, exc)
+        return result
+
+    async def async_event(self, method_name: str, *args) -> List[Any]:
+        """Await the listener methods handling the event, return their results."""
+
+        handlers = self._handlers.get(method_name)
+        if handlers is None:
+            handlers = self._bind(method_name)
+
+        tasks = []
+        for overrides, method, include_context in handlers:
+            method = overrides.get(method_name, method)
+            if include_context:
+                tasks.append(method(self, *args))
+            else:
+                tasks.append(method(*args))
+
+        results = []
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Error calling listener: %s", result)
+            else:
+                results.append(result)
+        return results
+
+
+class EventChannel:
+    """Event bus of a device, created on first use.
+
+    Declared on the device class instead of assigning a `Bus` in `__init__`,
+    so devices don't allocate the buses nothing listens to. Once created the
+    bus is stored on the device and accessed like a plain attribute.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Remember the attribute name of the channel."""
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Union[Bus, "EventChannel"]:
+        """Return the bus of the device, creating it if needed."""
+        if instance is None:
+            return self
+        bus = instance.__dict__[self.name] = Bus()
+        return bus
+
+
+def listener_counts(device: Any) -> Dict[str, int]:
+    """Return the number of listeners of every event bus of a device."""
+
+    counts = {
+        name: 0
+        for cls in reversed(type(device).__mro__)
+        for name, attr in vars(cls).items()
+        if isinstance(attr, EventChannel)
+    }
+    counts.update(
+        (name, len(attr))
+        for name, attr in vars(device).items()
+        if isinstance(attr, Bus)
+    )
+    return counts
+
+
+class TimerWheel:
+    """Hashed timer wheel running many timers from a single loop callback.
+
+    Timers are kept in `slots` buckets of `tick` seconds and fire on the first
+    tick after they are due. Scheduling, rescheduling and cancelling a timer
+    are O(1) and don't touch the scheduler of the event loop, which only runs
+    one callback per tick while there are timers. Timers shorter than a tick
+    are left to the event loop.
+    """
+
+    def __init__(
+        self,
+        tick: float = 1.0,
+        slots: int = 512,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        """Init."""
+        self.tick = tick
+        self._loop = loop or asyncio.get_running_loop()
+        self._slots: List[Dict[Hashable, Tuple[int, Callable[[], Any]]]] = [
+            {} for _ in range(slots)
+        ]
+        # key -> slot of the timer
+        self._timers: Dict[Hashable, int] = {}
+        # key -> loop handle of the timers shorter than a tick
+        self._short_timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._ticks_done = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        """Return the number of scheduled timers."""
+        return len(self._timers) + len(self._short_timers)
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Any]):
+        """Call the callback after delay seconds, replacing the timer of the key."""
+
+        self.cancel(key)
+        if delay < self.tick:
+            self._short_timers[key] = self._loop.call_later(
+                delay, self._fire, key, callback
+            )
+            return
+
+        due = math.ceil((self._loop.time() + delay) / self.tick)
+        slot = due % len(self._slots)
+        self._slots[slot][key] = (due, callback)
+        self._timers[key] = slot
+        if self._handle is None:
+            self._ticks_done = math.floor(self._loop.time() / self.tick)
+            self._schedule_tick()
+
+    def cancel(self, key: Hashable) -> None:
+        """Cancel the timer of the key, if any."""
+
+        slot = self._timers.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+            return
+
+        handle = self._short_timers.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _fire(self, key: Hashable, callback: Callable[[], Any]) -> None:
+        """Fire a short timer."""
+        del self._short_timers[key]
+        callback()
+
+    def _schedule_tick(self) -> None:
+        """Run the next tick on the event loop."""
+        self._handle = self._loop.call_at(
+            (self._ticks_done + 1) * self.tick, self._run_ticks
+        )
+
+    def _run_ticks(self) -> None:
+        """Fire the timers due up to now."""
+
+        # the loop may run the callback slightly before the tick
+        now = max(math.floor(self._loop.time() / self.tick), self._ticks_done + 1)
+        while self._ticks_done < now:
+            self._ticks_done += 1
+            bucket = self._slots[self._ticks_done % len(self._slots)]
+            due = [
+                (key, callback)
+                for key, (tick, callback) in bucket.items()
+                if tick <= self._ticks_done
+            ]
+            for key, callback in due:
+                del bucket[key]
+                del self._timers[key]
+            for key, callback in due:
+                try:
+                    callback()
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error running timer %s", key)
+
+        if self._timers:
+            self._schedule_tick()
+        else:
+            self._handle = None
+
+
+_TIMER_WHEELS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Return the timer wheel shared by the clusters of the running loop."""
+
+    loop = asyncio.get_running_loop()
+    try:
+        return _TIMER_WHEELS[loop]
+    except KeyError:
+        wheel = _TIMER_WHEELS[loop] = TimerWheel(loop=loop)
+        return wheel
+
+
+class MultiPressDetector:
+    """Derive multiple press events from the single presses of buttons.
+
+    Presses of a button less than `threshold` seconds apart are counted and
+    `callback(button, press_type, data)` is called once the button wasn't
+    pressed for `threshold` seconds, with the press type mapped from the count
+    by `press_types` and the data of the last press. Counts above the highest
+    mapped count use its press type. Pressing another button reports the
+    presses counted so far right away. Keep a detector per device, so presses
+    on one remote don't interfere with another.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Hashable, str, Any], None],
+        press_types: Dict[int, str],
+        threshold: float = 0.3,
+    ):
+        """Init."""
+        self.threshold = threshold
+        self._callback = callback
+        self._press_types = press_types
+        self._max_count = max(press_types)
+        # button: (press count, data of the last press, timer)
+        self._pending: Dict[Hashable, Tuple[int, Any, asyncio.TimerHandle]] = {}
+
+    def press(self, button: Hashable, data: Any = None) -> None:
+        """Count a press of the button."""
+
+        count = 1
+        for other in list(self._pending):
+            if other == button:
+                count, _, handle = self._pending.pop(button)
+                handle.cancel()
+                count += 1
+            else:
+                self._fire(other)
+
+        handle = asyncio.get_running_loop().call_later(
+            self.threshold, self._fire, button
+        )
+        self._pending[button] = (count, data, handle)
+
+    def cancel(self) -> None:
+        """Drop the presses counted so far."""
+        for _, _, handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+
+    def _fire(self, button: Hashable) -> None:
+        count, data, handle = self._pending.pop(button)
+        handle.cancel()
+        press_type = self._press_types.get(count)
+        if press_type is None and count > self._max_count:
+            press_type = self._press_types[self._max_count]
+        if press_type is not None:
+            self._callback(button, press_type, data)
+
+
+FRAME_TRACE_SIZE = 32
+
+
+class FrameRecord(NamedTuple):
+    """Frame recorded in the trace of a device."""
+
+    timestamp: float
+    endpoint_id: int
+    cluster_id: int
+    command_id: int
+    dp: Optional[int] = None
+    value: Any = None
+
+
+class FrameTrace:
+    """Fixed size ring buffer of the last frames decoded for a device.
+
+    Recording a frame only appends a tuple of the decoded fields, nothing is
+    formatted until the trace is dumped, so clusters can record every frame
+    while debug logging is off and the last frames of a misbehaving device
+    are still available for diagnostics. The oldest frame is dropped once
+    `size` frames are recorded.
+    """
+
+    __slots__ = ("_records",)
+
+    def __init__(self, size: int = FRAME_TRACE_SIZE):
+        """Init."""
+        self._records: "collections.deque[tuple]" = collections.deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of recorded frames."""
+        return len(self._records)
+
+    def record(
+        self,
+        endpoint_id: int,
+        cluster_id: int,
+        command_id: int,
+        dp: Optional[int] = None,
+        value: Any = None,
+    ) -> None:
+        """Record a frame."""
+        self._records.append(
+            (time.time(), endpoint_id, cluster_id, command_id, dp, value)
+        )
+
+    def clear(self) -> None:
+        """Drop the recorded frames."""
+        self._records.clear()
+
+    def dump(self) -> List[FrameRecord]:
+        """Return the recorded frames, oldest first."""
+        return [FrameRecord(*record) for record in self._records]
+
+    def format(self) -> List[str]:
+        """Return a line per recorded frame, oldest first."""
+        return [
+            f"{datetime.datetime.fromtimestamp(rec.timestamp).isoformat()}"
+            f" {rec.endpoint_id}/0x{rec.cluster_id:04x} cmd 0x{rec.command_id:02x}"
+            + ("" if rec.dp is None else f" dp {rec.dp}")
+            + ("" if rec.value is None else f" {rec.value!r}")
+            for rec in self.dump()
+        ]
+
+
+def get_frame_trace(device: zigpy.device.Device) -> FrameTrace:
+    """Return the frame trace of the device, creating it on first use."""
+
+    try:
+        return device.__dict__["_frame_trace"]
+    except KeyError:
+        trace = device.__dict__["_frame_trace"] = FrameTrace()
+        return trace
+
+
+def dump_frame_trace(device: zigpy.device.Device) -> List[FrameRecord]:
+    """Return the frames recorded for the device, oldest first."""
+
+    trace = device.__dict__.get("_frame_trace")
+    return trace.dump() if trace is not None else []
 
 
 class LocalDataCluster(CustomCluster):
@@ -233,14 +628,11 @@ class _Motion(CustomCluster, IasZone):
 
     reset_s: int = 30
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        super().__init__(*args, **kwargs)
-        self._loop = asyncio.get_running_loop()
-        self._timer_handle = None
+    def _schedule_reset(self):
+        """Turn the motion off in reset_s seconds, unless reset again before."""
+        get_timer_wheel().schedule(self, self.reset_s, self._turn_off)
 
     def _turn_off(self):
-        self._timer_handle = None
         _LOGGER.debug("%s - Resetting motion sensor", self.endpoint.device.ieee)
         self.listener_event(CLUSTER_COMMAND, 253, ZONE_STATE, [OFF, 0, 0, 0])
         self._update_attribute(ZONE_STATE, OFF)
@@ -265,9 +657,7 @@ class MotionWithReset(_Motion):
     ):
         """Handle the cluster command."""
         if hdr.command_id == ZONE_STATE:
-            if self._timer_handle:
-                self._timer_handle.cancel()
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._schedule_reset()
             if self.send_occupancy_event:
                 self.endpoint.device.occupancy_bus.listener_event(OCCUPANCY_EVENT)
 
@@ -289,10 +679,7 @@ class MotionOnEvent(_Motion):
 
         _LOGGER.debug("%s - Received motion event message", self.endpoint.device.ieee)
 
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self._schedule_reset()
 
 
 class _Occupancy(CustomCluster, OccupancySensing):
@@ -300,14 +687,11 @@ class _Occupancy(CustomCluster, OccupancySensing):
 
     reset_s: int = 600
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        super().__init__(*args, **kwargs)
-        self._timer_handle = None
-        self._loop = asyncio.get_running_loop()
+    def _schedule_reset(self):
+        """Turn the occupancy off in reset_s seconds, unless reset again before."""
+        get_timer_wheel().schedule(self, self.reset_s, self._turn_off)
 
     def _turn_off(self):
-        self._timer_handle = None
         self._update_attribute(OCCUPANCY_STATE, OFF)
 
 
@@ -323,10 +707,7 @@ class OccupancyOnEvent(_Occupancy):
         """Occupancy event."""
         self._update_attribute(OCCUPANCY_STATE, ON)
 
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self._schedule_reset()
 
 
 class OccupancyWithReset(_Occupancy):
@@ -336,10 +717,8 @@ class OccupancyWithReset(_Occupancy):
         super()._update_attribute(attrid, value)
 
         if attrid == OCCUPANCY_STATE and value == ON:
-            if self._timer_handle:
-                self._timer_handle.cancel()
             self.endpoint.device.motion_bus.listener_event(MOTION_EVENT)
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._schedule_reset()
 
 
 class QuickInitDevice(CustomDevice):
@@ -391,13 +770,19 @@ class QuickInitDevice(CustomDevice):
 def setup(config: Optional[Dict[str, Any]] = None) -> None:
     """Register all quirks with zigpy, including optional custom quirks."""
 
-    # Import all quirks in the `zhaquirks` package first
-    for importer, modname, ispkg in pkgutil.walk_packages(
-        path=__path__,
-        prefix=__name__ + ".",
-    ):
-        _LOGGER.debug("Loading quirks module %s", modname)
-        importlib.import_module(modname)
+    from zhaquirks.registry import setup_lazy
+
+    # Import quirk modules from the quirk index only when a device needs them
+    if config and config.get(LAZY_QUIRKS_LOADING) and setup_lazy():
+        _LOGGER.debug("Loading quirks lazily from the quirk index")
+    else:
+        # Import all quirks in the `zhaquirks` package first
+        for importer, modname, ispkg in pkgutil.walk_packages(
+            path=__path__,
+            prefix=__name__ + ".",
+        ):
+            _LOGGER.debug("Loading quirks module %s", modname)
+            importlib.import_module(modname)
 
     # Treat the custom quirk path (e.g. `/config/custom_quirks/`) itself as a module
     if config and config.get(CUSTOM_QUIRKS_PATH):
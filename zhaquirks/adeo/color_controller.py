@@ -19,7 +19,7 @@ from zigpy.zcl.clusters.homeautomation import Diagnostic
 from zigpy.zcl.clusters.lighting import Color
 from zigpy.zcl.clusters.lightlink import LightLink
 
-from zhaquirks import Bus, EventableCluster
+from zhaquirks import EventableCluster, EventChannel
 from zhaquirks.const import (
     ARGS,
     BUTTON_1,
@@ -108,10 +108,7 @@ class AdeoScenesCluster(Scenes, EventableCluster):
 class AdeoColorController(CustomDevice):
     """Custom device representing ADEO color controller."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.scenes_bus = Bus()
-        super().__init__(*args, **kwargs)
+    scenes_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=2048
@@ -72,6 +72,7 @@ ALT_DOUBLE_PRESS = "remote_button_alt_double_press"
 ENDPOINT_ID = "endpoint_id"
 ENDPOINTS = SIG_ENDPOINTS
 INPUT_CLUSTERS = SIG_EP_INPUT
+LAZY_QUIRKS_LOADING = "lazy_quirks_loading"
 LEFT = "left"
 LONG_PRESS = "remote_button_long_press"
 LONG_RELEASE = "remote_button_long_release"
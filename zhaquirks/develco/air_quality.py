@@ -16,7 +16,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.measurement import RelativeHumidity, TemperatureMeasurement
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -165,12 +165,9 @@ class EmulatedVOCMeasurement(LocalDataCluster):
 class AQSZB110(CustomDevice):
     """Custom device Develco air quality sensor."""
 
-    manufacturer_id_override = MANUFACTURER
+    voc_bus = EventChannel()
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.voc_bus = Bus()
-        super().__init__(*args, **kwargs)
+    manufacturer_id_override = MANUFACTURER
 
     signature = {
         # <SimpleDescriptor endpoint=1 profile=49353 device_type=1 device_version=1
@@ -4,7 +4,7 @@ from zigpy.quirks import CustomCluster, CustomDevice
 from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 from zigpy.zcl.clusters.hvac import Thermostat, UserInterface
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 
 ELKO = "ELKO"
 
@@ -67,9 +67,6 @@ class ElkoElectricalMeasurementCluster(LocalDataCluster, ElectricalMeasurement):
 class ElkoThermostat(CustomDevice):
     """Generic Elko Thermostat device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.thermostat_bus = Bus()
-        self.ui_bus = Bus()
-        self.power_bus = Bus()
-        super().__init__(*args, **kwargs)
+    thermostat_bus = EventChannel()
+    ui_bus = EventChannel()
+    power_bus = EventChannel()
@@ -18,7 +18,7 @@ from zigpy.zcl.clusters.general import (
 from zigpy.zcl.clusters.hvac import Fan
 from zigpy.zcl.clusters.measurement import PM25, IlluminanceMeasurement
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -140,12 +140,9 @@ class PM25Cluster(CustomCluster, PM25):
 class IkeaSTARKVIND(CustomDevice):
     """STARKVIND Air purifier by IKEA of Sweden."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.pm25_bus = Bus()
-        self.change_fan_mode_bus = Bus()
-        self.change_fan_mode_ha_bus = Bus()
-        super().__init__(*args, **kwargs)
+    pm25_bus = EventChannel()
+    change_fan_mode_bus = EventChannel()
+    change_fan_mode_ha_bus = EventChannel()
 
     signature = {
         # <SimpleDescriptor endpoint=1 profile=260 device_type=7 (0x0007)
@@ -0,0 +1,232 @@
+"""Opt-in call counts and latency histograms for quirk clusters.
+
+Nothing is measured until :func:`enable` is called: it wraps the hot path
+methods of the instrumented cluster classes and all their subclasses, and
+:func:`disable` puts the original methods back, so quirks run unchanged while
+instrumentation is off. Calls are recorded per device, endpoint, cluster and
+method and can be queried at runtime with :func:`get_stats`::
+
+    from zhaquirks import instrumentation
+
+    instrumentation.enable()
+    ...
+    for (ieee, endpoint_id, cluster_id, method), stats in sorted(
+        instrumentation.get_stats().items(), key=lambda item: -item[1].count
+    ):
+        print(ieee, endpoint_id, hex(cluster_id), method, stats.count, stats.mean_us)
+
+Cluster classes created while instrumentation is enabled, e.g. by quirk
+modules imported lazily, are instrumented as they are created.
+"""
+import bisect
+import contextvars
+import dataclasses
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import zigpy.types as t
+
+INSTRUMENTED_METHODS = (
+    "handle_cluster_request",
+    "_update_attribute",
+    "deserialize",
+    "command",
+)
+
+# upper bounds of the latency histogram buckets in microseconds, the last
+# bucket counts the slower calls
+LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+StatsKey = Tuple[Optional[t.EUI64], Optional[int], int, str]
+
+_MISSING = object()
+
+
+@dataclasses.dataclass
+class MethodStats:
+    """Calls of a method of a cluster."""
+
+    count: int = 0
+    errors: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    buckets: List[int] = dataclasses.field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_US) + 1)
+    )
+
+    @property
+    def mean_us(self) -> float:
+        """Mean latency in microseconds."""
+        return self.total_ns / self.count / 1000 if self.count else 0
+
+    def histogram(self) -> List[Tuple[float, int]]:
+        """Return the bucket upper bounds in microseconds and their counts."""
+        return list(zip(LATENCY_BUCKETS_US + (float("inf"),), self.buckets))
+
+    def record(self, elapsed_ns: int, failed: bool) -> None:
+        """Record a call."""
+        self.count += 1
+        self.errors += failed
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_US, elapsed_ns / 1000)] += 1
+
+
+_stats: Dict[StatsKey, MethodStats] = {}
+# (class, method name, method defined on the class before it was wrapped)
+_patched: List[Tuple[type, str, Any]] = []
+# the cluster a wrapped method runs for, so methods calling the implementation
+# of a base class through super() are only measured once, while calls made on
+# other clusters, e.g. through a device bus, are still measured
+_active: Dict[str, contextvars.ContextVar] = {}
+
+
+def _record(cluster: Any, method: str, start: int, failed: bool) -> None:
+    elapsed = time.perf_counter_ns() - start
+    endpoint = getattr(cluster, "_endpoint", None)
+    device = getattr(endpoint, "device", None)
+    key = (
+        getattr(device, "ieee", None),
+        getattr(endpoint, "endpoint_id", None),
+        cluster.cluster_id,
+        method,
+    )
+    stats = _stats.get(key)
+    if stats is None:
+        stats = _stats[key] = MethodStats()
+    stats.record(elapsed, failed)
+
+
+def _wrap(method: str, func: Callable) -> Callable:
+    active = _active[method]
+
+    async def _measure_awaitable(cluster, awaitable, start):
+        token = active.set(cluster)
+        failed = True
+        try:
+            result = await awaitable
+            failed = False
+            return result
+        finally:
+            active.reset(token)
+            _record(cluster, method, start, failed)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if active.get() is self:
+            return func(self, *args, **kwargs)
+
+        token = active.set(self)
+        start = time.perf_counter_ns()
+        try:
+            result = func(self, *args, **kwargs)
+        except BaseException:
+            _record(self, method, start, True)
+            raise
+        finally:
+            active.reset(token)
+
+        if inspect.isawaitable(result):
+            return _measure_awaitable(self, result, start)
+        _record(self, method, start, False)
+        return result
+
+    wrapper.__instrumented__ = func
+    return wrapper
+
+
+def _subclasses(cls: type) -> Iterable[type]:
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _subclasses(subclass)
+
+
+def default_cluster_classes() -> List[type]:
+    """Return the cluster base classes instrumented by default, all quirk clusters."""
+
+    from zigpy.quirks import CustomCluster
+
+    return [CustomCluster]
+
+
+def _instrument(cls: type, methods: Tuple[str, ...]) -> None:
+    for method in methods:
+        func = getattr(cls, method, None)
+        if not inspect.isfunction(func):
+            continue
+        if hasattr(cls.__dict__.get(method), "__instrumented__"):
+            continue
+        # subclasses not overriding the method wrap the original too
+        func = getattr(func, "__instrumented__", func)
+        _patched.append((cls, method, cls.__dict__.get(method, _MISSING)))
+        setattr(cls, method, _wrap(method, func))
+
+
+def _instrument_subclasses(root: type, methods: Tuple[str, ...]) -> None:
+    """Instrument the subclasses of root created until instrumentation is disabled."""
+
+    original = root.__dict__.get("__init_subclass__", _MISSING)
+
+    def __init_subclass__(cls, **kwargs):
+        if original is _MISSING:
+            super(root, cls).__init_subclass__(**kwargs)
+        else:
+            original.__get__(None, cls)(**kwargs)
+        _instrument(cls, methods)
+
+    _patched.append((root, "__init_subclass__", original))
+    root.__init_subclass__ = classmethod(__init_subclass__)
+
+
+def enable(
+    cluster_classes: Optional[Iterable[type]] = None,
+    methods: Iterable[str] = INSTRUMENTED_METHODS,
+) -> None:
+    """Measure the methods of the cluster classes and all their subclasses."""
+
+    if _patched:
+        disable()
+
+    if cluster_classes is None:
+        cluster_classes = default_cluster_classes()
+    methods = tuple(methods)
+    for method in methods:
+        _active.setdefault(method, contextvars.ContextVar(method, default=None))
+
+    for root in cluster_classes:
+        for cls in _subclasses(root):
+            _instrument(cls, methods)
+        _instrument_subclasses(root, methods)
+
+
+def disable() -> None:
+    """Put the original methods back, the statistics are kept."""
+
+    while _patched:
+        cls, method, original = _patched.pop()
+        if original is _MISSING:
+            delattr(cls, method)
+        else:
+            setattr(cls, method, original)
+
+
+def is_enabled() -> bool:
+    """Return True if the cluster methods are measured."""
+    return bool(_patched)
+
+
+def get_stats(ieee: Optional[t.EUI64] = None) -> Dict[StatsKey, MethodStats]:
+    """Return the statistics of all devices, or of a single device."""
+
+    return {
+        key: dataclasses.replace(stats, buckets=list(stats.buckets))
+        for key, stats in _stats.items()
+        if ieee is None or key[0] == ieee
+    }
+
+
+def reset() -> None:
+    """Drop all statistics."""
+    _stats.clear()
@@ -5,7 +5,7 @@ from zigpy.quirks import CustomDevice
 from zigpy.zcl.clusters.general import Basic, Identify, PowerConfiguration
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus, PowerConfigurationCluster
+from zhaquirks import EventChannel, PowerConfigurationCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -22,10 +22,7 @@ KONKE_CLUSTER_ID = 0xFCC0
 class KonkeMotion(CustomDevice):
     """Custom device representing konke motion sensors."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.occupancy_bus = Bus()
-        super().__init__(*args, **kwargs)
+    occupancy_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=1026
@@ -73,10 +70,7 @@ class KonkeMotion(CustomDevice):
 class KonkeMotionB(CustomDevice):
     """Custom device representing konke motion sensors."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.occupancy_bus = Bus()
-        super().__init__(*args, **kwargs)
+    occupancy_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=1026
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 
 import zigpy
@@ -27,6 +28,7 @@ from zhaquirks.const import (
     OUTPUT_CLUSTERS,
     PROFILE_ID,
 )
+from zhaquirks.tuya import get_spell_scheduler
 from zhaquirks.tuya.ts011f_plug import Plug_3AC_4USB
 
 _LOGGER = logging.getLogger(__name__)
@@ -54,13 +56,13 @@ async def cast_tuya_magic_spell_task(
         0xFFFE,
     ]
     if "tries" in inspect.getfullargspec(basic_cluster.read_attributes)[0]:
-        _LOGGER.debug(f"Cast Tuya Magic Spell on {dev.ieee!r} with {tries} tries")
+        _LOGGER.debug("Cast Tuya Magic Spell on %r with %s tries", dev.ieee, tries)
         res = await basic_cluster.read_attributes(attr_to_read, tries=tries)
     else:
-        _LOGGER.debug(f"Cast Tuya Magic Spell on {dev.ieee!r}")
+        _LOGGER.debug("Cast Tuya Magic Spell on %r", dev.ieee)
         res = await basic_cluster.read_attributes(attr_to_read)
 
-    _LOGGER.debug(f"Tuya Magic Spell result {res!r} for {dev.ieee!r}")
+    _LOGGER.debug("Tuya Magic Spell result %r for %r", res, dev.ieee)
 
     # Magic spell - part 2 (skipped - does not seem to be needed)
     # attr_to_write={0xffde:13}
@@ -73,9 +75,9 @@ async def cast_tuya_magic_spell_task(
         # the discovery of the endpoints that appear after the magic trick
 
         # Note: this is not validated yet and disabled by default
-        _LOGGER.debug(f"Send leave with rejoin request to {dev.ieee!r}")
+        _LOGGER.debug("Send leave with rejoin request to %r", dev.ieee)
         res = await dev.zdo.request(0x0034, dev.ieee, 0x01, tries)
-        _LOGGER.debug(f"Leave with rejoin result {res!r} for {dev.ieee!r}")
+        _LOGGER.debug("Leave with rejoin result %r for %r", res, dev.ieee)
 
         app = dev.application
         # Delete the device from the database
@@ -90,8 +92,8 @@ def cast_tuya_magic_spell(dev: zigpy.device.Device, tries: int = 3) -> None:
 
     # Note for sleepy devices the number of tries may need to be increased to 100.
 
-    dev._magic_spell_task = asyncio.create_task(
-        cast_tuya_magic_spell_task(dev, tries=tries)
+    dev._magic_spell_task = get_spell_scheduler().cast(
+        dev, functools.partial(cast_tuya_magic_spell_task, dev, tries=tries)
     )
 
 
@@ -113,7 +115,7 @@ class TuyaBasicCluster(CustomCluster, Basic):
         """Bind cluster."""
 
         _LOGGER.debug(
-            f"Requesting Tuya Magic Spell for {self.ieee!r} in basic bind method"
+            "Requesting Tuya Magic Spell for %r in basic bind method", self.ieee
         )
         tries = 3
         await asyncio.create_task(cast_tuya_magic_spell_task(self, tries=tries))
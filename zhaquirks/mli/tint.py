@@ -16,7 +16,7 @@ from zigpy.zcl.clusters.general import (
 from zigpy.zcl.clusters.lighting import Color
 from zigpy.zcl.clusters.lightlink import LightLink
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -72,10 +72,7 @@ class TintRemoteBasicCluster(CustomCluster, Basic):
 class TintRemote(CustomDevice):
     """Tint remote quirk."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.scene_bus = Bus()
-        super().__init__(*args, **kwargs)
+    scene_bus = EventChannel()
 
     signature = {
         # endpoint=1 profile=260 device_type=2048 device_version=1 input_clusters=[0, 3, 4096]
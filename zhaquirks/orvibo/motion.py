@@ -14,7 +14,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus, PowerConfigurationCluster
+from zhaquirks import EventChannel, PowerConfigurationCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -31,10 +31,7 @@ ORVIBO_CLUSTER_ID = 0xFFFF
 class SN10ZW(CustomDevice):
     """SN10ZW motion sensor."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.occupancy_bus = Bus()
-        super().__init__(*args, **kwargs)
+    occupancy_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=1026
@@ -0,0 +1,336 @@
+"""Prebuilt quirk index and lazy quirk registration.
+
+Importing every quirk module up front is the most expensive part of
+``zhaquirks.setup()``. The quirk index maps each (manufacturer, model) pair
+to the modules defining a matching quirk, so quirk modules can be imported
+only when zigpy looks up a device with that manufacturer and model.
+
+Regenerate the index after adding or changing quirk signatures with::
+
+    python -m zhaquirks.registry
+
+The signature index compiles the endpoint signatures of registered quirks,
+so the quirk matching a device is found with a few dict lookups instead of
+comparing the device against every candidate quirk.
+"""
+import collections
+import importlib
+import json
+import logging
+import pathlib
+import pkgutil
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from zigpy.const import (
+    SIG_ENDPOINTS,
+    SIG_EP_INPUT,
+    SIG_EP_OUTPUT,
+    SIG_EP_PROFILE,
+    SIG_EP_TYPE,
+    SIG_MANUFACTURER,
+    SIG_MODEL,
+)
+import zigpy.device
+import zigpy.quirks
+from zigpy.quirks.registry import DeviceRegistry
+
+_LOGGER = logging.getLogger(__name__)
+
+QUIRK_INDEX_PATH = pathlib.Path(__file__).parent / "quirk_index.json"
+QUIRK_INDEX_VERSION = 1
+
+PACKAGE_NAME = "zhaquirks"
+
+IndexKey = Tuple[Optional[str], Optional[str]]
+# endpoint id, input cluster ids and output cluster ids of every endpoint
+EndpointsShape = FrozenSet[Tuple[int, FrozenSet[int], FrozenSet[int]]]
+
+
+def build_quirk_index() -> Dict[str, Any]:
+    """Import all quirk modules and build the quirk index from their signatures."""
+
+    package = importlib.import_module(PACKAGE_NAME)
+    modules = []
+    for _, modname, _ in pkgutil.walk_packages(
+        path=package.__path__, prefix=PACKAGE_NAME + "."
+    ):
+        importlib.import_module(modname)
+        modules.append(modname)
+
+    quirks: Dict[IndexKey, List[str]] = collections.defaultdict(list)
+    for manufacturer, models in zigpy.quirks._DEVICE_REGISTRY.registry.items():
+        for model, quirk_list in models.items():
+            for quirk in quirk_list:
+                if quirk.__module__ not in modules:
+                    continue
+                if quirk.__module__ not in quirks[manufacturer, model]:
+                    quirks[manufacturer, model].append(quirk.__module__)
+
+    # modules with side effects other than registering quirks, e.g. handlers
+    # for messages from devices which are not initialized yet
+    eager = {
+        handler.__module__
+        for handler in zigpy.quirks._uninitialized_device_message_handlers
+        if handler.__module__ in modules
+    }
+
+    return {
+        "version": QUIRK_INDEX_VERSION,
+        "modules": modules,
+        "eager": sorted(eager),
+        "quirks": [
+            [manufacturer, model, sorted(quirk_modules, key=modules.index)]
+            for (manufacturer, model), quirk_modules in sorted(
+                quirks.items(), key=lambda item: (item[0][0] or "", item[0][1] or "")
+            )
+            if quirk_modules
+        ],
+    }
+
+
+def write_quirk_index(path: pathlib.Path = QUIRK_INDEX_PATH) -> None:
+    """Build the quirk index and write it to disk."""
+
+    index = build_quirk_index()
+    path.write_text(json.dumps(index, indent=1) + "\n")
+
+
+def load_quirk_index(path: pathlib.Path = QUIRK_INDEX_PATH) -> Optional[Dict]:
+    """Load the quirk index from disk, None if it is missing or unusable."""
+
+    try:
+        index = json.loads(path.read_text())
+    except (OSError, ValueError) as exc:
+        _LOGGER.warning("Couldn't load quirk index %s: %s", path, exc)
+        return None
+
+    if index.get("version") != QUIRK_INDEX_VERSION:
+        _LOGGER.warning("Unsupported quirk index version in %s", path)
+        return None
+
+    return index
+
+
+class _LazyModelQuirks(collections.defaultdict):
+    """Model to quirk list mapping, importing quirk modules on first lookup."""
+
+    def __init__(self, loader: "LazyQuirkLoader", manufacturer: Optional[str]):
+        """Init."""
+        super().__init__(list)
+        self._loader = loader
+        self._manufacturer = manufacturer
+
+    def __getitem__(self, model: Optional[str]) -> List:
+        """Return quirks for the model, importing their modules if needed."""
+        self._loader.load(self._manufacturer, model)
+        return super().__getitem__(model)
+
+
+class _LazyManufacturerQuirks(collections.defaultdict):
+    """Manufacturer to model mapping of the lazy quirk registry."""
+
+    def __init__(self, loader: "LazyQuirkLoader"):
+        """Init."""
+        super().__init__()
+        self._loader = loader
+
+    def __missing__(self, manufacturer: Optional[str]) -> _LazyModelQuirks:
+        """Create the model mapping for a new manufacturer."""
+        models = self[manufacturer] = _LazyModelQuirks(self._loader, manufacturer)
+        return models
+
+
+class LazyQuirkLoader:
+    """Import quirk modules from the quirk index when zigpy asks for them."""
+
+    def __init__(
+        self, index: Dict[str, Any], registry: Optional[DeviceRegistry] = None
+    ):
+        """Init."""
+        self._registry = registry or zigpy.quirks._DEVICE_REGISTRY
+        self._eager = index["eager"]
+        self._rank = {modname: rank for rank, modname in enumerate(index["modules"])}
+        self._modules: Dict[IndexKey, List[str]] = {
+            (manufacturer, model): modules
+            for manufacturer, model, modules in index["quirks"]
+        }
+        self._loaded = set()
+        self._loading = 0
+
+    def install(self) -> None:
+        """Replace the registry mapping, keeping already registered quirks."""
+
+        lazy_registry = _LazyManufacturerQuirks(self)
+        for manufacturer, models in self._registry.registry.items():
+            lazy_models = lazy_registry[manufacturer]
+            for model, quirks in models.items():
+                dict.__setitem__(lazy_models, model, list(quirks))
+        self._registry._registry = lazy_registry
+
+        for modname in self._eager:
+            self._import(modname)
+
+    def load(self, manufacturer: Optional[str], model: Optional[str]) -> None:
+        """Import all quirk modules indexed for the manufacturer and model."""
+
+        key = (manufacturer, model)
+        if self._loading or key in self._loaded:
+            return
+        self._loaded.add(key)
+
+        modules = self._modules.get(key)
+        if not modules:
+            return
+
+        for modname in modules:
+            self._import(modname)
+
+        # Keep the precedence of eager loading: quirks from modules imported
+        # later come first and custom quirks take priority over all of them
+        quirks = self._registry.registry[manufacturer].get(model)
+        if quirks:
+            quirks.sort(
+                key=lambda quirk: -self._rank.get(quirk.__module__, len(self._rank))
+            )
+
+    def load_all(self) -> None:
+        """Import the quirk modules of every manufacturer and model indexed."""
+
+        for manufacturer, model in self._modules:
+            self.load(manufacturer, model)
+
+    def _import(self, modname: str) -> None:
+        """Import a quirk module without triggering nested lazy loads."""
+
+        _LOGGER.debug("Lazy loading quirks module %s", modname)
+        self._loading += 1
+        try:
+            importlib.import_module(modname)
+        finally:
+            self._loading -= 1
+
+
+_ANY = object()
+
+
+class _CompiledSignature:
+    """Checks of a quirk signature not covered by the signature index key."""
+
+    __slots__ = ("quirk", "manufacturer", "model", "endpoint_types")
+
+    def __init__(self, quirk: Type[zigpy.quirks.CustomDevice]):
+        """Init."""
+        self.quirk = quirk
+        self.manufacturer = quirk.signature.get(SIG_MANUFACTURER, _ANY)
+        self.model = quirk.signature.get(SIG_MODEL, _ANY)
+        self.endpoint_types = tuple(
+            (eid, ep.get(SIG_EP_PROFILE), ep.get(SIG_EP_TYPE))
+            for eid, ep in quirk.signature[SIG_ENDPOINTS].items()
+            if ep.get(SIG_EP_PROFILE) is not None or ep.get(SIG_EP_TYPE) is not None
+        )
+
+    def matches(self, device: zigpy.device.Device) -> bool:
+        """Check the manufacturer, model, profiles and device types."""
+
+        if self.model is not _ANY and device.model != self.model:
+            return False
+        if self.manufacturer is not _ANY and device.manufacturer != self.manufacturer:
+            return False
+        for eid, profile_id, device_type in self.endpoint_types:
+            ep = device.endpoints[eid]
+            if profile_id is not None and ep.profile_id != profile_id:
+                return False
+            if device_type is not None and ep.device_type != device_type:
+                return False
+        return True
+
+
+class SignatureIndex:
+    """Index of registered quirks by their endpoint signature.
+
+    Quirks are keyed on the manufacturer and model they are registered for
+    and the endpoint ids with their input and output cluster ids, which must
+    all match exactly. Profiles and device types are checked on the few
+    quirks sharing a key, in the order zigpy considers them, so the quirk
+    returned is the one zigpy's registry would apply. The index is a snapshot
+    of the registry at the time it is built, all quirk modules of a lazy
+    registry are imported first.
+    """
+
+    def __init__(self, registry: Optional[DeviceRegistry] = None):
+        """Init."""
+        registry = registry or zigpy.quirks._DEVICE_REGISTRY
+        if isinstance(registry.registry, _LazyManufacturerQuirks):
+            registry.registry._loader.load_all()
+        self._index: Dict[
+            Tuple[Optional[str], Optional[str], EndpointsShape],
+            List[_CompiledSignature],
+        ] = collections.defaultdict(list)
+        compiled: Dict[type, _CompiledSignature] = {}
+
+        for manufacturer, models in registry.registry.items():
+            for model, quirks in models.items():
+                for quirk in quirks:
+                    endpoints = quirk.signature.get(SIG_ENDPOINTS)
+                    if endpoints is None:
+                        continue
+                    if quirk not in compiled:
+                        compiled[quirk] = _CompiledSignature(quirk)
+                    shape = frozenset(
+                        (
+                            eid,
+                            frozenset(ep.get(SIG_EP_INPUT, [])),
+                            frozenset(ep.get(SIG_EP_OUTPUT, [])),
+                        )
+                        for eid, ep in endpoints.items()
+                    )
+                    self._index[manufacturer, model, shape].append(compiled[quirk])
+
+        self._index = dict(self._index)
+        self.quirks = len(compiled)
+
+    def __len__(self) -> int:
+        """Return the number of index keys."""
+        return len(self._index)
+
+    @staticmethod
+    def endpoints_shape(device: zigpy.device.Device) -> EndpointsShape:
+        """Return the endpoint ids and cluster ids of the device."""
+        return frozenset(
+            (eid, frozenset(ep.in_clusters), frozenset(ep.out_clusters))
+            for eid, ep in device.endpoints.items()
+            if eid != 0
+        )
+
+    def get_quirk(
+        self, device: zigpy.device.Device
+    ) -> Optional[Type[zigpy.quirks.CustomDevice]]:
+        """Return the quirk zigpy would apply to the device, if any."""
+
+        shape = self.endpoints_shape(device)
+        manufacturer, model = device.manufacturer, device.model
+        for key in (
+            (manufacturer, model, shape),
+            (manufacturer, None, shape),
+            (None, model, shape),
+            (None, None, shape),
+        ):
+            for signature in self._index.get(key, ()):
+                if signature.matches(device):
+                    return signature.quirk
+        return None
+
+
+def setup_lazy(path: pathlib.Path = QUIRK_INDEX_PATH) -> bool:
+    """Register quirks lazily from the quirk index, False if it can't be used."""
+
+    index = load_quirk_index(path)
+    if index is None:
+        return False
+
+    LazyQuirkLoader(index).install()
+    return True
+
+
+if __name__ == "__main__":
+    write_quirk_index()
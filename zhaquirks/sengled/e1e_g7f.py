@@ -15,7 +15,7 @@ from zigpy.zcl.clusters.general import (
     PowerConfiguration,
 )
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     COMMAND,
     COMMAND_OFF,
@@ -140,13 +140,8 @@ class SengledE1EG7FManufacturerSpecificCluster(CustomCluster):
 class SengledE1EG7F(CustomDevice):
     """Sengled E1E-G7F device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-
-        self.on_off_bus = Bus()
-        self.level_control_bus = Bus()
-
-        super().__init__(*args, **kwargs)
+    on_off_bus = EventChannel()
+    level_control_bus = EventChannel()
 
     signature = {
         MODELS_INFO: [("sengled", "E1E-G7F")],
@@ -5,7 +5,7 @@ from zigpy.profiles import zha
 from zigpy.quirks import CustomDevice
 from zigpy.zcl.clusters.general import Basic, BinaryInput, Identify, Ota, PollControl
 
-from zhaquirks import Bus, LocalDataCluster, PowerConfigurationCluster
+from zhaquirks import EventChannel, LocalDataCluster, PowerConfigurationCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -70,10 +70,7 @@ class TrackingCluster(LocalDataCluster, BinaryInput):
 class SmartThingsTagV4(CustomDevice):
     """Custom device representing smartthings tagV4 sensors."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.tracking_bus = Bus()
-        super().__init__(*args, **kwargs)
+    tracking_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=12
@@ -1,9 +1,29 @@
 """Tuya devices."""
+import asyncio
+import collections
 import dataclasses
 import datetime
+import functools
 import logging
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import math
+import random
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import weakref
 
+import zigpy.device
+from zigpy.exceptions import ZigbeeException
 from zigpy.quirks import CustomCluster, CustomDevice
 import zigpy.types as t
 from zigpy.zcl import foundation
@@ -13,13 +33,21 @@ from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 from zigpy.zcl.clusters.hvac import Thermostat, UserInterface
 from zigpy.zcl.clusters.smartenergy import Metering
 
-from zhaquirks import Bus, EventableCluster, LocalDataCluster
+from zhaquirks import (
+    Bus,
+    EventableCluster,
+    EventChannel,
+    LocalDataCluster,
+    MultiPressDetector,
+    get_frame_trace,
+)
 from zhaquirks.const import (
     DOUBLE_PRESS,
     LEFT,
     LONG_PRESS,
     RIGHT,
     SHORT_PRESS,
+    TRIPLE_PRESS,
     ZHA_SEND_EVENT,
 )
 
@@ -47,6 +75,7 @@ TUYA_LEVEL_COMMAND = 514
 COVER_EVENT = "cover_event"
 LEVEL_EVENT = "level_event"
 TUYA_MCU_COMMAND = "tuya_mcu_command"
+TUYA_MCU_SET_DATAPOINTS = "tuya_mcu_set_datapoints"
 
 # Rotating for remotes
 STOP = "stop"  # To constans
@@ -202,6 +231,9 @@ class TuyaDPType(t.enum8):
     BITMAP = 0x05
 
 
+TUYA_BITMAP_TYPES = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
+
+
 class TuyaData(t.Struct):
     """Tuya Data type."""
 
@@ -209,20 +241,59 @@ class TuyaData(t.Struct):
     function: t.uint8_t
     raw: t.LVBytes
 
+    # (raw, dp_type, payload) of the last decoded payload
+    _payload_cache = None
+
     @classmethod
     def deserialize(cls, data: bytes) -> Tuple["TuyaData", bytes]:
         """Deserialize data."""
-        res = cls()
-        res.dp_type, data = TuyaDPType.deserialize(data)
-        res.function, data = t.uint8_t.deserialize(data)
-        res.raw, data = t.LVBytes.deserialize(data)
-        if res.dp_type not in (TuyaDPType.BITMAP, TuyaDPType.STRING, TuyaDPType.ENUM):
-            res.raw = res.raw[::-1]
-        return res, data
+        view = memoryview(data)
+        if len(view) < 3:
+            raise ValueError(f"Data is too short to contain {cls.__name__}")
+        end = 3 + view[2]
+        if len(view) < end:
+            raise ValueError(f"Data is too short to contain {view[2]} bytes")
+
+        # fields are set directly, skipping the generic Struct constructor
+        res = object.__new__(cls)
+        res.dp_type = dp_type = TuyaDPType(view[0])
+        res.function = t.uint8_t(view[1])
+        value = view[3:end]
+
+        # tuya values are big endian, decode them while the bytes are at hand
+        length = end - 3
+        if dp_type == TuyaDPType.VALUE and length == 4:
+            payload = t.uint32_t(int.from_bytes(value, "big"))
+        elif dp_type == TuyaDPType.BOOL and length == 1:
+            payload = t.Bool(value[0])
+        elif dp_type == TuyaDPType.ENUM and length == 1:
+            payload = t.enum8(value[0])
+        elif dp_type == TuyaDPType.BITMAP and length in TUYA_BITMAP_TYPES:
+            payload = TUYA_BITMAP_TYPES[length](int.from_bytes(value, "little"))
+        else:
+            payload = None
+
+        if dp_type not in (TuyaDPType.BITMAP, TuyaDPType.STRING, TuyaDPType.ENUM):
+            value = value[::-1]
+        res.raw = t.LVBytes(value)
+        if payload is not None:
+            res._payload_cache = (res.raw, dp_type, payload)
+
+        return res, data[end:]
 
     @property
     def payload(self) -> Union[t.Bool, t.CharacterString, t.uint32_t, t.data32]:
         """Payload accordingly to data point type."""
+        cache = self._payload_cache
+        if cache is not None and cache[0] is self.raw and cache[1] is self.dp_type:
+            return cache[2]
+
+        payload = self._decode_payload()
+        self._payload_cache = (self.raw, self.dp_type, payload)
+        return payload
+
+    def _decode_payload(self) -> Union[t.Bool, t.CharacterString, t.uint32_t, t.data32]:
+        """Decode the payload from the raw value."""
         if self.dp_type == TuyaDPType.VALUE:
             return t.uint32_t.deserialize(self.raw)[0]
         elif self.dp_type == TuyaDPType.BOOL:
@@ -232,9 +303,8 @@ class TuyaData(t.Struct):
         elif self.dp_type == TuyaDPType.ENUM:
             return t.enum8.deserialize(self.raw)[0]
         elif self.dp_type == TuyaDPType.BITMAP:
-            bitmaps = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
             try:
-                return bitmaps[len(self.raw)].deserialize(self.raw)[0]
+                return TUYA_BITMAP_TYPES[len(self.raw)].deserialize(self.raw)[0]
             except KeyError as exc:
                 raise ValueError(f"Wrong bitmap length: {len(self.raw)}") from exc
 
@@ -271,6 +341,397 @@ class TuyaCommand(t.Struct):
     data: TuyaData
 
 
+class TuyaDatapointData(t.Struct):
+    """Tuya data point record of a multi data point command."""
+
+    dp: t.uint8_t
+    data: TuyaData
+
+
+class TuyaDatapoints(t.List, item_type=TuyaDatapointData):
+    """List of Tuya data point records."""
+
+
+class TuyaMultiCommand(t.Struct):
+    """Tuya manufacturer cluster command carrying several data points."""
+
+    status: t.uint8_t
+    tsn: t.uint8_t
+    datapoints: TuyaDatapoints
+
+
+@dataclasses.dataclass
+class TuyaSpellStats:
+    """Statistics of the spells cast by a TuyaSpellScheduler."""
+
+    cast: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    deduplicated: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+
+    @property
+    def mean_latency(self) -> float:
+        """Mean time from casting a spell until it succeeded."""
+        return self.total_latency / self.succeeded if self.succeeded else 0
+
+
+class TuyaSpellScheduler:
+    """Cast the 'magic spell' of Tuya devices with bounded concurrency.
+
+    A spell waits for one of `concurrency` slots, so a coordinator restarting
+    with many Tuya devices doesn't send all the spells at once. Failed spells
+    are retried after an exponential, jittered backoff. Sleepy devices are
+    only listening shortly after they sent something, so their spells are
+    retried more times and longer. A device has at most one spell pending.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        tries: int = 3,
+        backoff: float = 2.0,
+        sleepy_tries: int = 10,
+        sleepy_backoff: float = 10.0,
+        max_backoff: float = 300.0,
+        jitter: float = 0.5,
+    ):
+        """Init."""
+        self.tries = tries
+        self.backoff = backoff
+        self.sleepy_tries = sleepy_tries
+        self.sleepy_backoff = sleepy_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.stats = TuyaSpellStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending: Dict[t.EUI64, asyncio.Task] = {}
+
+    def cast(
+        self, device: zigpy.device.Device, spell: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        """Schedule the spell of the device, unless one is already pending."""
+
+        task = self._pending.get(device.ieee)
+        if task is not None:
+            self.stats.deduplicated += 1
+            return task
+
+        task = self._pending[device.ieee] = asyncio.create_task(
+            self._cast(device, spell)
+        )
+        task.add_done_callback(lambda _: self._pending.pop(device.ieee, None))
+        return task
+
+    async def _cast(
+        self, device: zigpy.device.Device, spell: Callable[[], Awaitable[Any]]
+    ) -> bool:
+        """Cast the spell, retrying it on failures."""
+
+        node_desc = device.node_desc
+        if node_desc is not None and not node_desc.is_receiver_on_when_idle:
+            tries, backoff = self.sleepy_tries, self.sleepy_backoff
+        else:
+            tries, backoff = self.tries, self.backoff
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.stats.cast += 1
+        for attempt in range(tries):
+            if attempt:
+                self.stats.retries += 1
+                delay = min(backoff * 2 ** (attempt - 1), self.max_backoff)
+                await asyncio.sleep(
+                    delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+                )
+
+            async with self._semaphore:
+                try:
+                    await spell()
+                except (asyncio.TimeoutError, ZigbeeException) as exc:
+                    _LOGGER.debug(
+                        "%s Tuya spell failed, try %s of %s: %r",
+                        device.ieee,
+                        attempt + 1,
+                        tries,
+                        exc,
+                    )
+                    continue
+
+            latency = loop.time() - start
+            self.stats.succeeded += 1
+            self.stats.total_latency += latency
+            self.stats.max_latency = max(self.stats.max_latency, latency)
+            return True
+
+        self.stats.failed += 1
+        _LOGGER.warning("%s Tuya spell failed after %s tries", device.ieee, tries)
+        return False
+
+
+_SPELL_SCHEDULERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TuyaSpellScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_spell_scheduler() -> TuyaSpellScheduler:
+    """Return the spell scheduler shared by the devices of the running loop."""
+
+    loop = asyncio.get_running_loop()
+    try:
+        return _SPELL_SCHEDULERS[loop]
+    except KeyError:
+        scheduler = _SPELL_SCHEDULERS[loop] = TuyaSpellScheduler()
+        return scheduler
+
+
+class TuyaCommandCoalescer:
+    """Latest value wins coalescing of the commands sent to a Tuya device.
+
+    The first command for a key is sent right away and opens a window of
+    `window` seconds. Commands for the same key submitted during the window
+    are held back and only the latest one is sent when the window ends, which
+    opens a new window. The superseded commands are dropped and counted.
+    """
+
+    def __init__(self, window: float):
+        """Init."""
+        self.window = window
+        self.sent = 0
+        self.suppressed = 0
+        self._pending: Dict[Hashable, Callable[[], Any]] = {}
+        self._windows: Dict[Hashable, asyncio.TimerHandle] = {}
+
+    def submit(self, key: Hashable, send: Callable[[], Any]) -> None:
+        """Send the command now, or once the window of its key ends."""
+
+        if key not in self._windows:
+            self._send(key, send)
+            return
+
+        if key in self._pending:
+            self.suppressed += 1
+        self._pending[key] = send
+
+    def cancel(self, key: Hashable) -> None:
+        """Drop the command held back for the key, if any."""
+
+        if self._pending.pop(key, None) is not None:
+            self.suppressed += 1
+
+    def _send(self, key: Hashable, send: Callable[[], Any]) -> None:
+        """Send a command and open the window of its key."""
+
+        self.sent += 1
+        send()
+        if self.window > 0:
+            self._windows[key] = asyncio.get_running_loop().call_later(
+                self.window, self._window_end, key
+            )
+
+    def _window_end(self, key: Hashable) -> None:
+        """Send the latest command held back during the window."""
+
+        del self._windows[key]
+        send = self._pending.pop(key, None)
+        if send is not None:
+            self._send(key, send)
+
+
+class TuyaWriteTracker:
+    """Correlate the set_data commands sent to a device with their responses.
+
+    `write(send, ...)` sends a set_data command with a new TSN and waits until
+    the set_data_response with the same TSN is received, see `resolve`. A
+    write not confirmed within `timeout` seconds is sent again with a new TSN,
+    up to `tries` times, and retries are sent one at a time so a slow device
+    isn't flooded. The table of pending writes keeps at most `max_pending`
+    entries, the oldest writes and the writes pending for more than `expiry`
+    seconds are dropped and fail with a timeout.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        tries: int = 3,
+        max_pending: int = 32,
+        expiry: float = 60.0,
+    ):
+        """Init."""
+        self.timeout = timeout
+        self.tries = tries
+        self.max_pending = max_pending
+        self.expiry = expiry
+        self.confirmed = 0
+        self.retries = 0
+        self.failed = 0
+        # tsn: (expiry time, future), oldest first
+        self._pending: "collections.OrderedDict[int, Tuple[float, asyncio.Future]]" = (
+            collections.OrderedDict()
+        )
+        self._retry_lock: Optional[asyncio.Lock] = None
+
+    def __len__(self) -> int:
+        """Return the number of pending writes."""
+        return len(self._pending)
+
+    def track(self, tsn: int) -> asyncio.Future:
+        """Return the future resolved by the response to the TSN."""
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self._drop(tsn)
+        while self._pending:
+            oldest = next(iter(self._pending))
+            if len(self._pending) < self.max_pending and self._pending[oldest][0] > now:
+                break
+            self._drop(oldest)
+
+        future = loop.create_future()
+        self._pending[tsn] = (now + self.expiry, future)
+        return future
+
+    def resolve(self, tsn: int) -> bool:
+        """Confirm the write of the TSN, return False if none is pending."""
+
+        _, future = self._pending.pop(tsn, (None, None))
+        if future is None or future.done():
+            return False
+        future.set_result(foundation.Status.SUCCESS)
+        return True
+
+    def discard(self, tsn: int, future: asyncio.Future) -> None:
+        """Forget the write of the TSN."""
+
+        entry = self._pending.get(tsn)
+        if entry is not None and entry[1] is future:
+            del self._pending[tsn]
+
+    def _drop(self, tsn: int) -> None:
+        _, future = self._pending.pop(tsn, (None, None))
+        if future is not None and not future.done():
+            future.set_exception(asyncio.TimeoutError())
+
+    async def write(
+        self,
+        send: Callable[[int], Awaitable[Any]],
+        get_tsn: Callable[[], int],
+    ) -> foundation.Status:
+        """Send the command with `send(tsn)` until its response is received."""
+
+        if self._retry_lock is None:
+            self._retry_lock = asyncio.Lock()
+
+        status = await self._try_write(send, get_tsn())
+        for _ in range(self.tries - 1):
+            if status != foundation.Status.TIMEOUT:
+                break
+            self.retries += 1
+            async with self._retry_lock:
+                status = await self._try_write(send, get_tsn())
+
+        if status == foundation.Status.SUCCESS:
+            self.confirmed += 1
+        else:
+            self.failed += 1
+        return status
+
+    async def _try_write(
+        self, send: Callable[[int], Awaitable[Any]], tsn: int
+    ) -> foundation.Status:
+        future = self.track(tsn)
+        try:
+            await send(tsn)
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.debug("No response to Tuya write with TSN %s", tsn)
+            return foundation.Status.TIMEOUT
+        except ZigbeeException as exc:
+            _LOGGER.debug("Couldn't send Tuya write with TSN %s: %s", tsn, exc)
+            return foundation.Status.FAILURE
+        finally:
+            self.discard(tsn, future)
+
+
+@dataclasses.dataclass(frozen=True)
+class DPReportFilter:
+    """Filter of the reports of a data point.
+
+    A report is dropped if it comes less than `min_interval` seconds after the
+    last forwarded one, if its value didn't change and `drop_unchanged` is set,
+    or if the value changed by less than `deadband` or by less than
+    `relative_deadband` times the last forwarded value. Deadbands are in the
+    unit of the reported data point, before conversion. A report coming
+    `max_interval` seconds or more after the last forwarded one is always
+    forwarded.
+    """
+
+    drop_unchanged: bool = True
+    deadband: float = 0
+    relative_deadband: float = 0
+    min_interval: float = 0
+    max_interval: Optional[float] = None
+
+    def accept(self, last: Optional[Tuple[float, Any]], value: Any, now: float) -> bool:
+        """Return True if the value is forwarded, given the last forwarded one."""
+
+        if last is None:
+            return True
+        last_time, last_value = last
+        elapsed = now - last_time
+        if self.max_interval is not None and elapsed >= self.max_interval:
+            return True
+        if elapsed < self.min_interval:
+            return False
+        if value == last_value:
+            return not self.drop_unchanged
+        if self.deadband or self.relative_deadband:
+            try:
+                delta = abs(value - last_value)
+            except TypeError:
+                return True
+            if (
+                delta < self.deadband
+                or delta < abs(last_value) * self.relative_deadband
+            ):
+                return False
+        return True
+
+
+class TuyaReportFilter:
+    """Filter stage of the data point reports received by a cluster.
+
+    Keeps the last forwarded value of every filtered data point. Forced
+    reports, e.g. the responses to a data query, are always forwarded and
+    become the reference for the next reports.
+    """
+
+    def __init__(self, filters: Dict[int, DPReportFilter]):
+        """Init."""
+        self.filters = filters
+        self.forwarded = 0
+        self.dropped = 0
+        # dp: (time, value) of the last forwarded report
+        self._last: Dict[int, Tuple[float, Any]] = {}
+
+    def accept(self, dp: int, value: Any, forced: bool = False) -> bool:
+        """Return True if the report is forwarded."""
+
+        dp_filter = self.filters.get(dp)
+        if dp_filter is None:
+            return True
+
+        now = time.monotonic()
+        if not forced and not dp_filter.accept(self._last.get(dp), value, now):
+            self.dropped += 1
+            return False
+        self._last[dp] = (now, value)
+        self.forwarded += 1
+        return True
+
+
 class NoManufacturerCluster(CustomCluster):
     """Forces the NO manufacturer id in command."""
 
@@ -293,6 +754,58 @@ class NoManufacturerCluster(CustomCluster):
         )
 
 
+@dataclasses.dataclass(frozen=True)
+class TuyaProfile:
+    """Manufacturer specific behaviour of a Tuya device.
+
+    Resolved once per device by its Tuya manufacturer cluster, which sets it
+    as the `tuya_profile` of the device, so that commands and reports read its
+    fields instead of searching the manufacturer tables.
+    """
+
+    manufacturer: Optional[str] = None
+    # Tuya control values of the open, close and stop commands
+    cover_command: Dict[int, int] = dataclasses.field(default_factory=dict)
+    # 0 = open and 100 = closed unless the cover_inverted attribute is set
+    cover_inverted: bool = False
+    # epochs of the UTC and local timestamps answering time requests, None
+    # when the cluster doesn't answer them
+    time_epoch: Optional[datetime.datetime] = None
+    local_time_epoch: Optional[datetime.datetime] = None
+
+
+def get_tuya_profile(
+    manufacturer: Optional[str],
+    set_time_offset: int = 0,
+    set_time_local_offset: Optional[int] = None,
+) -> TuyaProfile:
+    """Return the profile of the devices of a manufacturer, shared by them."""
+
+    # cached on all arguments, however they are passed
+    return _get_tuya_profile(manufacturer, set_time_offset, set_time_local_offset)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tuya_profile(
+    manufacturer: Optional[str],
+    set_time_offset: int,
+    set_time_local_offset: Optional[int],
+) -> TuyaProfile:
+    time_epoch = local_time_epoch = None
+    if set_time_offset:
+        time_epoch = datetime.datetime(set_time_offset, 1, 1)
+        local_time_epoch = datetime.datetime(
+            set_time_local_offset or set_time_offset, 1, 1
+        )
+    return TuyaProfile(
+        manufacturer=manufacturer,
+        cover_command=TUYA_COVER_COMMAND.get(manufacturer, {}),
+        cover_inverted=manufacturer in TUYA_COVER_INVERTED_BY_DEFAULT,
+        time_epoch=time_epoch,
+        local_time_epoch=local_time_epoch,
+    )
+
+
 class TuyaManufCluster(CustomCluster):
     """Tuya manufacturer specific cluster."""
 
@@ -374,6 +887,12 @@ class TuyaManufCluster(CustomCluster):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
+        # the profile of the device, read by its other Tuya clusters
+        self.tuya_profile = self.endpoint.device.tuya_profile = get_tuya_profile(
+            self.endpoint.device.manufacturer,
+            self.set_time_offset,
+            self.set_time_local_offset,
+        )
         self.endpoint.device.command_bus = Bus()
         self.endpoint.device.command_bus.add_listener(self)  # listen MCU commands
 
@@ -395,7 +914,8 @@ class TuyaManufCluster(CustomCluster):
     ) -> None:
         """Handle time request."""
 
-        if hdr.command_id != 0x0024 or self.set_time_offset == 0:
+        profile = self.tuya_profile
+        if hdr.command_id != 0x0024 or profile.time_epoch is None:
             return super().handle_cluster_request(
                 hdr, args, dst_addressing=dst_addressing
             )
@@ -413,18 +933,10 @@ class TuyaManufCluster(CustomCluster):
         )
         payload = TuyaTimePayload()
         utc_timestamp = int(
-            (
-                datetime.datetime.utcnow()
-                - datetime.datetime(self.set_time_offset, 1, 1)
-            ).total_seconds()
+            (datetime.datetime.utcnow() - profile.time_epoch).total_seconds()
         )
         local_timestamp = int(
-            (
-                datetime.datetime.now()
-                - datetime.datetime(
-                    self.set_time_local_offset or self.set_time_offset, 1, 1
-                )
-            ).total_seconds()
+            (datetime.datetime.now() - profile.local_time_epoch).total_seconds()
         )
         payload.extend(utc_timestamp.to_bytes(4, "big", signed=False))
         payload.extend(local_timestamp.to_bytes(4, "big", signed=False))
@@ -437,6 +949,17 @@ class TuyaManufCluster(CustomCluster):
 class TuyaManufClusterAttributes(TuyaManufCluster):
     """Manufacturer specific cluster for Tuya converting attributes <-> commands."""
 
+    # wait until the device confirms the written attributes, see TuyaWriteTracker
+    confirm_writes: bool = False
+    # attribute id: filter of its reports, get_data responses are not filtered
+    dp_report_filters: Dict[int, DPReportFilter] = {}
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self.write_tracker = TuyaWriteTracker()
+        self.report_filter = TuyaReportFilter(self.dp_report_filters)
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -458,23 +981,29 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
 
         tuya_cmd = args[0].command_id
         tuya_data = args[0].data
-
-        _LOGGER.debug(
-            "[0x%04x:%s:0x%04x] Received value %s "
-            "for attribute 0x%04x (command 0x%04x)",
-            self.endpoint.device.nwk,
-            self.endpoint.endpoint_id,
-            self.cluster_id,
-            repr(tuya_data[1:]),
-            tuya_cmd,
-            hdr.command_id,
-        )
+        trace = get_frame_trace(self.endpoint.device)
+        if hdr.command_id == TUYA_SET_DATA_RESPONSE:
+            self.write_tracker.resolve(args[0].tsn)
 
         if tuya_cmd not in self.attributes:
+            trace.record(
+                self.endpoint.endpoint_id,
+                self.cluster_id,
+                hdr.command_id,
+                tuya_cmd,
+                tuya_data,
+            )
             return
 
         ztype = self.attributes[tuya_cmd].type
         zvalue = tuya_data.to_value(ztype)
+        trace.record(
+            self.endpoint.endpoint_id, self.cluster_id, hdr.command_id, tuya_cmd, zvalue
+        )
+        if not self.report_filter.accept(
+            tuya_cmd, zvalue, forced=hdr.command_id == TUYA_GET_DATA
+        ):
+            return
         self._update_attribute(tuya_cmd, zvalue)
 
     def read_attributes(
@@ -490,16 +1019,17 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
         """Defer attributes writing to the set_data tuya command."""
 
         records = self._write_attr_records(attributes)
+        command = super().command
 
-        for record in records:
+        def send(record, tsn):
             cmd_payload = TuyaManufCluster.Command()
             cmd_payload.status = 0
-            cmd_payload.tsn = self.endpoint.device.application.get_sequence()
+            cmd_payload.tsn = tsn
             cmd_payload.command_id = record.attrid
             cmd_payload.function = 0
             cmd_payload.data = Data.from_value(record.value.value)
 
-            await super().command(
+            return command(
                 TUYA_SET_DATA,
                 cmd_payload,
                 manufacturer=manufacturer,
@@ -507,6 +1037,27 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
                 tsn=cmd_payload.tsn,
             )
 
+        if not self.confirm_writes:
+            for record in records:
+                await send(record, self.endpoint.device.application.get_sequence())
+            return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
+
+        statuses = await asyncio.gather(
+            *(
+                self.write_tracker.write(
+                    functools.partial(send, record),
+                    self.endpoint.device.application.get_sequence,
+                )
+                for record in records
+            )
+        )
+        failed = [
+            foundation.WriteAttributesStatusRecord(status, record.attrid)
+            for record, status in zip(records, statuses)
+            if status != foundation.Status.SUCCESS
+        ]
+        if failed:
+            return [failed]
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
 
@@ -594,19 +1145,13 @@ class TuyaManufacturerClusterOnOff(TuyaManufCluster):
 class TuyaSwitch(CustomDevice):
     """Tuya switch device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.switch_bus = Bus()
-        super().__init__(*args, **kwargs)
+    switch_bus = EventChannel()
 
 
 class TuyaDimmerSwitch(TuyaSwitch):
     """Tuya dimmer switch device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.dimmer_bus = Bus()
-        super().__init__(*args, **kwargs)
+    dimmer_bus = EventChannel()
 
 
 class TuyaThermostatCluster(LocalDataCluster, Thermostat):
@@ -866,12 +1411,9 @@ class TuyaPowerConfigurationCluster3AA(TuyaPowerConfigurationCluster):
 class TuyaThermostat(CustomDevice):
     """Generic Tuya thermostat device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.thermostat_bus = Bus()
-        self.ui_bus = Bus()
-        self.battery_bus = Bus()
-        super().__init__(*args, **kwargs)
+    thermostat_bus = EventChannel()
+    ui_bus = EventChannel()
+    battery_bus = EventChannel()
 
 
 # Tuya Zigbee OnOff Cluster Attribute Implementation
@@ -928,10 +1470,25 @@ class TuyaSmartRemoteOnOffCluster(OnOff, EventableCluster):
     attributes.update({0x8002: ("power_on_state", PowerOnState)})
     attributes.update({0x8004: ("switch_mode", SwitchMode)})
 
+    multi_press_types = {1: SHORT_PRESS, 2: DOUBLE_PRESS, 3: TRIPLE_PRESS}
+    # derive double and triple presses from short presses when set, for
+    # remotes reporting every press as a short press
+    multi_press_threshold: Optional[float] = None
+
     def __init__(self, *args, **kwargs):
         """Init."""
         self.last_tsn = -1
         super().__init__(*args, **kwargs)
+        self.multi_press = None
+        if self.multi_press_threshold is not None:
+            self.multi_press = MultiPressDetector(
+                self._send_press_event,
+                self.multi_press_types,
+                self.multi_press_threshold,
+            )
+
+    def _send_press_event(self, button, press_type, data):
+        self.listener_event(ZHA_SEND_EVENT, press_type, [])
 
     server_commands = OnOff.server_commands.copy()
     server_commands.update(
@@ -980,10 +1537,11 @@ class TuyaSmartRemoteOnOffCluster(OnOff, EventableCluster):
                 ZHA_SEND_EVENT, self.rotate_type.get(rotate_type, "unknown"), []
             )
         elif hdr.command_id == 0xFD:
-            press_type = args[0]
-            self.listener_event(
-                ZHA_SEND_EVENT, self.press_type.get(press_type, "unknown"), []
-            )
+            press_type = self.press_type.get(args[0], "unknown")
+            if self.multi_press is not None and press_type == SHORT_PRESS:
+                self.multi_press.press(self.endpoint.endpoint_id)
+            else:
+                self.listener_event(ZHA_SEND_EVENT, press_type, [])
 
 
 # Tuya Zigbee Metering Cluster Correction Implementation
@@ -1112,19 +1670,25 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
     attributes.update({ATTR_COVER_DIRECTION: ("motor_direction", t.Bool)})
     attributes.update({ATTR_COVER_INVERTED: ("cover_inverted", t.Bool)})
 
+    # seconds during which only the latest position command is sent, 0 to disable
+    coalesce_window: float = 0
+
     def __init__(self, *args, **kwargs):
         """Initialize instance."""
         super().__init__(*args, **kwargs)
         self.endpoint.device.cover_bus.add_listener(self)
+        self.coalescer = TuyaCommandCoalescer(self.coalesce_window)
+
+    @property
+    def tuya_profile(self) -> TuyaProfile:
+        """Profile of the device, resolved by its Tuya manufacturer cluster."""
+        return self.endpoint.device.tuya_profile
 
     def cover_event(self, attribute, value):
         """Event listener for cover events."""
         if attribute == ATTR_COVER_POSITION:
-            invert_attr = self._attr_cache.get(ATTR_COVER_INVERTED) == 1
-            invert = (
-                not invert_attr
-                if self.endpoint.device.manufacturer in TUYA_COVER_INVERTED_BY_DEFAULT
-                else invert_attr
+            invert = (self._attr_cache.get(ATTR_COVER_INVERTED) == 1) != (
+                self.tuya_profile.cover_inverted
             )
             value = value if invert else 100 - value
         self._update_attribute(attribute, value)
@@ -1143,8 +1707,10 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
         tsn: Optional[Union[int, t.uint8_t]] = None,
     ):
         """Override the default Cluster command."""
-        if manufacturer is None:
-            manufacturer = self.endpoint.device.manufacturer
+        profile = self.tuya_profile
+        if manufacturer is not None and manufacturer != profile.manufacturer:
+            profile = get_tuya_profile(manufacturer)
+        manufacturer = profile.manufacturer
         _LOGGER.debug(
             "%s Sending Tuya Cluster Command.. Manufacturer is %s Cluster Command is 0x%04x, Arguments are %s",
             self.endpoint.device.ieee,
@@ -1166,7 +1732,7 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
             tuya_payload.data = [
                 1,
                 # need to implement direction change
-                TUYA_COVER_COMMAND[manufacturer][command_id],
+                profile.cover_command[command_id],
             ]  # remap the command to the Tuya command
         # Set Position Command
         elif command_id == WINDOW_COVER_COMMAND_LIFTPERCENT:
@@ -1175,11 +1741,8 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
             tuya_payload.command_id = TUYA_DP_TYPE_VALUE + TUYA_DP_ID_PERCENT_CONTROL
             tuya_payload.function = 0
             """Check direction and correct value"""
-            invert_attr = self._attr_cache.get(ATTR_COVER_INVERTED) == 1
-            invert = (
-                not invert_attr
-                if self.endpoint.device.manufacturer in TUYA_COVER_INVERTED_BY_DEFAULT
-                else invert_attr
+            invert = (self._attr_cache.get(ATTR_COVER_INVERTED) == 1) != (
+                self.tuya_profile.cover_inverted
             )
             position = args[0] if invert else 100 - args[0]
             tuya_payload.data = [
@@ -1212,6 +1775,16 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
                 tuya_payload.data,
             )
 
+            if self.coalescer.window > 0:
+                if command_id == WINDOW_COVER_COMMAND_LIFTPERCENT:
+                    self.coalescer.submit(
+                        command_id,
+                        functools.partial(self._send_tuya_payload, tuya_payload),
+                    )
+                    return self._coalesced_response(command_id)
+                # a position held back must not override open, close or stop
+                self.coalescer.cancel(WINDOW_COVER_COMMAND_LIFTPERCENT)
+
             return self.endpoint.tuya_manufacturer.command(
                 TUYA_SET_DATA, tuya_payload, expect_reply=True
             )
@@ -1219,14 +1792,25 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
             _LOGGER.debug("Unrecognised command: %x", command_id)
             return foundation.Status.UNSUP_CLUSTER_COMMAND
 
+    def _send_tuya_payload(self, tuya_payload: TuyaManufCluster.Command) -> None:
+        """Send a coalesced command to the tuya manufacturer cluster."""
+        self.create_catching_task(
+            self.endpoint.tuya_manufacturer.command(
+                TUYA_SET_DATA, tuya_payload, expect_reply=True
+            )
+        )
+
+    async def _coalesced_response(self, command_id: int) -> foundation.CommandSchema:
+        """Response to a command sent through the coalescer."""
+        return foundation.GENERAL_COMMANDS[
+            foundation.GeneralCommand.Default_Response
+        ].schema(command_id=command_id, status=foundation.Status.SUCCESS)
+
 
 class TuyaWindowCover(CustomDevice):
     """Tuya switch device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.cover_bus = Bus()
-        super().__init__(*args, **kwargs)
+    cover_bus = EventChannel()
 
 
 class TuyaManufacturerLevelControl(TuyaManufCluster):
@@ -1326,6 +1910,191 @@ class TuyaLevelControl(CustomCluster, LevelControl):
         return foundation.Status.UNSUP_CLUSTER_COMMAND
 
 
+def _scaling(
+    numerator: float, denominator: float, offset: float, integer: bool
+) -> Callable[[Any], Any]:
+    """Return the function of `x * numerator / denominator + offset`."""
+
+    if integer:
+        if offset:
+            return lambda x: x * numerator // denominator + offset
+        return lambda x: x * numerator // denominator
+    if denominator == 1:
+        if offset:
+            return lambda x: x * numerator + offset
+        return lambda x: x * numerator
+    if numerator == 1 and not offset:
+        return lambda x: x / denominator
+    if offset:
+        return lambda x: x * numerator / denominator + offset
+    return lambda x: x * numerator / denominator
+
+
+def _unscaling(
+    numerator: float,
+    denominator: float,
+    offset: float,
+    integer: bool,
+    round_up: bool = True,
+) -> Callable[[Any], Any]:
+    """Return the inverse of `_scaling`, rounding up or down with integer."""
+
+    if integer and round_up:
+        # -(-a // b) rounds up
+        return lambda x: -((offset - x) * denominator // numerator)
+    if integer:
+        return lambda x: (x - offset) * denominator // numerator
+    if numerator == 1:
+        return lambda x: (x - offset) * denominator
+    return lambda x: (x - offset) * denominator / numerator
+
+
+def _clamping(
+    function: Callable[[Any], Any],
+    minimum: Optional[float],
+    maximum: Optional[float],
+    clamp_input: bool = False,
+) -> Callable[[Any], Any]:
+    """Clamp the result, or the input, of a function when bounds are given."""
+
+    if minimum is None and maximum is None:
+        return function
+    low = -math.inf if minimum is None else minimum
+    high = math.inf if maximum is None else maximum
+    if clamp_input:
+        return lambda x: function(low if x < low else high if x > high else x)
+
+    def clamped(x):
+        x = function(x)
+        return low if x < low else high if x > high else x
+
+    return clamped
+
+
+@dataclasses.dataclass(frozen=True)
+class LinearConverter:
+    """Invertible linear conversion of data point values to attribute values.
+
+    The attribute value is `value * numerator / denominator + offset`, clamped
+    to `minimum` and `maximum` when given. With `integer` the division rounds
+    down, and `invert` rounds up so that converting the data point value of an
+    attribute value gives the attribute value back whenever it can, or down
+    without `round_up`.
+
+    `convert` and `invert` are built once for the declared parameters and the
+    data point mappings call them directly, instead of the converter.
+    """
+
+    numerator: int = 1
+    denominator: int = 1
+    offset: int = 0
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+    integer: bool = False
+    round_up: bool = True
+    convert: Callable[[Any], Any] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    invert: Callable[[Any], Any] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Build the conversion functions."""
+        params = (
+            self.numerator,
+            self.denominator,
+            self.offset,
+            self.minimum,
+            self.maximum,
+        )
+        if not all(
+            param is None or (type(param) in (int, float) and math.isfinite(param))
+            for param in params
+        ):
+            raise ValueError(f"{self} must be made of finite int and float values")
+        if not self.numerator or not self.denominator:
+            raise ValueError(f"{self} can't be inverted")
+
+        scale = params[:3] + (self.integer,)
+        object.__setattr__(
+            self,
+            "convert",
+            _clamping(_scaling(*scale), self.minimum, self.maximum),
+        )
+        object.__setattr__(
+            self,
+            "invert",
+            _clamping(
+                _unscaling(*scale, self.round_up),
+                self.minimum,
+                self.maximum,
+                clamp_input=True,
+            ),
+        )
+
+    def __call__(self, value: Any) -> Any:
+        """Convert a data point value to the attribute value."""
+        return self.convert(value)
+
+
+@dataclasses.dataclass(frozen=True)
+class EnumConverter:
+    """Invertible conversion of data point values with a table.
+
+    `values` maps data point values to attribute values, it must be one to one.
+    Values missing from the table are passed unchanged.
+    """
+
+    values: Dict[Any, Any]
+    convert: Callable[[Any], Any] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    invert: Callable[[Any], Any] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Build the conversion functions of both tables."""
+        values = dict(self.values)
+        inverted = {value: dp_value for dp_value, value in values.items()}
+        if len(inverted) != len(values):
+            raise ValueError(f"{self} can't be inverted")
+        object.__setattr__(self, "convert", lambda x: values.get(x, x))
+        object.__setattr__(self, "invert", lambda x: inverted.get(x, x))
+
+    def __call__(self, value: Any) -> Any:
+        """Convert a data point value to the attribute value."""
+        return self.convert(value)
+
+
+def converter_function(converter: Optional[Callable[[Any], Any]]) -> Optional[Callable]:
+    """Return the plain conversion function of a declared converter."""
+    if isinstance(converter, (EnumConverter, LinearConverter)):
+        return converter.convert
+    return converter
+
+
+def conversion_mismatches(
+    converter: Callable[[Any], Any],
+    dp_converter: Callable[[Any], Any],
+    values: Iterable[Any],
+) -> List[Tuple[Any, Any]]:
+    """Return the attribute values changed by a round trip to the data point.
+
+    Each mismatch is returned with the attribute value the data point value
+    converts back to, e.g. to check that hand written `converter` and
+    `dp_converter` functions are the inverse of each other.
+    """
+
+    mismatches = []
+    for value in values:
+        converted = converter(dp_converter(value))
+        if converted != value:
+            mismatches.append((value, converted))
+    return mismatches
+
+
 @dataclasses.dataclass
 class DPToAttributeMapping:
     """Container for datapoint to cluster attribute update mapping."""
@@ -1342,6 +2111,19 @@ class DPToAttributeMapping:
     ] = None
     endpoint_id: Optional[int] = None
 
+    def __post_init__(self):
+        """Call the function of a declared converter directly."""
+        self.converter = converter_function(self.converter)
+
+
+def _command_handler_names(
+    commands: Dict[int, foundation.ZCLCommandDef]
+) -> Dict[int, str]:
+    """Map command ids to the names of their handler methods."""
+    return {
+        command_id: f"handle_{command.name}" for command_id, command in commands.items()
+    }
+
 
 class TuyaNewManufCluster(CustomCluster):
     """Tuya manufacturer specific cluster.
@@ -1389,7 +2171,39 @@ class TuyaNewManufCluster(CustomCluster):
         ),
     }
 
+    dp_to_attribute: Dict[int, DPToAttributeMapping] = {}
+    # handlers for data points not updating the attribute of dp_to_attribute
     data_point_handlers: Dict[int, str] = {}
+    # dp: filter of its reports, get_data responses are not filtered
+    dp_report_filters: Dict[int, DPReportFilter] = {}
+
+    # dispatch tables compiled when the class is created
+    _client_command_handlers: Dict[int, str] = _command_handler_names(client_commands)
+    _server_command_handlers: Dict[int, str] = _command_handler_names(server_commands)
+    _dp_handlers: Dict[int, Callable[["TuyaNewManufCluster", TuyaCommand], None]] = {}
+
+    def __init_subclass__(cls) -> None:
+        """Compile the command and data point dispatch tables."""
+        super().__init_subclass__()
+
+        cls._client_command_handlers = _command_handler_names(cls.client_commands)
+        cls._server_command_handlers = _command_handler_names(cls.server_commands)
+
+        cls._dp_handlers = {dp: cls._dp_2_attr_update for dp in cls.dp_to_attribute}
+        for dp, handler_name in cls.data_point_handlers.items():
+            try:
+                cls._dp_handlers[dp] = getattr(cls, handler_name)
+            except AttributeError:
+                _LOGGER.warning(
+                    "No '%s' datapoint handler found in %s", handler_name, cls
+                )
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        # writes awaiting their set_data_response
+        self.write_tracker = TuyaWriteTracker()
+        self.report_filter = TuyaReportFilter(self.dp_report_filters)
 
     def handle_cluster_request(
         self,
@@ -1402,13 +2216,31 @@ class TuyaNewManufCluster(CustomCluster):
     ) -> None:
         """Handle cluster specific request."""
 
-        try:
-            if hdr.is_reply:
-                # server_cluster -> client_cluster cluster specific command
-                handler_name = f"handle_{self.client_commands[hdr.command_id].name}"
-            else:
-                handler_name = f"handle_{self.server_commands[hdr.command_id].name}"
-        except KeyError:
+        command = args[0] if args else None
+        if isinstance(command, TuyaCommand):
+            get_frame_trace(self.endpoint.device).record(
+                self.endpoint.endpoint_id,
+                self.cluster_id,
+                hdr.command_id,
+                command.dp,
+                command.data,
+            )
+        else:
+            get_frame_trace(self.endpoint.device).record(
+                self.endpoint.endpoint_id,
+                self.cluster_id,
+                hdr.command_id,
+                None,
+                command,
+            )
+
+        if hdr.is_reply:
+            # server_cluster -> client_cluster cluster specific command
+            handler_name = self._client_command_handlers.get(hdr.command_id)
+        else:
+            handler_name = self._server_command_handlers.get(hdr.command_id)
+
+        if handler_name is None:
             self.debug(
                 "Received unknown manufacturer command %s: %s", hdr.command_id, args
             )
@@ -1416,34 +2248,51 @@ class TuyaNewManufCluster(CustomCluster):
                 self.send_default_rsp(
                     hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
                 )
-                return
+            return
 
-        try:
-            status = getattr(self, handler_name)(*args)
-        except AttributeError:
+        handler = getattr(self, handler_name, None)
+        if handler is None:
             self.warning(
                 "No '%s' tuya handler found for %s",
                 handler_name,
                 args,
             )
             status = foundation.Status.UNSUP_CLUSTER_COMMAND
+        else:
+            status = handler(*args)
 
         if not hdr.frame_control.disable_default_response:
             self.send_default_rsp(hdr, status=status)
 
     def handle_get_data(self, command: TuyaCommand) -> foundation.Status:
-        """Handle get_data response (report)."""
-        try:
-            dp_handler = self.data_point_handlers[command.dp]
-            getattr(self, dp_handler)(command)
-        except (AttributeError, KeyError):
+        """Handle get_data response (report), it is never filtered."""
+        return self._handle_dp_report(command, forced=True)
+
+    def handle_set_data_response(self, command: TuyaCommand) -> foundation.Status:
+        """Handle set_data response, confirming the write and reporting the value."""
+        self.write_tracker.resolve(command.tsn)
+        return self._handle_dp_report(command)
+
+    def handle_active_status_report(self, command: TuyaCommand) -> foundation.Status:
+        """Handle active status report."""
+        return self._handle_dp_report(command)
+
+    def _handle_dp_report(
+        self, command: TuyaCommand, forced: bool = False
+    ) -> foundation.Status:
+        """Pass the data point report through the filters to its handler."""
+        dp_handler = self._dp_handlers.get(command.dp)
+        if dp_handler is None:
             self.debug("No datapoint handler for %s", command)
-            return foundation.status.UNSUPPORTED_ATTRIBUTE
+            return foundation.Status.UNSUPPORTED_ATTRIBUTE
 
-        return foundation.Status.SUCCESS
+        if command.dp in self.dp_report_filters and not self.report_filter.accept(
+            command.dp, command.data.payload, forced
+        ):
+            return foundation.Status.SUCCESS
 
-    handle_set_data_response = handle_get_data
-    handle_active_status_report = handle_get_data
+        dp_handler(self, command)
+        return foundation.Status.SUCCESS
 
     def handle_set_time_request(self, payload: t.uint16_t) -> foundation.Status:
         """Handle Time set request."""
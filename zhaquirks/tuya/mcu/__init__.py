@@ -1,25 +1,45 @@
 """Tuya MCU comunications."""
 import asyncio
 import dataclasses
-from typing import Any, Callable, Dict, Optional, Tuple, Union
+import functools
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from zigpy.exceptions import ZigbeeException
 from zigpy.quirks import CustomDevice
 import zigpy.types as t
 from zigpy.zcl import foundation
 from zigpy.zcl.clusters.general import LevelControl, OnOff
 
-from zhaquirks import Bus, DoublingPowerConfigurationCluster
+from zhaquirks import Bus, DoublingPowerConfigurationCluster, get_frame_trace
 from zhaquirks.tuya import (
     TUYA_MCU_COMMAND,
+    TUYA_MCU_SET_DATAPOINTS,
     TUYA_MCU_VERSION_RSP,
     TUYA_SET_DATA,
-    Data,
+    EnumConverter,
+    LinearConverter,
     NoManufacturerCluster,
     PowerOnState,
     TuyaCommand,
+    TuyaCommandCoalescer,
     TuyaData,
+    TuyaDatapointData,
+    TuyaDatapoints,
     TuyaLocalCluster,
+    TuyaMultiCommand,
     TuyaNewManufCluster,
+    converter_function,
+    get_spell_scheduler,
 )
 
 # New manufacturer attributes
@@ -69,6 +89,59 @@ class DPToAttributeMapping:
     ] = None
     endpoint_id: Optional[int] = None
 
+    def __post_init__(self):
+        """Call the functions of declared converters directly.
+
+        A declared converter is inverted for writes, unless dp_converter is given.
+        """
+        if self.dp_converter is None and isinstance(
+            self.converter, (EnumConverter, LinearConverter)
+        ):
+            self.dp_converter = self.converter.invert
+        self.converter = converter_function(self.converter)
+        self.dp_converter = converter_function(self.dp_converter)
+
+
+def encode_tuya_data(dp_type: TuyaDPType, value: Any) -> TuyaData:
+    """Encode a value as the tuya data of a datapoint type.
+
+    BOOL, VALUE and ENUM values are converted to their zigpy type and written
+    in big endian directly, other values are zigpy types serialized in
+    reverse. The typed value is kept as the payload of the tuya data.
+    """
+
+    ztype = dp_type.ztype
+    if ztype is not None:
+        value = ztype(value)
+    if dp_type == TuyaDPType.VALUE:
+        raw = value.to_bytes(4, "big")
+    elif ztype is not None:
+        raw = bytes((value,))
+    else:
+        raw = value.serialize()[::-1]
+
+    # fields are set directly, skipping the generic Struct constructor
+    data = object.__new__(TuyaData)
+    data.dp_type = dp_type
+    data.function = t.uint8_t(0)
+    data.raw = t.LVBytes(raw)
+    if ztype is not None:
+        data._payload_cache = (data.raw, dp_type, value)
+    return data
+
+
+def encode_tuya_command(
+    tsn: int, dp: int, dp_type: TuyaDPType, value: Any
+) -> TuyaCommand:
+    """Encode the set_data command of a datapoint value."""
+
+    command = object.__new__(TuyaCommand)
+    command.status = t.uint8_t(0)
+    command.tsn = t.uint8_t(tsn)
+    command.dp = t.uint8_t(dp)
+    command.data = encode_tuya_data(dp_type, value)
+    return command
+
 
 class TuyaClusterData(t.Struct):
     """Tuya cluster data."""
@@ -113,22 +186,49 @@ class TuyaAttributesCluster(TuyaLocalCluster):
 
         records = self._write_attr_records(attributes)
 
+        cluster_data = []
         for record in records:
 
             self.debug("write_attributes --> record: %s", record)
 
-            cluster_data = TuyaClusterData(
-                endpoint_id=self.endpoint.endpoint_id,
-                cluster_attr=self.attributes[record.attrid][0],
-                attr_value=record.value.value,
-                expect_reply=False,
-                manufacturer=manufacturer,
+            cluster_data.append(
+                TuyaClusterData(
+                    endpoint_id=self.endpoint.endpoint_id,
+                    cluster_attr=self.attributes[record.attrid][0],
+                    attr_value=record.value.value,
+                    expect_reply=False,
+                    manufacturer=manufacturer,
+                )
             )
-            self.endpoint.device.command_bus.listener_event(
-                TUYA_MCU_COMMAND,
+
+        # listeners sending the data points in a single command return the
+        # coroutine resolving to their status, the others send them right away
+        pending = [
+            result
+            for result in self.endpoint.device.command_bus.listener_event(
+                TUYA_MCU_SET_DATAPOINTS,
                 cluster_data,
             )
-
+            if result is not None
+        ]
+        if not pending:
+            return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
+
+        # an attribute fails when any of the listeners failed to write it
+        statuses = [
+            next(
+                (status for status in results if status != foundation.Status.SUCCESS),
+                foundation.Status.SUCCESS,
+            )
+            for results in zip(*await asyncio.gather(*pending))
+        ]
+        failed = [
+            foundation.WriteAttributesStatusRecord(status, record.attrid)
+            for record, status in zip(records, statuses)
+            if status != foundation.Status.SUCCESS
+        ]
+        if failed:
+            return [failed]
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
 
@@ -179,6 +279,31 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
         }
     )
 
+    dp_to_attribute: Dict[int, DPToAttributeMapping] = {}
+    # send all data points of a write_attributes call in a single set_data
+    batch_set_data: bool = False
+    # wait until the device confirms the written attributes with a
+    # set_data_response, retrying the unconfirmed writes, see TuyaWriteTracker
+    confirm_writes: bool = False
+    # reverse index of dp_to_attribute, (endpoint_id, attribute_name) -> dp
+    _dp_reverse_index: Dict[Tuple[Optional[int], str], int] = {}
+    # reverse index keys mapped by more than one DP
+    _dp_reverse_ambiguous: FrozenSet[Tuple[Optional[int], str]] = frozenset()
+
+    def __init_subclass__(cls) -> None:
+        """Build the reverse index of the datapoint mappings."""
+        super().__init_subclass__()
+
+        cls._dp_reverse_index = {}
+        ambiguous = set()
+        for dp, dp_mapping in cls.dp_to_attribute.items():
+            key = (dp_mapping.endpoint_id, dp_mapping.attribute_name)
+            if key in cls._dp_reverse_index:
+                ambiguous.add(key)
+                continue
+            cls._dp_reverse_index[key] = dp
+        cls._dp_reverse_ambiguous = frozenset(ambiguous)
+
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
@@ -190,27 +315,23 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
         """Convert from cluster data to a tuya data payload."""
 
         dp, mapping = self.get_dp_mapping(data.endpoint_id, data.cluster_attr)
-        self.debug("from_cluster_data: %s, %s", dp, mapping)
         if dp:
-            cmd_payload = TuyaCommand()
-            cmd_payload.status = 0
-            cmd_payload.tsn = self.endpoint.device.application.get_sequence()
-            cmd_payload.dp = dp
-            cmd_payload.data = TuyaData()
-            datapoint_type = mapping.dp_type
-            cmd_payload.data.dp_type = datapoint_type
-            cmd_payload.data.function = 0
-            val = data.attr_value
+            value = data.attr_value
             if mapping.dp_converter:
-                val = mapping.dp_converter(val)
-                self.debug("converted: %s", val)
-            if datapoint_type.ztype:
-                val = datapoint_type.ztype(val)
-                self.debug("ztype: %s", val)
-            val = Data.from_value(val)
-            self.debug("from_value: %s", val)
-            cmd_payload.data.raw = t.LVBytes.deserialize(val)[0]
-            self.debug("raw: %s", cmd_payload.data.raw)
+                value = mapping.dp_converter(value)
+            cmd_payload = encode_tuya_command(
+                self.endpoint.device.application.get_sequence(),
+                dp,
+                mapping.dp_type,
+                value,
+            )
+            get_frame_trace(self.endpoint.device).record(
+                self.endpoint.endpoint_id,
+                self.cluster_id,
+                TUYA_SET_DATA,
+                dp,
+                cmd_payload.data,
+            )
             return cmd_payload
         else:
             self.warning(
@@ -220,16 +341,17 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
             )
             return None
 
+    def _to_tuya_data(self, mapping: DPToAttributeMapping, val: Any) -> TuyaData:
+        """Convert an attribute value to the tuya data of its datapoint."""
+
+        if mapping.dp_converter:
+            val = mapping.dp_converter(val)
+        return encode_tuya_data(mapping.dp_type, val)
+
     def tuya_mcu_command(self, cluster_data: TuyaClusterData):
         """Tuya MCU command listener. Only manufacturer endpoint must listen to MCU commands."""
 
-        self.debug(
-            "tuya_mcu_command: cluster_data=%s",
-            cluster_data,
-        )
-
         tuya_command = self.from_cluster_data(cluster_data)
-        self.debug("tuya_command: %s", tuya_command)
         if tuya_command:
             self.create_catching_task(
                 self.command(
@@ -245,18 +367,142 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
                 cluster_data,
             )
 
+    def tuya_mcu_set_datapoints(
+        self, cluster_data: List[TuyaClusterData]
+    ) -> Optional[Coroutine[Any, Any, List[foundation.Status]]]:
+        """Tuya MCU listener for the attributes of a single write_attributes call.
+
+        Without `batch_set_data` every attribute is sent right away in its own
+        set_data command. Otherwise the returned coroutine sends all data points
+        in a single set_data command, resolving to a status for each attribute.
+        """
+
+        if self.batch_set_data:
+            return self._set_datapoints(cluster_data)
+        if self.confirm_writes:
+            return self._write_datapoints(cluster_data)
+
+        for data in cluster_data:
+            self.tuya_mcu_command(data)
+        return None
+
+    async def _write_datapoints(
+        self, cluster_data: List[TuyaClusterData]
+    ) -> List[foundation.Status]:
+        """Send a set_data command per data point and wait for their responses."""
+
+        async def write(data: TuyaClusterData) -> foundation.Status:
+            try:
+                tuya_command = self.from_cluster_data(data)
+            except (ValueError, TypeError) as exc:
+                self.warning("Invalid value for %s: %s", data.cluster_attr, exc)
+                return foundation.Status.INVALID_VALUE
+            if tuya_command is None:
+                return foundation.Status.UNSUPPORTED_ATTRIBUTE
+
+            def send(tsn: int):
+                tuya_command.tsn = tsn
+                return self.command(
+                    TUYA_SET_DATA,
+                    tuya_command,
+                    expect_reply=data.expect_reply,
+                    manufacturer=data.manufacturer,
+                )
+
+            return await self.write_tracker.write(
+                send, self.endpoint.device.application.get_sequence
+            )
+
+        return list(await asyncio.gather(*(write(data) for data in cluster_data)))
+
+    async def _set_datapoints(
+        self, cluster_data: List[TuyaClusterData]
+    ) -> List[foundation.Status]:
+        """Send the data points of the cluster data in a single set_data command."""
+
+        statuses = []
+        datapoints = TuyaDatapoints()
+        trace = get_frame_trace(self.endpoint.device)
+        for data in cluster_data:
+            dp, mapping = self.get_dp_mapping(data.endpoint_id, data.cluster_attr)
+            if dp is None:
+                self.warning(
+                    "No cluster_dp found for %s, %s",
+                    data.endpoint_id,
+                    data.cluster_attr,
+                )
+                statuses.append(foundation.Status.UNSUPPORTED_ATTRIBUTE)
+                continue
+
+            try:
+                tuya_data = self._to_tuya_data(mapping, data.attr_value)
+            except (ValueError, TypeError) as exc:
+                self.warning("Invalid value for DP %s: %s", dp, exc)
+                statuses.append(foundation.Status.INVALID_VALUE)
+                continue
+
+            datapoints.append(TuyaDatapointData(dp=dp, data=tuya_data))
+            statuses.append(foundation.Status.SUCCESS)
+            trace.record(
+                self.endpoint.endpoint_id, self.cluster_id, TUYA_SET_DATA, dp, tuya_data
+            )
+
+        if not datapoints:
+            return statuses
+
+        def send(tsn: int):
+            return self.request(
+                False,
+                TUYA_SET_DATA,
+                TuyaMultiCommand,
+                TuyaMultiCommand(status=0, tsn=tsn, datapoints=datapoints),
+                expect_reply=cluster_data[0].expect_reply,
+                manufacturer=cluster_data[0].manufacturer,
+            )
+
+        if self.confirm_writes:
+            result = await self.write_tracker.write(
+                send, self.endpoint.device.application.get_sequence
+            )
+        else:
+            result = foundation.Status.SUCCESS
+            try:
+                await send(self.endpoint.device.application.get_sequence())
+            except (ZigbeeException, asyncio.TimeoutError) as exc:
+                self.warning("Couldn't send data points %s: %s", datapoints, exc)
+                result = foundation.Status.FAILURE
+
+        return [
+            result if status == foundation.Status.SUCCESS else status
+            for status in statuses
+        ]
+
     def get_dp_mapping(
         self, endpoint_id: int, attribute_name: str
     ) -> Optional[Tuple[int, DPToAttributeMapping]]:
         """Search for the DP in dp_to_attribute."""
 
-        for dp, dp_mapping in self.dp_to_attribute.items():
-            if (attribute_name == dp_mapping.attribute_name) and (
-                endpoint_id in [dp_mapping.endpoint_id, self.endpoint.endpoint_id]
-            ):
-                self.debug("get_dp_mapping --> found DP: %s", dp)
-                return [dp, dp_mapping]
-        return [None, None]
+        key = (endpoint_id, attribute_name)
+        if (
+            key not in self._dp_reverse_index
+            and endpoint_id == self.endpoint.endpoint_id
+        ):
+            # mappings without endpoint_id belong to the endpoint of this cluster
+            key = (None, attribute_name)
+
+        try:
+            dp = self._dp_reverse_index[key]
+        except KeyError:
+            return [None, None]
+
+        if key in self._dp_reverse_ambiguous:
+            self.warning(
+                "Ambiguous DP mapping for %s on endpoint %s, using DP %s",
+                attribute_name,
+                endpoint_id,
+                dp,
+            )
+        return [dp, self.dp_to_attribute[dp]]
 
     def handle_mcu_version_response(self, payload: MCUVersion) -> foundation.Status:
         """Handle MCU version response."""
@@ -294,6 +540,11 @@ class TuyaOnOff(OnOff, TuyaLocalCluster):
                 expect_reply=expect_reply,
                 manufacturer=manufacturer,
             )
+            # level commands held back must not override an explicit on or off
+            level_cluster = self.endpoint.in_clusters.get(LevelControl.cluster_id)
+            if isinstance(level_cluster, TuyaLevelControl):
+                level_cluster.coalescer.cancel("on_off")
+                level_cluster.coalescer.cancel("current_level")
             self.endpoint.device.command_bus.listener_event(
                 TUYA_MCU_COMMAND,
                 cluster_data,
@@ -353,15 +604,6 @@ class TuyaOnOffManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-    }
-
 
 class MoesSwitchManufCluster(TuyaOnOffManufCluster):
     """On/Off Tuya cluster with extra device attributes."""
@@ -398,14 +640,29 @@ class MoesSwitchManufCluster(TuyaOnOffManufCluster):
         }
     )
 
-    data_point_handlers = TuyaOnOffManufCluster.data_point_handlers.copy()
-    data_point_handlers.update({14: "_dp_2_attr_update"})
-    data_point_handlers.update({15: "_dp_2_attr_update"})
-
 
 class TuyaLevelControl(LevelControl, TuyaLocalCluster):
     """Tuya MCU Level cluster for dimmable device."""
 
+    # seconds during which only the latest level command is sent, 0 to disable
+    coalesce_window: float = 0
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self.coalescer = TuyaCommandCoalescer(self.coalesce_window)
+
+    def _send_mcu_command(self, cluster_data: TuyaClusterData) -> None:
+        """Send the MCU command, keeping only the latest one of each attribute."""
+        self.coalescer.submit(
+            cluster_data.cluster_attr,
+            functools.partial(
+                self.endpoint.device.command_bus.listener_event,
+                TUYA_MCU_COMMAND,
+                cluster_data,
+            ),
+        )
+
     async def command(
         self,
         command_id: Union[foundation.GeneralCommand, int, t.uint8_t],
@@ -429,10 +686,7 @@ class TuyaLevelControl(LevelControl, TuyaLocalCluster):
                 expect_reply=expect_reply,
                 manufacturer=manufacturer,
             )
-            self.endpoint.device.command_bus.listener_event(
-                TUYA_MCU_COMMAND,
-                cluster_data,
-            )
+            self._send_mcu_command(cluster_data)
 
         # (move_to_level, move, move_to_level_with_on_off)
         if command_id in (0x0000, 0x0001, 0x0004):
@@ -443,10 +697,7 @@ class TuyaLevelControl(LevelControl, TuyaLocalCluster):
                 expect_reply=expect_reply,
                 manufacturer=manufacturer,
             )
-            self.endpoint.device.command_bus.listener_event(
-                TUYA_MCU_COMMAND,
-                cluster_data,
-            )
+            self._send_mcu_command(cluster_data)
             return foundation.GENERAL_COMMANDS[
                 foundation.GeneralCommand.Default_Response
             ].schema(command_id=command_id, status=foundation.Status.SUCCESS)
@@ -470,6 +721,11 @@ class TuyaInWallLevelControl(TuyaAttributesCluster, TuyaLevelControl):
     )
 
 
+# dimmers report the level in 0-1000
+# and the written levels round down, as the dimmers have always been sent
+LEVEL_CONVERTER = LinearConverter(255, 1000, integer=True, round_up=False)
+
+
 class TuyaLevelControlManufCluster(TuyaMCUCluster):
     """Tuya with Level Control data points."""
 
@@ -483,15 +739,13 @@ class TuyaLevelControlManufCluster(TuyaMCUCluster):
             TuyaLevelControl.ep_attribute,
             "current_level",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: (x * 255) // 1000,
-            dp_converter=lambda x: (x * 1000) // 255,
+            converter=LEVEL_CONVERTER,
         ),
         3: DPToAttributeMapping(
             TuyaLevelControl.ep_attribute,
             "minimum_level",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: (x * 255) // 1000,
-            dp_converter=lambda x: (x * 1000) // 255,
+            converter=LEVEL_CONVERTER,
         ),
         4: DPToAttributeMapping(
             TuyaLevelControl.ep_attribute,
@@ -508,16 +762,14 @@ class TuyaLevelControlManufCluster(TuyaMCUCluster):
             TuyaLevelControl.ep_attribute,
             "current_level",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: (x * 255) // 1000,
-            dp_converter=lambda x: (x * 1000) // 255,
+            converter=LEVEL_CONVERTER,
             endpoint_id=2,
         ),
         9: DPToAttributeMapping(
             TuyaLevelControl.ep_attribute,
             "minimum_level",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: (x * 255) // 1000,
-            dp_converter=lambda x: (x * 1000) // 255,
+            converter=LEVEL_CONVERTER,
             endpoint_id=2,
         ),
         10: DPToAttributeMapping(
@@ -536,16 +788,14 @@ class TuyaLevelControlManufCluster(TuyaMCUCluster):
             TuyaLevelControl.ep_attribute,
             "current_level",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: (x * 255) // 1000,
-            dp_converter=lambda x: (x * 1000) // 255,
+            converter=LEVEL_CONVERTER,
             endpoint_id=3,
         ),
         17: DPToAttributeMapping(
             TuyaLevelControl.ep_attribute,
             "minimum_level",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: (x * 255) // 1000,
-            dp_converter=lambda x: (x * 1000) // 255,
+            converter=LEVEL_CONVERTER,
             endpoint_id=3,
         ),
         18: DPToAttributeMapping(
@@ -556,21 +806,6 @@ class TuyaLevelControlManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        7: "_dp_2_attr_update",
-        8: "_dp_2_attr_update",
-        9: "_dp_2_attr_update",
-        10: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-        16: "_dp_2_attr_update",
-        17: "_dp_2_attr_update",
-        18: "_dp_2_attr_update",
-    }
-
 
 class EnchantedDevice(CustomDevice):
     """Class for enchanted Tuya devices which needs to be unlocked by casting a 'spell'."""
@@ -578,7 +813,7 @@ class EnchantedDevice(CustomDevice):
     def __init__(self, *args, **kwargs):
         """Initialize with task."""
         super().__init__(*args, **kwargs)
-        self._init_device_task = asyncio.create_task(self.spell())
+        self._init_device_task = get_spell_scheduler().cast(self, self.spell)
 
     async def spell(self) -> None:
         """Initialize device so that all endpoints become available."""
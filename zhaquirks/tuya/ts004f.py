@@ -1,7 +1,6 @@
 """Tuya TS004F devices."""
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from zigpy.profiles import zha
@@ -59,7 +58,11 @@ from zhaquirks.const import (
     TURN_OFF,
     TURN_ON,
 )
-from zhaquirks.tuya import TuyaSmartRemoteOnOffCluster, TuyaZBOnOffAttributeCluster
+from zhaquirks.tuya import (
+    TuyaSmartRemoteOnOffCluster,
+    TuyaZBOnOffAttributeCluster,
+    get_spell_scheduler,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -188,7 +191,7 @@ class TuyaSmartRemote004FDMS(CustomDevice):
         """Initialize with task."""
         super().__init__(*args, **kwargs)
 
-        self._init_plug_task = asyncio.create_task(self.spell())
+        self._init_plug_task = get_spell_scheduler().cast(self, self.spell)
 
     async def spell(self) -> None:
         """Initialize device so that all endpoints become available."""
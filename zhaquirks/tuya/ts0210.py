@@ -10,7 +10,7 @@ from zigpy.zcl import foundation
 from zigpy.zcl.clusters.general import Basic, Ota, PowerConfiguration, Time
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus, LocalDataCluster, MotionOnEvent
+from zhaquirks import EventChannel, LocalDataCluster, MotionOnEvent
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -51,10 +51,7 @@ class VibrationCluster(LocalDataCluster, MotionOnEvent, IasZone):
 class TuyaVibration(CustomDevice):
     """Tuya vibration sensor."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.motion_bus = Bus()
-        super().__init__(*args, **kwargs)
+    motion_bus = EventChannel()
 
     signature = {
         #   SizePrefixedSimpleDescriptor(endpoint=1, profile=260, device_type=1026, device_version=0, input_clusters=[0, 10, 1, 1280], output_clusters=[25])
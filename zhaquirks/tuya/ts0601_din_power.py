@@ -5,7 +5,7 @@ from zigpy.zcl.clusters.general import Basic, Groups, Ota, Scenes, Time
 from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 from zigpy.zcl.clusters.smartenergy import Metering
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -14,7 +14,12 @@ from zhaquirks.const import (
     OUTPUT_CLUSTERS,
     PROFILE_ID,
 )
-from zhaquirks.tuya import TuyaManufClusterAttributes, TuyaOnOff, TuyaSwitch
+from zhaquirks.tuya import (
+    DPReportFilter,
+    TuyaManufClusterAttributes,
+    TuyaOnOff,
+    TuyaSwitch,
+)
 
 TUYA_TOTAL_ENERGY_ATTR = 0x0211
 TUYA_CURRENT_ATTR = 0x0212
@@ -36,6 +41,15 @@ class TuyaManufClusterDinPower(TuyaManufClusterAttributes):
         TUYA_DIN_SWITCH_ATTR: ("switch", t.uint8_t, True),
     }
 
+    # measurements are reported every few seconds, mostly unchanged
+    dp_report_filters = {
+        TUYA_TOTAL_ENERGY_ATTR: DPReportFilter(max_interval=300),
+        TUYA_CURRENT_ATTR: DPReportFilter(max_interval=300),
+        TUYA_POWER_ATTR: DPReportFilter(max_interval=300),
+        # voltage in 0.1 V
+        TUYA_VOLTAGE_ATTR: DPReportFilter(deadband=5, max_interval=300),
+    }
+
     def _update_attribute(self, attrid, value):
         super()._update_attribute(attrid, value)
         if attrid == TUYA_TOTAL_ENERGY_ATTR:
@@ -97,10 +111,7 @@ class TuyaElectricalMeasurement(LocalDataCluster, Metering):
 class TuyaPowerMeter(TuyaSwitch):
     """Tuya power meter device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.switch_bus = Bus()
-        super().__init__(*args, **kwargs)
+    switch_bus = EventChannel()
 
     signature = {
         # "node_descriptor": "<NodeDescriptor byte1=1 byte2=64 mac_capability_flags=142 manufacturer_code=4098
@@ -25,7 +25,7 @@ from zigpy.zcl.clusters.measurement import (
 )
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus, LocalDataCluster, MotionOnEvent
+from zhaquirks import EventChannel, LocalDataCluster, MotionOnEvent
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -36,7 +36,9 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.tuya import (
+    DPReportFilter,
     DPToAttributeMapping,
+    LinearConverter,
     TuyaLocalCluster,
     TuyaManufCluster,
     TuyaNewManufCluster,
@@ -94,12 +96,12 @@ class NeoMotionManufCluster(TuyaNewManufCluster):
         104: DPToAttributeMapping(
             TuyaTemperatureMeasurement.ep_attribute,
             "measured_value",
-            lambda x: x * 10,
+            LinearConverter(10),
         ),
         105: DPToAttributeMapping(
             TuyaRelativeHumidity.ep_attribute,
             "measured_value",
-            lambda x: x * 100,
+            LinearConverter(100),
         ),
         113: DPToAttributeMapping(
             TuyaNewManufCluster.ep_attribute,
@@ -107,13 +109,6 @@ class NeoMotionManufCluster(TuyaNewManufCluster):
         ),
     }
 
-    data_point_handlers = {
-        101: "_dp_2_attr_update",
-        104: "_dp_2_attr_update",
-        105: "_dp_2_attr_update",
-        113: "_dp_2_attr_update",
-    }
-
 
 class MmwRadarManufCluster(TuyaMCUCluster):
     """Neo manufacturer cluster."""
@@ -150,6 +145,13 @@ class MmwRadarManufCluster(TuyaMCUCluster):
         }
     )
 
+    # the radar reports the target distance and illuminance continuously
+    dp_report_filters: Dict[int, DPReportFilter] = {
+        # distance in cm
+        9: DPReportFilter(deadband=5, max_interval=300),
+        104: DPReportFilter(relative_deadband=0.05, max_interval=300),
+    }
+
     dp_to_attribute: Dict[int, DPToAttributeMapping] = {
         1: DPToAttributeMapping(
             TuyaOccupancySensing.ep_attribute,
@@ -174,7 +176,7 @@ class MmwRadarManufCluster(TuyaMCUCluster):
         9: DPToAttributeMapping(
             TuyaAnalogInput.ep_attribute,
             "present_value",
-            lambda x: x / 100,
+            LinearConverter(1, 100),
         ),
         101: DPToAttributeMapping(
             TuyaMCUCluster.ep_attribute,
@@ -211,23 +213,6 @@ class MmwRadarManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-        9: "_dp_2_attr_update",
-        101: "_dp_2_attr_update",
-        102: "_dp_2_attr_update",
-        103: "_dp_2_attr_update",
-        104: "_dp_2_attr_update",
-        105: "_dp_2_attr_update",
-        106: "_dp_2_attr_update",
-        107: "_dp_2_attr_update",
-        108: "_dp_2_attr_update",
-    }
-
 
 class MotionCluster(LocalDataCluster, MotionOnEvent):
     """Tuya Motion Sensor."""
@@ -258,10 +243,7 @@ class TuyaManufacturerClusterMotion(TuyaManufCluster):
 class TuyaMotion(CustomDevice):
     """BW-IS3 occupancy sensor."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.motion_bus = Bus()
-        super().__init__(*args, **kwargs)
+    motion_bus = EventChannel()
 
     signature = {
         #  endpoint=1 profile=260 device_type=0 device_version=0 input_clusters=[0, 3]
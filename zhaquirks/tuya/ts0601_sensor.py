@@ -16,7 +16,11 @@ from zhaquirks.const import (
     PROFILE_ID,
     SKIP_CONFIGURATION,
 )
-from zhaquirks.tuya import TuyaLocalCluster, TuyaPowerConfigurationCluster2AAA
+from zhaquirks.tuya import (
+    LinearConverter,
+    TuyaLocalCluster,
+    TuyaPowerConfigurationCluster2AAA,
+)
 from zhaquirks.tuya.mcu import DPToAttributeMapping, TuyaDPType, TuyaMCUCluster
 
 # NOTES:
@@ -45,28 +49,22 @@ class TemperatureHumidityManufCluster(TuyaMCUCluster):
             TuyaTemperatureMeasurement.ep_attribute,
             "measured_value",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: x * 10,  # decidegree to centidegree
+            converter=LinearConverter(10),  # decidegree to centidegree
         ),
         2: DPToAttributeMapping(
             TuyaRelativeHumidity.ep_attribute,
             "measured_value",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: x * 10,  # decipercent to centipercent
+            converter=LinearConverter(10),  # decipercent to centipercent
         ),
         4: DPToAttributeMapping(
             TuyaPowerConfigurationCluster2AAA.ep_attribute,
             "battery_percentage_remaining",
             dp_type=TuyaDPType.VALUE,
-            converter=lambda x: x * 2,  # double reported percentage
+            converter=LinearConverter(2),  # double reported percentage
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-    }
-
 
 class TuyaTempHumiditySensor(CustomDevice):
     """Custom device representing tuya temp and humidity sensor with e-ink screen."""
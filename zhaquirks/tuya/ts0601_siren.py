@@ -18,7 +18,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.measurement import RelativeHumidity, TemperatureMeasurement
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -194,12 +194,9 @@ class TuyaRelativeHumidity(LocalDataCluster, RelativeHumidity):
 class TuyaSiren(CustomDevice):
     """NEO Tuya Siren and humidity/temperature sensor."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.temperature_bus = Bus()
-        self.humidity_bus = Bus()
-        self.switch_bus = Bus()
-        super().__init__(*args, **kwargs)
+    temperature_bus = EventChannel()
+    humidity_bus = EventChannel()
+    switch_bus = EventChannel()
 
     signature = {
         #  endpoint=1 profile=260 device_type=0 device_version=0 input_clusters=[0, 3]
@@ -344,14 +341,6 @@ class NeoSirenManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        13: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        7: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-        21: "_dp_2_attr_update",
-    }
-
 
 class TuyaSirenGPP_NoSensors(CustomDevice):
     """NEO Tuya Siren without sensor."""
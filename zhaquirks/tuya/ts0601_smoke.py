@@ -7,7 +7,7 @@ import zigpy.types as t
 from zigpy.zcl.clusters.general import Basic, Groups, Ota, Scenes, Time
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -69,10 +69,7 @@ class TuyaIasZone(CustomCluster, IasZone):
 class TuyaSmokeDetector0601(CustomDevice):
     """TS0601 Smoke detector quirk."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.ias_bus = Bus()
-        super().__init__(*args, **kwargs)
+    ias_bus = EventChannel()
 
     signature = {
         MODELS_INFO: [
@@ -18,7 +18,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.hvac import Thermostat
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -1176,6 +1176,9 @@ class ZONNSMARTThermostat(TuyaThermostatCluster):
             temp_set = value * 10
         else:
             return
+        # until both temperatures are reported
+        if temp_current is None or temp_set is None:
+            return
 
         state = 0 if (int(temp_current) >= int(temp_set)) else 1
         self.endpoint.device.thermostat_bus.listener_event("state_change", state)
@@ -1511,10 +1514,7 @@ class SiterwellGS361_Type2(TuyaThermostat):
 class MoesHY368_Type1(TuyaThermostat):
     """MoesHY368 Thermostatic radiator valve."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.window_detection_bus = Bus()
-        super().__init__(*args, **kwargs)
+    window_detection_bus = EventChannel()
 
     signature = {
         #  endpoint=1 profile=260 device_type=81 device_version=0 input_clusters=[0, 4, 5, 61184]
@@ -1569,10 +1569,7 @@ class MoesHY368_Type1(TuyaThermostat):
 class MoesHY368_Type1new(TuyaThermostat):
     """MoesHY368 Thermostatic radiator valve."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.window_detection_bus = Bus()
-        super().__init__(*args, **kwargs)
+    window_detection_bus = EventChannel()
 
     signature = {
         #  endpoint=1 profile=260 device_type=81 device_version=0 input_clusters=[0, 4, 5, 61184]
@@ -1619,6 +1616,8 @@ class MoesHY368_Type1new(TuyaThermostat):
 class MoesHY368_Type2(TuyaThermostat):
     """MoesHY368 Thermostatic radiator valve (2nd cluster signature)."""
 
+    window_detection_bus = EventChannel()
+
     signature = {
         #  endpoint=1 profile=260 device_type=0 device_version=0 input_clusters=[0, 3]
         #  output_clusters=[3, 25]>
@@ -1661,15 +1660,12 @@ class MoesHY368_Type2(TuyaThermostat):
 class ZonnsmartTV01_ZG(TuyaThermostat):
     """ZONNSMART TV01-ZG Thermostatic radiator valve."""
 
-    def __init__(self, *args, **kwargs):
-        """Init device."""
-        self.boost_bus = Bus()
-        self.child_lock_bus = Bus()
-        self.online_mode_bus = Bus()
-        self.temperature_calibration_bus = Bus()
-        self.window_detection_bus = Bus()
-        self.window_temperature_bus = Bus()
-        super().__init__(*args, **kwargs)
+    boost_bus = EventChannel()
+    child_lock_bus = EventChannel()
+    online_mode_bus = EventChannel()
+    temperature_calibration_bus = EventChannel()
+    window_detection_bus = EventChannel()
+    window_temperature_bus = EventChannel()
 
     signature = {
         #  endpoint=1 profile=260 device_type=81 device_version=0 input_clusters=[0, 4, 5, 61184]
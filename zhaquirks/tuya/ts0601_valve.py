@@ -87,16 +87,6 @@ class TuyaValveManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-        7: "_dp_2_attr_update",
-        11: "_dp_2_attr_update",
-        12: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-    }
-
 
 class TuyaValve(CustomDevice):
     """Tuya valve device."""
@@ -186,15 +176,6 @@ class ParksideTuyaValveManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-        11: "_dp_2_attr_update",
-        108: "_dp_2_attr_update",
-        109: "_dp_2_attr_update",
-    }
-
     async def bind(self):
         """
         Bind cluster.
@@ -17,7 +17,7 @@ from zigpy.zcl.clusters.homeautomation import ApplianceEventAlerts
 from zigpy.zcl.clusters.measurement import TemperatureMeasurement
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     CLUSTER_COMMAND,
     DEVICE_TYPE,
@@ -94,10 +94,7 @@ class WAXMANApplianceEventAlerts(CustomCluster, ApplianceEventAlerts):
 class WAXMANleakSMARTv2(CustomDevice):
     """Custom device representing WAXMAN leakSMART v2."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.ias_bus = Bus()
-        super().__init__(*args, **kwargs)
+    ias_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=770
@@ -146,10 +143,7 @@ class WAXMANleakSMARTv2(CustomDevice):
 class WAXMANleakSMARTv2NOPOLL(CustomDevice):
     """Custom WAXMAN leakSMART v2 without PollControl cluster."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.ias_bus = Bus()
-        super().__init__(*args, **kwargs)
+    ias_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=770
@@ -18,8 +18,10 @@ the xbee stays alive in Home Assistant.
 
 import asyncio
 import enum
+import functools
 import logging
-from typing import Any, List, Optional, Union
+import struct
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from zigpy.quirks import CustomDevice
 import zigpy.types as t
@@ -56,6 +58,21 @@ PIN_ANALOG_OUTPUT = 2
 
 REMOTE_AT_COMMAND_TIMEOUT = 30
 
+# DIO0 - DIO12 are reported in IO samples
+XBEE_DIGITAL_MASK = 0x1FFF
+# unpacks the big endian analog samples of a sample set by number of pins
+_ANALOG_SAMPLE_FORMATS = [struct.Struct(f">{pins}H") for pins in range(9)]
+# serialized header of the cluster command 0x0000, without the tsn
+_HDR_FRAME_CONTROL, _, _HDR_COMMAND_ID = foundation.ZCLHeader.cluster(
+    0, 0x0000
+).serialize()
+
+
+@functools.lru_cache(maxsize=None)
+def _mask_pins(mask: int) -> Tuple[int, ...]:
+    """Return the pins of a sample mask, lowest pin first."""
+    return tuple(pin for pin in range(mask.bit_length()) if (mask >> pin) & 1)
+
 
 class int_t(int):
     """Signed int type."""
@@ -243,6 +260,9 @@ AT_COMMANDS = {
     # "CE": uint8_t,
 }
 
+# parameters which never change, queried once per device
+AT_READ_ONLY_COMMANDS = frozenset({"VR", "HV", "SH", "SL"})
+
 # 4 AO lines
 # 10 digital
 # Discovered endpoint information: <SimpleDescriptor endpoint=232 profile=49413
@@ -348,6 +368,8 @@ class XBeeRemoteATRequest(LocalDataCluster):
     server_commands = {}
 
     _seq: int = 1
+    # requests awaiting their response at the same time
+    max_in_flight: int = 4
 
     class EUI64(t.EUI64):
         """EUI64 serializable class."""
@@ -387,14 +409,35 @@ class XBeeRemoteATRequest(LocalDataCluster):
             k: (v[0], (v[1],), None)
             for k, v in zip(range(1, len(AT_COMMANDS) + 1), AT_COMMANDS.items())
         }
+        # values of the read only parameters
+        self._at_cache = {}
+        # created on first use, the loop may not run yet
+        self._window: Optional[asyncio.Semaphore] = None
 
-    def _save_at_request(self, frame_id, future):
-        self._endpoint.in_clusters[XBEE_AT_RESPONSE_CLUSTER].save_at_request(
-            frame_id, future
-        )
+    @property
+    def _at_response(self) -> "XBeeRemoteATResponse":
+        return self._endpoint.in_clusters[XBEE_AT_RESPONSE_CLUSTER]
 
     def remote_at_command(self, cmd_name, *args, apply_changes=True, **kwargs):
         """Execute a Remote AT Command and Return Response."""
+        if not args and cmd_name in AT_READ_ONLY_COMMANDS:
+            return self._cached_at_command(
+                cmd_name, apply_changes=apply_changes, **kwargs
+            )
+        return self._send_at_command(
+            cmd_name, *args, apply_changes=apply_changes, **kwargs
+        )
+
+    async def _cached_at_command(self, cmd_name, **kwargs):
+        """Query a read only parameter once and cache it."""
+        try:
+            return self._at_cache[cmd_name]
+        except KeyError:
+            value = await self._send_at_command(cmd_name, **kwargs)
+            self._at_cache[cmd_name] = value
+            return value
+
+    def _send_at_command(self, cmd_name, *args, apply_changes=True, **kwargs):
         if hasattr(self._endpoint.device.application, "remote_at_command"):
             return self._endpoint.device.application.remote_at_command(
                 self._endpoint.device.nwk,
@@ -413,19 +456,33 @@ class XBeeRemoteATRequest(LocalDataCluster):
     async def _remote_at_command(self, options, name, *args):
         _LOGGER.debug("Remote AT command: %s %s", name, args)
         data = t.serialize(args, (AT_COMMANDS[name],))
-        try:
-            return await asyncio.wait_for(
-                await self._command(options, name.encode("ascii"), data, *args),
-                timeout=REMOTE_AT_COMMAND_TIMEOUT,
-            )
-        except asyncio.TimeoutError:
-            _LOGGER.warning("No response to %s command", name)
-            raise
+        if self._window is None:
+            self._window = asyncio.Semaphore(self.max_in_flight)
 
-    async def _command(self, options, command, data, *args):
+        async with self._window:
+            frame_id = self._next_frame_id()
+            future = asyncio.get_running_loop().create_future()
+            self._at_response.save_at_request(frame_id, future)
+            try:
+                await self._command(options, frame_id, name.encode("ascii"), data)
+                return await asyncio.wait_for(future, timeout=REMOTE_AT_COMMAND_TIMEOUT)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("No response to %s command", name)
+                raise
+            finally:
+                self._at_response.discard_at_request(frame_id, future)
+
+    def _next_frame_id(self) -> int:
+        """Allocate a frame id, skipping the ids of the requests in flight."""
+        for _ in range(255):
+            frame_id = self._seq
+            self._seq = (self._seq % 255) + 1
+            if not self._at_response.is_pending(frame_id):
+                return frame_id
+        raise RuntimeError("No free AT command frame id")
+
+    async def _command(self, options, frame_id, command, data):
         _LOGGER.debug("Command %s %s", command, data)
-        frame_id = self._seq
-        self._seq = (self._seq % 255) + 1
         schema = (
             uint8_t,
             uint8_t,
@@ -450,24 +507,16 @@ class XBeeRemoteATRequest(LocalDataCluster):
             schema,
         )
 
-        future = asyncio.Future()
-        self._save_at_request(frame_id, future)
-
-        try:
-            await self._endpoint.device.application.request(
-                self._endpoint.device,
-                XBEE_PROFILE_ID,
-                XBEE_AT_REQUEST_CLUSTER,
-                XBEE_AT_ENDPOINT,
-                XBEE_AT_ENDPOINT,
-                self._endpoint.device.application.get_sequence(),
-                data,
-                expect_reply=False,
-            )
-        except Exception as e:
-            future.set_exception(e)
-
-        return future
+        await self._endpoint.device.application.request(
+            self._endpoint.device,
+            XBEE_PROFILE_ID,
+            XBEE_AT_REQUEST_CLUSTER,
+            XBEE_AT_ENDPOINT,
+            XBEE_AT_ENDPOINT,
+            self._endpoint.device.application.get_sequence(),
+            data,
+            expect_reply=False,
+        )
 
     async def command(
         self, command_id, *args, manufacturer=None, expect_reply=False, tsn=None
@@ -503,8 +552,6 @@ class XBeeRemoteATResponse(LocalDataCluster):
 
     cluster_id = XBEE_AT_RESPONSE_CLUSTER
 
-    _awaiting = {}
-
     class ATCommandResult(enum.IntEnum):
         """AT command results."""
 
@@ -522,9 +569,26 @@ class XBeeRemoteATResponse(LocalDataCluster):
             """Deserialize ATCommand."""
             return cls(data[:2]), data[2:]
 
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        # frame id: future of the request awaiting its response
+        self._awaiting = {}
+
     def save_at_request(self, frame_id, future):
         """Save pending request."""
-        self._awaiting[frame_id] = (future,)
+        if frame_id in self._awaiting:
+            raise RuntimeError(f"AT command frame id {frame_id} is already in use")
+        self._awaiting[frame_id] = future
+
+    def discard_at_request(self, frame_id, future):
+        """Forget the request, e.g. once it timed out."""
+        if self._awaiting.get(frame_id) is future:
+            del self._awaiting[frame_id]
+
+    def is_pending(self, frame_id) -> bool:
+        """Return True if a request with the frame id awaits its response."""
+        return frame_id in self._awaiting
 
     def handle_cluster_request(
         self,
@@ -544,7 +608,10 @@ class XBeeRemoteATResponse(LocalDataCluster):
             _LOGGER.debug(
                 "Remote AT command response: %s", (frame_id, cmd, status, value)
             )
-            (fut,) = self._awaiting.pop(frame_id)
+            fut = self._awaiting.pop(frame_id, None)
+            if fut is None or fut.done():
+                _LOGGER.debug("Unexpected AT command response, frame id %s", frame_id)
+                return
             try:
                 status = self.ATCommandResult(status)
             except ValueError:
@@ -582,6 +649,75 @@ class XBeeRemoteATResponse(LocalDataCluster):
     }
 
 
+class SerialStreamWriter:
+    """Write side of an XBee transparent serial stream.
+
+    Written bytes are buffered and sent in the background in chunks of at
+    most `max_payload` bytes, one request per chunk and in order. `drain()`
+    waits for the buffer to be sent once more than `high_water` bytes are
+    buffered, so writers producing data faster than the radio sends it are
+    slowed down. An error sending a chunk drops the buffered data and is
+    raised by the next `drain()` or `wait_closed()`.
+    """
+
+    def __init__(self, cluster: "XBeeCommon.SerialDataCluster", high_water: int):
+        """Init."""
+        self._cluster = cluster
+        self.high_water = high_water
+        self._buffer = bytearray()
+        self._sender: Optional[asyncio.Task] = None
+        self._exception: Optional[Exception] = None
+        self._closing = False
+
+    def write(self, data: bytes) -> None:
+        """Buffer the data to be sent."""
+        if self._closing:
+            raise RuntimeError("The serial stream is closed")
+        self._buffer += data
+        if self._sender is None and self._buffer:
+            self._sender = asyncio.get_running_loop().create_task(self._send())
+
+    def is_closing(self) -> bool:
+        """Return True if the stream is closed or closing."""
+        return self._closing
+
+    async def drain(self) -> None:
+        """Wait until the buffered data is sent, if there is too much of it."""
+        if len(self._buffer) > self.high_water and self._sender is not None:
+            await asyncio.shield(self._sender)
+        self._raise_exception()
+
+    def close(self) -> None:
+        """Close the stream, the buffered data is still sent."""
+        if not self._closing:
+            self._closing = True
+            self._cluster.close_stream()
+
+    async def wait_closed(self) -> None:
+        """Wait until the buffered data is sent."""
+        if self._sender is not None:
+            await asyncio.shield(self._sender)
+        self._raise_exception()
+
+    def _raise_exception(self) -> None:
+        exc, self._exception = self._exception, None
+        if exc is not None:
+            raise exc
+
+    async def _send(self) -> None:
+        max_payload = self._cluster.max_payload
+        try:
+            while self._buffer:
+                chunk = bytes(self._buffer[:max_payload])
+                del self._buffer[:max_payload]
+                await self._cluster.send_chunk(chunk)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._buffer.clear()
+            self._exception = exc
+        finally:
+            self._sender = None
+
+
 class XBeeCommon(CustomDevice):
     """XBee common class."""
 
@@ -593,21 +729,35 @@ class XBeeCommon(CustomDevice):
             .remote_at_command(command, *args, apply_changes=True, **kwargs)
         )
 
+    async def remote_at_query(self, *commands) -> Dict[str, Any]:
+        """Query several AT parameters, the requests are sent without waiting."""
+        values = await asyncio.gather(
+            *(self.remote_at(command) for command in commands)
+        )
+        return dict(zip(commands, values))
+
     def deserialize(self, endpoint_id, cluster_id, data):
         """Deserialize."""
         tsn = self._application.get_sequence()
-        command_id = 0x0000
-        hdr = foundation.ZCLHeader.cluster(tsn, command_id)
-        data = hdr.serialize() + data
-        return super().deserialize(endpoint_id, cluster_id, data)
+        # prepend the header of a cluster command 0x0000, building it with
+        # ZCLHeader.cluster for every frame is slower than parsing the frame
+        hdr = bytes((_HDR_FRAME_CONTROL, tsn, _HDR_COMMAND_ID))
+        return super().deserialize(endpoint_id, cluster_id, hdr + data)
 
     class DigitalIOCluster(LocalDataCluster, BinaryInput):
         """Digital IO Cluster for the XBee."""
 
         cluster_id = XBEE_IO_CLUSTER
 
-        class IOSample(bytes):
-            """Parse an XBee IO sample report."""
+        class IOSample(NamedTuple):
+            """XBee IO sample report."""
+
+            # pins sampled, bit n is DIOn or ADn
+            digital_mask: int
+            analog_mask: int
+            # (digital pin values, values of the analog pins in pin order)
+            # for every sample set of the report
+            samples: Tuple[Tuple[int, Tuple[int, ...]], ...]
 
             # pylint: disable=R0201
             def serialize(self):
@@ -622,58 +772,50 @@ class XBeeCommon(CustomDevice):
                 Sample set count byte 0
                 Digital mask byte 1, 2
                 Analog mask byte 3
-                Digital samples byte 4, 5 (if any sample exists)
-                Analog Sample, 2 bytes per
+                Then for every sample set:
+                Digital samples 2 bytes (if any digital pin is sampled)
+                Analog Sample, 2 bytes per analog pin
                 """
-                sample_sets = int.from_bytes(data[0:1], byteorder="big")
-                if sample_sets != 1:
-                    _LOGGER.warning("Number of sets is not 1")
-                digital_mask = data[1:3]
-                analog_mask = data[3:4]
-                digital_sample = data[4:6]
-                num_bits = 13
-                digital_pins = [
-                    (int.from_bytes(digital_mask, byteorder="big") >> bit) & 1
-                    for bit in range(num_bits - 1, -1, -1)
-                ]
-                digital_pins = list(reversed(digital_pins))
-                analog_pins = [
-                    (int.from_bytes(analog_mask, byteorder="big") >> bit) & 1
-                    for bit in range(8 - 1, -1, -1)
-                ]
-                analog_pins = list(reversed(analog_pins))
-                if 1 in digital_pins:
-                    digital_samples = [
-                        (int.from_bytes(digital_sample, byteorder="big") >> bit) & 1
-                        for bit in range(num_bits - 1, -1, -1)
-                    ]
-                    digital_samples = list(reversed(digital_samples))
-                    sample_index = 6
-                else:
-                    # skip digital samples block
-                    digital_samples = digital_pins
-                    sample_index = 4
-                analog_samples = []
-                for apin in analog_pins:
-                    if apin == 1:
-                        analog_samples.append(
-                            int.from_bytes(
-                                data[sample_index : sample_index + 2], byteorder="big"
-                            )
+                if len(data) < 4:
+                    raise ValueError("IO sample report is too short")
+                sample_sets = data[0]
+                digital_mask = int.from_bytes(data[1:3], "big") & XBEE_DIGITAL_MASK
+                analog_mask = data[3]
+                analog_format = _ANALOG_SAMPLE_FORMATS[len(_mask_pins(analog_mask))]
+                set_size = analog_format.size + (2 if digital_mask else 0)
+                end = 4 + sample_sets * set_size
+                if len(data) < end:
+                    raise ValueError(
+                        f"IO sample report is too short for {sample_sets} sets"
+                    )
+
+                samples = []
+                for index in range(4, end, set_size):
+                    if digital_mask:
+                        digital = (
+                            int.from_bytes(data[index : index + 2], "big")
+                            & digital_mask
                         )
-                        sample_index += 2
+                        index += 2
                     else:
-                        analog_samples.append(0)
-
-                return (
-                    {
-                        "digital_pins": digital_pins,
-                        "analog_pins": analog_pins,
-                        "digital_samples": digital_samples,
-                        "analog_samples": analog_samples,
-                    },
-                    data[sample_index:],
-                )
+                        digital = 0
+                    samples.append((digital, analog_format.unpack_from(data, index)))
+
+                return cls(digital_mask, analog_mask, tuple(samples)), data[end:]
+
+        def __init__(self, *args, **kwargs):
+            """Init."""
+            super().__init__(*args, **kwargs)
+            # (pin, ep_attribute): cluster of the pin endpoint
+            self._pin_clusters = {}
+
+        def _pin_cluster(self, pin: int, ep_attribute: str):
+            try:
+                return self._pin_clusters[pin, ep_attribute]
+            except KeyError:
+                cluster = getattr(self._endpoint.device[0xD0 + pin], ep_attribute)
+                self._pin_clusters[pin, ep_attribute] = cluster
+                return cluster
 
         def handle_cluster_request(
             self,
@@ -686,34 +828,27 @@ class XBeeCommon(CustomDevice):
         ):
             """Handle the cluster request.
 
-            Update the digital pin states
+            Update the states of the pins whose value changed, for every
+            sample set of the report in order.
             """
             if hdr.command_id == ON_OFF_CMD:
-                values = args[0]
-                if "digital_pins" in values and "digital_samples" in values:
-                    # Update digital inputs
-                    active_pins = [
-                        i for i, x in enumerate(values["digital_pins"]) if x == 1
-                    ]
-                    for pin in active_pins:
+                sample = args[0]
+                digital_pins = _mask_pins(sample.digital_mask)
+                analog_pins = _mask_pins(sample.analog_mask)
+                for digital, analog in sample.samples:
+                    for pin in digital_pins:
+                        cluster = self._pin_cluster(pin, "on_off")
+                        value = (digital >> pin) & 1
                         # pylint: disable=W0212
-                        self._endpoint.device[0xD0 + pin].on_off._update_attribute(
-                            ATTR_ON_OFF, values["digital_samples"][pin]
-                        )
-                if "analog_pins" in values and "analog_samples" in values:
-                    # Update analog inputs
-                    active_pins = [
-                        i for i, x in enumerate(values["analog_pins"]) if x == 1
-                    ]
-                    for pin in active_pins:
+                        if cluster._attr_cache.get(ATTR_ON_OFF) != value:
+                            cluster._update_attribute(ATTR_ON_OFF, value)
+                    for pin, raw in zip(analog_pins, analog):
+                        cluster = self._pin_cluster(pin, "analog_input")
+                        # supply voltage is in mV
+                        value = raw / (10.23 if pin != 7 else 1000)
                         # pylint: disable=W0212
-                        self._endpoint.device[
-                            0xD0 + pin
-                        ].analog_input._update_attribute(
-                            ATTR_PRESENT_VALUE,
-                            values["analog_samples"][pin]
-                            / (10.23 if pin != 7 else 1000),  # supply voltage is in mV
-                        )
+                        if cluster._attr_cache.get(ATTR_PRESENT_VALUE) != value:
+                            cluster._update_attribute(ATTR_PRESENT_VALUE, value)
             else:
                 super().handle_cluster_request(hdr, args)
 
@@ -756,11 +891,51 @@ class XBeeCommon(CustomDevice):
                 data = str(data, encoding="latin1")
                 return (cls(data), b"")
 
-        def command(
-            self, command_id, *args, manufacturer=None, expect_reply=False, tsn=None
-        ):
-            """Handle outgoing data."""
-            data = self.BinaryString(args[0]).serialize()
+        # largest payload of a transparent serial request, longer data is
+        # split into several requests
+        max_payload: int = 84
+
+        def __init__(self, *args, **kwargs):
+            """Init."""
+            super().__init__(*args, **kwargs)
+            self._reader: Optional[asyncio.StreamReader] = None
+            self._writer: Optional[SerialStreamWriter] = None
+            self._max_buffered = 0
+            self._overflowing = False
+            # received bytes dropped because the stream reader was full
+            self.rx_dropped = 0
+
+        def open_stream(
+            self, limit: int = 2**16, high_water: int = 2**12
+        ) -> Tuple[asyncio.StreamReader, SerialStreamWriter]:
+            """Open a byte stream to the serial port of the XBee.
+
+            While the stream is open the received data is buffered in the
+            reader instead of being relayed as a receive_data event per frame.
+            The XBee can't be told to pause sending, so like a reader pausing
+            its transport, at most twice `limit` bytes are buffered: frames
+            received while the reader is full are dropped and counted in
+            rx_dropped.
+            """
+            if self._reader is not None:
+                raise RuntimeError("A serial stream is already open")
+            self._reader = asyncio.StreamReader(limit=limit)
+            self._max_buffered = 2 * limit
+            self._overflowing = False
+            self._writer = SerialStreamWriter(self, high_water)
+            return self._reader, self._writer
+
+        def close_stream(self) -> None:
+            """Close the serial stream, received data is relayed as events again."""
+            reader, writer = self._reader, self._writer
+            self._reader = self._writer = None
+            if reader is not None:
+                reader.feed_eof()
+            if writer is not None:
+                writer.close()
+
+        def send_chunk(self, data: bytes):
+            """Send data of at most max_payload bytes in a single request."""
             return self._endpoint.device.application.request(
                 self._endpoint.device,
                 XBEE_PROFILE_ID,
@@ -772,6 +947,32 @@ class XBeeCommon(CustomDevice):
                 expect_reply=False,
             )
 
+        async def command(
+            self, command_id, *args, manufacturer=None, expect_reply=False, tsn=None
+        ):
+            """Handle outgoing data."""
+            data = self.BinaryString(args[0]).serialize()
+            result = None
+            # empty data is still sent in a request
+            for offset in range(0, len(data) or 1, self.max_payload):
+                result = await self.send_chunk(data[offset : offset + self.max_payload])
+            return result
+
+        def _feed_stream(self, data: bytes) -> None:
+            """Buffer received data in the stream reader, unless it is full."""
+            # StreamReader has no public size, its buffer is a bytearray
+            if len(self._reader._buffer) + len(data) > self._max_buffered:
+                self.rx_dropped += len(data)
+                if not self._overflowing:
+                    self._overflowing = True
+                    _LOGGER.warning(
+                        "%s: serial stream buffer full, dropping received data",
+                        self._endpoint.device.ieee,
+                    )
+                return
+            self._overflowing = False
+            self._reader.feed_data(data)
+
         def handle_cluster_request(
             self,
             hdr: foundation.ZCLHeader,
@@ -783,15 +984,21 @@ class XBeeCommon(CustomDevice):
         ):
             """Handle incoming data."""
             if hdr.command_id == DATA_IN_CMD:
+                if self._reader is not None:
+                    self._feed_stream(args[0])
+                    return
                 self._endpoint.out_clusters[
                     LevelControl.cluster_id
-                ].handle_cluster_request(hdr, args[0])
+                ].handle_cluster_request(
+                    hdr, self.BinaryString(str(args[0], encoding="latin1"))
+                )
             else:
                 super().handle_cluster_request(hdr, args)
 
         attributes = {}
         client_commands = {0x0000: ("send_data", (BinaryString,), None)}
-        server_commands = {0x0000: ("receive_data", (BinaryString,), None)}
+        # received as bytes, converted to a string when relayed as an event
+        server_commands = {0x0000: ("receive_data", (Bytes,), None)}
 
     replacement = {
         ENDPOINTS: {
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Iterable, Iterator
+from typing import Any, Callable, Iterator
 
 from zigpy import types as t
 import zigpy.device
@@ -30,7 +30,7 @@ import zigpy.zdo
 from zigpy.zdo.types import NodeDescriptor
 
 from zhaquirks import (
-    Bus,
+    EventChannel,
     LocalDataCluster,
     MotionOnEvent,
     OccupancyWithReset,
@@ -106,13 +106,96 @@ ZONE_TYPE = 0x0001
 
 _LOGGER = logging.getLogger(__name__)
 
+# names of the keys of the 0xFF01 attribute reported by all models
+AQARA_ATTRIBUTE_NAMES: dict[int, str] = {
+    1: BATTERY_VOLTAGE_MV,
+    3: TEMPERATURE,
+    4: XIAOMI_ATTR_4,
+    5: XIAOMI_ATTR_5,
+    6: XIAOMI_ATTR_6,
+    10: PATH,
+}
+# Temperature sensors send temperature/humidity/pressure updates through this
+# cluster instead of the respective clusters
+_AQARA_WEATHER_ATTRIBUTE_NAMES = {
+    100: TEMPERATURE_MEASUREMENT,
+    101: HUMIDITY_MEASUREMENT,
+    102: PRESSURE_MEASUREMENT,
+}
+_AQARA_PLUG_ATTRIBUTE_NAMES = {149: CONSUMPTION, 150: VOLTAGE, 152: POWER}
+_AQARA_MOTION_ATTRIBUTE_NAMES = {101: ILLUMINANCE_MEASUREMENT}
+# model specific names of the keys of the 0xFF01 attribute
+AQARA_MODEL_ATTRIBUTE_NAMES: dict[str, dict[int, str]] = {
+    "lumi.sensor_ht": _AQARA_WEATHER_ATTRIBUTE_NAMES,
+    "lumi.sens": _AQARA_WEATHER_ATTRIBUTE_NAMES,
+    "lumi.weather": _AQARA_WEATHER_ATTRIBUTE_NAMES,
+    "lumi.airmonitor.acn01": {
+        **_AQARA_WEATHER_ATTRIBUTE_NAMES,
+        102: TVOC_MEASUREMENT,
+    },
+    "lumi.plug.maus01": _AQARA_PLUG_ATTRIBUTE_NAMES,
+    "lumi.relay.c2acn01": _AQARA_PLUG_ATTRIBUTE_NAMES,
+    "lumi.sensor_motion.aq2": {11: ILLUMINANCE_MEASUREMENT},
+    "lumi.curtain.acn002": {101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE},
+    "lumi.motion.agl02": _AQARA_MOTION_ATTRIBUTE_NAMES,
+    "lumi.motion.ac02": {
+        **_AQARA_MOTION_ATTRIBUTE_NAMES,
+        105: DETECTION_INTERVAL,
+        106: MOTION_SENSITIVITY,
+    },
+    "lumi.motion.ac01": {
+        5: POWER_OUTAGE_COUNT,
+        101: PRESENCE_DETECTED,
+        102: PRESENCE_EVENT,
+        103: MONITORING_MODE,
+        105: APPROACH_DISTANCE,
+        268: MOTION_SENSITIVITY,
+        322: PRESENCE_DETECTED,
+        323: PRESENCE_EVENT,
+        324: MONITORING_MODE,
+        326: APPROACH_DISTANCE,
+    },
+}
+# names of all keys, resolved once per model
+_AQARA_ATTRIBUTE_NAMES_BY_MODEL: dict[str, dict[int, str]] = {
+    model: {**AQARA_ATTRIBUTE_NAMES, **names}
+    for model, names in AQARA_MODEL_ATTRIBUTE_NAMES.items()
+}
+# names of the keys without a known meaning, keys are a single byte
+_AQARA_UNKNOWN_ATTRIBUTE_NAMES = tuple(f"0xff01-{key}" for key in range(256))
+
+
+def _bus_event(
+    bus: str, event: str, convert: Callable[[Any], Any] | None = None
+) -> Callable[[XiaomiCluster, Any], None]:
+    """Create the handler of a parsed attribute firing an event on a device bus."""
+
+    def handler(cluster: XiaomiCluster, value: Any) -> None:
+        if convert is not None:
+            value = convert(value)
+        getattr(cluster.endpoint.device, bus).listener_event(event, value)
+
+    return handler
+
+
+def _update_voc_level(cluster: XiaomiCluster, value: Any) -> None:
+    """Update the VOC level cluster of the endpoint."""
+    cluster.endpoint.voc_level.update_attribute(0x0000, value)
+
+
+def _update_device_temperature(cluster: XiaomiCluster, value: Any) -> None:
+    """Update the device temperature cluster of the endpoint, if any."""
+    if hasattr(cluster.endpoint, "device_temperature"):
+        cluster.endpoint.device_temperature.update_attribute(0x0000, value * 100)
+
 
 class XiaomiCustomDevice(CustomDevice):
     """Custom device representing xiaomi devices."""
 
+    battery_bus = EventChannel()
+
     def __init__(self, *args, **kwargs):
         """Init."""
-        self.battery_bus = Bus()
         if not hasattr(self, BATTERY_SIZE):
             self.battery_size = 10
         super().__init__(*args, **kwargs)
@@ -125,14 +208,33 @@ class XiaomiQuickInitDevice(XiaomiCustomDevice, QuickInitDevice):
 class XiaomiCluster(CustomCluster):
     """Xiaomi cluster implementation."""
 
+    # parsed attribute -> handler relaying its value to the other clusters
+    _attribute_handlers: dict[str, Callable[[XiaomiCluster, Any], None]] = {
+        BATTERY_VOLTAGE_MV: _bus_event("battery_bus", BATTERY_REPORTED),
+        TEMPERATURE_MEASUREMENT: _bus_event("temperature_bus", TEMPERATURE_REPORTED),
+        HUMIDITY_MEASUREMENT: _bus_event("humidity_bus", HUMIDITY_REPORTED),
+        PRESSURE_MEASUREMENT: _bus_event(
+            "pressure_bus", PRESSURE_REPORTED, lambda value: value / 100
+        ),
+        POWER: _bus_event("power_bus", POWER_REPORTED),
+        CONSUMPTION: _bus_event("consumption_bus", CONSUMPTION_REPORTED),
+        VOLTAGE: _bus_event("voltage_bus", VOLTAGE_REPORTED, lambda value: value * 0.1),
+        ILLUMINANCE_MEASUREMENT: _bus_event("illuminance_bus", ILLUMINANCE_REPORTED),
+        TVOC_MEASUREMENT: _update_voc_level,
+        TEMPERATURE: _update_device_temperature,
+        BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE: _bus_event(
+            "power_bus_percentage", "update_battery_percentage"
+        ),
+    }
+
     def _iter_parse_attr_report(
         self, data: bytes
     ) -> Iterator[tuple[foundation.Attribute, bytes]]:
         """Yield all interpretations of the first attribute in an Xiaomi report."""
 
         # Peek at the attribute report
-        attr_id, data = t.uint16_t.deserialize(data)
-        attr_type, data = t.uint8_t.deserialize(data)
+        attr_id, rest = t.uint16_t.deserialize(data)
+        attr_type, rest = t.uint8_t.deserialize(rest)
 
         if (
             attr_id
@@ -144,14 +246,11 @@ class XiaomiCluster(CustomCluster):
             or attr_type != 0x42  # "Character String"
         ):
             # Assume other attributes are reported correctly
-            data = attr_id.serialize() + attr_type.serialize() + data
-            attribute, data = foundation.Attribute.deserialize(data)
-
-            yield attribute, data
+            yield foundation.Attribute.deserialize(data)
             return
 
         # Length of the "string" can be wrong
-        val_len, data = t.uint8_t.deserialize(data)
+        val_len, data = t.uint8_t.deserialize(rest)
 
         # Try every offset. Start with 0 to pass unbroken reports through.
         for offset in (0, -1, 1):
@@ -162,7 +261,7 @@ class XiaomiCluster(CustomCluster):
 
             val, final_data = data[:fixed_len], data[fixed_len:]
             attr_val = t.LVBytes(val)
-            attr_type = 0x41  # The data type should be "Octet String"
+            attr_type = t.uint8_t(0x41)  # The data type should be "Octet String"
 
             yield foundation.Attribute(
                 attrid=attr_id,
@@ -171,21 +270,40 @@ class XiaomiCluster(CustomCluster):
 
     def _interpret_attr_reports(
         self, data: bytes
-    ) -> Iterable[tuple[foundation.Attribute]]:
-        """Yield all valid interprations of a Xiaomi attribute report."""
+    ) -> tuple[tuple[foundation.Attribute, ...] | None, int]:
+        """Interpret a Xiaomi attribute report.
 
-        if not data:
-            yield ()
-            return
+        Return the attributes of the first valid interpretation, None if there
+        is none, and the number of valid interpretations. Every interpretation
+        of an attribute leaves a suffix of the report to parse, each suffix is
+        parsed only once.
+        """
 
-        try:
-            parsed = list(self._iter_parse_attr_report(data))
-        except (KeyError, ValueError):
-            return
+        # length of the remaining data -> (first interpretation, interpretations)
+        interpretations: dict[int, tuple[tuple | None, int]] = {0: ((), 1)}
 
-        for attr, remaining_data in parsed:
-            for remaining_attrs in self._interpret_attr_reports(remaining_data):
-                yield (attr,) + remaining_attrs
+        def interpret(data: bytes) -> tuple[tuple | None, int]:
+            if len(data) in interpretations:
+                return interpretations[len(data)]
+
+            first, count = None, 0
+            try:
+                parsed = list(self._iter_parse_attr_report(data))
+            except (KeyError, ValueError):
+                parsed = []
+
+            for attr, remaining_data in parsed:
+                remaining_attrs, remaining_count = interpret(remaining_data)
+                if remaining_attrs is None:
+                    continue
+                if first is None:
+                    first = (attr,) + remaining_attrs
+                count += remaining_count
+
+            interpretations[len(data)] = first, count
+            return first, count
+
+        return interpret(data)
 
     def deserialize(self, data):
         """Deserialize cluster data."""
@@ -198,20 +316,26 @@ class XiaomiCluster(CustomCluster):
         ):
             return super().deserialize(hdr.serialize() + data)
 
-        reports = list(self._interpret_attr_reports(data))
+        attributes, count = self._interpret_attr_reports(data)
 
-        if not reports:
+        if attributes is None:
             _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", data)
             return super().deserialize(hdr.serialize() + data)
-        elif len(reports) > 1:
+        elif count > 1:
             _LOGGER.warning(
-                "Xiaomi attribute report has multiple valid interpretations: %r",
-                reports,
+                "Xiaomi attribute report has %d valid interpretations, using %r",
+                count,
+                attributes,
             )
 
-        fixed_data = b"".join(attr.serialize() for attr in reports[0])
+        command = foundation.GENERAL_COMMANDS[
+            foundation.GeneralCommand.Report_Attributes
+        ]
+        hdr.frame_control.is_reply = command.is_reply
+        response = command.schema(attribute_reports=list(attributes))
+        self.debug("Decoded ZCL frame: %s:%r", type(self).__name__, response)
 
-        return super().deserialize(hdr.serialize() + fixed_data)
+        return hdr, response
 
     def _update_attribute(self, attrid, value):
         if attrid in (XIAOMI_AQARA_ATTRIBUTE, XIAOMI_AQARA_ATTRIBUTE_E1):
@@ -251,122 +375,26 @@ class XiaomiCluster(CustomCluster):
             attrid,
             attributes,
         )
-        if BATTERY_VOLTAGE_MV in attributes:
-            self.endpoint.device.battery_bus.listener_event(
-                BATTERY_REPORTED, attributes[BATTERY_VOLTAGE_MV]
-            )
-
-        if TEMPERATURE_MEASUREMENT in attributes:
-            self.endpoint.device.temperature_bus.listener_event(
-                TEMPERATURE_REPORTED, attributes[TEMPERATURE_MEASUREMENT]
-            )
-        if HUMIDITY_MEASUREMENT in attributes:
-            self.endpoint.device.humidity_bus.listener_event(
-                HUMIDITY_REPORTED, attributes[HUMIDITY_MEASUREMENT]
-            )
-        if PRESSURE_MEASUREMENT in attributes:
-            self.endpoint.device.pressure_bus.listener_event(
-                PRESSURE_REPORTED, attributes[PRESSURE_MEASUREMENT] / 100
-            )
-        if POWER in attributes:
-            self.endpoint.device.power_bus.listener_event(
-                POWER_REPORTED, attributes[POWER]
-            )
-        if CONSUMPTION in attributes:
-            self.endpoint.device.consumption_bus.listener_event(
-                CONSUMPTION_REPORTED, attributes[CONSUMPTION]
-            )
-        if VOLTAGE in attributes:
-            self.endpoint.device.voltage_bus.listener_event(
-                VOLTAGE_REPORTED, attributes[VOLTAGE] * 0.1
-            )
-        if ILLUMINANCE_MEASUREMENT in attributes:
-            self.endpoint.device.illuminance_bus.listener_event(
-                ILLUMINANCE_REPORTED, attributes[ILLUMINANCE_MEASUREMENT]
-            )
-        if TVOC_MEASUREMENT in attributes:
-            self.endpoint.voc_level.update_attribute(
-                0x0000, attributes[TVOC_MEASUREMENT]
-            )
-        if TEMPERATURE in attributes:
-            if hasattr(self.endpoint, "device_temperature"):
-                self.endpoint.device_temperature.update_attribute(
-                    0x0000, attributes[TEMPERATURE] * 100
-                )
-        if BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE in attributes:
-            self.endpoint.device.power_bus_percentage.listener_event(
-                "update_battery_percentage",
-                attributes[BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE],
-            )
+        for name, value in attributes.items():
+            handler = self._attribute_handlers.get(name)
+            if handler is not None:
+                handler(self, value)
 
     def _parse_aqara_attributes(self, value):
         """Parse non standard attributes."""
+        attribute_names = _AQARA_ATTRIBUTE_NAMES_BY_MODEL.get(
+            self.endpoint.device.model, AQARA_ATTRIBUTE_NAMES
+        )
         attributes = {}
-        attribute_names = {
-            1: BATTERY_VOLTAGE_MV,
-            3: TEMPERATURE,
-            4: XIAOMI_ATTR_4,
-            5: XIAOMI_ATTR_5,
-            6: XIAOMI_ATTR_6,
-            10: PATH,
-        }
-
-        if self.endpoint.device.model in [
-            "lumi.sensor_ht",
-            "lumi.sens",
-            "lumi.weather",
-            "lumi.airmonitor.acn01",
-        ]:
-            # Temperature sensors send temperature/humidity/pressure updates through this
-            # cluster instead of the respective clusters
-            attribute_names.update(
-                {
-                    100: TEMPERATURE_MEASUREMENT,
-                    101: HUMIDITY_MEASUREMENT,
-                    102: TVOC_MEASUREMENT
-                    if self.endpoint.device.model == "lumi.airmonitor.acn01"
-                    else PRESSURE_MEASUREMENT,
-                }
-            )
-        elif self.endpoint.device.model in [
-            "lumi.plug.maus01",
-            "lumi.relay.c2acn01",
-        ]:
-            attribute_names.update({149: CONSUMPTION, 150: VOLTAGE, 152: POWER})
-        elif self.endpoint.device.model == "lumi.sensor_motion.aq2":
-            attribute_names.update({11: ILLUMINANCE_MEASUREMENT})
-        elif self.endpoint.device.model == "lumi.curtain.acn002":
-            attribute_names.update({101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE})
-        elif self.endpoint.device.model in ["lumi.motion.agl02", "lumi.motion.ac02"]:
-            attribute_names.update({101: ILLUMINANCE_MEASUREMENT})
-            if self.endpoint.device.model == "lumi.motion.ac02":
-                attribute_names.update({105: DETECTION_INTERVAL})
-                attribute_names.update({106: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.ac01":
-            attribute_names.update({5: POWER_OUTAGE_COUNT})
-            attribute_names.update({101: PRESENCE_DETECTED})
-            attribute_names.update({102: PRESENCE_EVENT})
-            attribute_names.update({103: MONITORING_MODE})
-            attribute_names.update({105: APPROACH_DISTANCE})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-            attribute_names.update({322: PRESENCE_DETECTED})
-            attribute_names.update({323: PRESENCE_EVENT})
-            attribute_names.update({324: MONITORING_MODE})
-            attribute_names.update({326: APPROACH_DISTANCE})
-        result = {}
 
         # Some attribute reports end with a stray null byte
         while value not in (b"", b"\x00"):
-            skey = int(value[0])
+            skey = value[0]
             svalue, value = foundation.TypeValue.deserialize(value[1:])
-            result[skey] = svalue.value
-        for item, val in result.items():
-            key = (
-                attribute_names[item]
-                if item in attribute_names
-                else "0xff01-" + str(item)
-            )
-            attributes[key] = val
+            key = attribute_names.get(skey)
+            if key is None:
+                key = _AQARA_UNKNOWN_ATTRIBUTE_NAMES[skey]
+            attributes[key] = svalue.value
 
         return attributes
 
@@ -16,7 +16,7 @@ from zigpy.zcl.clusters.general import (
     Time,
 )
 
-from zhaquirks import Bus, EventableCluster
+from zhaquirks import EventableCluster, EventChannel
 from zhaquirks.const import (
     ARGS,
     ATTRIBUTE_ID,
@@ -54,6 +54,8 @@ ATTRIBUTE_PRESENT_VALUE = "present_value"
 class CtrlLn(XiaomiCustomDevice):
     """Aqara double key switch device."""
 
+    power_bus = EventChannel()
+
     class BasicClusterDecoupled(BasicCluster):
         """Adds attributes for decoupled mode."""
 
@@ -71,11 +73,6 @@ class CtrlLn(XiaomiCustomDevice):
     class WallSwitchMultistateInputCluster(EventableCluster, MultistateInput):
         """WallSwitchMultistateInputCluster: fire events corresponding to press type."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.power_bus = Bus()
-        super().__init__(*args, **kwargs)
-
     signature = {
         MODELS_INFO: [(LUMI, "lumi.ctrl_ln1.aq1"), (LUMI, "lumi.ctrl_ln2.aq1")],
         ENDPOINTS: {
@@ -9,7 +9,7 @@ from zigpy.quirks import CustomDevice
 import zigpy.types as types
 from zigpy.zcl.clusters.general import Basic, Identify, Ota, PowerConfiguration
 
-from zhaquirks import Bus, LocalDataCluster
+from zhaquirks import EventChannel, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -102,13 +102,14 @@ class LocalMotionCluster(MotionCluster):
 class LumiMotionAC02(CustomDevice):
     """Lumi lumi.motion.ac02 (RTCGQ14LM) custom device implementation."""
 
+    battery_bus = EventChannel()
+    illuminance_bus = EventChannel()
+    motion_bus = EventChannel()
+
     def __init__(self, *args, **kwargs):
         """Init."""
         self.battery_size = 11
         self.battery_quantity = 2
-        self.battery_bus = Bus()
-        self.illuminance_bus = Bus()
-        self.motion_bus = Bus()
         super().__init__(*args, **kwargs)
 
     signature = {
@@ -3,7 +3,7 @@ from zigpy.profiles import zha
 from zigpy.zcl.clusters.general import Identify, Ota
 from zigpy.zcl.clusters.measurement import OccupancySensing
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -40,11 +40,12 @@ class XiaomiManufacturerCluster(XiaomiAqaraE1Cluster):
 class MotionT1(XiaomiCustomDevice):
     """Xiaomi motion sensor device."""
 
+    motion_bus = EventChannel()
+    illuminance_bus = EventChannel()
+
     def __init__(self, *args, **kwargs):
         """Init."""
         self.battery_size = 11
-        self.motion_bus = Bus()
-        self.illuminance_bus = Bus()
         super().__init__(*args, **kwargs)
 
     signature = {
@@ -5,7 +5,7 @@ from zigpy.zcl.clusters.general import Basic, Identify, Ota, PowerConfiguration
 from zigpy.zcl.clusters.measurement import OccupancySensing
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -34,11 +34,12 @@ XIAOMI_CLUSTER_ID = 0xFFFF
 class MotionAQ2(XiaomiQuickInitDevice):
     """Custom device representing aqara body sensors."""
 
+    motion_bus = EventChannel()
+    illuminance_bus = EventChannel()
+
     def __init__(self, *args, **kwargs):
         """Init."""
         self.battery_size = 9
-        self.motion_bus = Bus()
-        self.illuminance_bus = Bus()
         super().__init__(*args, **kwargs)
 
     signature = {
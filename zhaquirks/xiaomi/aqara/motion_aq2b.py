@@ -4,7 +4,7 @@ from zigpy.profiles import zha
 from zigpy.zcl.clusters.general import Basic, Ota
 from zigpy.zcl.clusters.measurement import OccupancySensing
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -30,11 +30,12 @@ XIAOMI_CLUSTER_ID = 0xFFFF
 class MotionAQ2(XiaomiCustomDevice):
     """Custom device representing aqara body sensors."""
 
+    motion_bus = EventChannel()
+    illuminance_bus = EventChannel()
+
     def __init__(self, *args, **kwargs):
         """Init."""
         self.battery_size = 9
-        self.motion_bus = Bus()
-        self.illuminance_bus = Bus()
         super().__init__(*args, **kwargs)
 
     signature = {
@@ -1,5 +1,6 @@
 """Xiaomi aqara opple remote devices."""
 import logging
+from typing import Optional
 
 from zigpy.profiles import zha
 import zigpy.types as types
@@ -13,7 +14,7 @@ from zigpy.zcl.clusters.general import (
 from zigpy.zcl.clusters.lighting import Color
 from zigpy.zdo.types import NodeDescriptor
 
-from zhaquirks import CustomCluster, PowerConfigurationCluster
+from zhaquirks import CustomCluster, MultiPressDetector, PowerConfigurationCluster
 from zhaquirks.const import (
     ALT_DOUBLE_PRESS,
     ALT_LONG_PRESS,
@@ -54,6 +55,7 @@ from zhaquirks.const import (
 from zhaquirks.xiaomi import LUMI, BasicCluster, XiaomiCustomDevice
 
 PRESS_TYPES = {0: "hold", 1: "single", 2: "double", 3: "triple", 255: "release"}
+MULTI_PRESS_TYPES = {1: "single", 2: "double", 3: "triple"}
 STATUS_TYPE_ATTR = 0x0055  # decimal = 85
 
 COMMAND_1_SINGLE = "1_single"
@@ -102,11 +104,19 @@ class MultistateInputCluster(CustomCluster, MultistateInput):
     """Multistate input cluster."""
 
     cluster_id = MultistateInput.cluster_id
+    # derive double and triple presses from single presses when set, for
+    # remotes reporting every press as a single press
+    multi_press_threshold: Optional[float] = None
 
     def __init__(self, *args, **kwargs):
         """Init."""
         self._current_state = None
         super().__init__(*args, **kwargs)
+        self.multi_press = None
+        if self.multi_press_threshold is not None:
+            self.multi_press = MultiPressDetector(
+                self._send_press_event, MULTI_PRESS_TYPES, self.multi_press_threshold
+            )
 
     async def configure_reporting(
         self,
@@ -118,20 +128,27 @@ class MultistateInputCluster(CustomCluster, MultistateInput):
     ):
         """Configure reporting."""
 
+    def _send_press_event(self, button, press_type, value):
+        self._current_state = press_type
+        event_args = {
+            BUTTON: button,
+            PRESS_TYPE: press_type,
+            ATTR_ID: STATUS_TYPE_ATTR,
+            VALUE: value,
+        }
+        action = "{}_{}".format(button, press_type)
+        self.listener_event(ZHA_SEND_EVENT, action, event_args)
+        # show something in the sensor in HA
+        super()._update_attribute(0, action)
+
     def _update_attribute(self, attrid, value):
         super()._update_attribute(attrid, value)
         if attrid == STATUS_TYPE_ATTR:
-            self._current_state = PRESS_TYPES.get(value)
-            event_args = {
-                BUTTON: self.endpoint.endpoint_id,
-                PRESS_TYPE: self._current_state,
-                ATTR_ID: attrid,
-                VALUE: value,
-            }
-            action = "{}_{}".format(self.endpoint.endpoint_id, self._current_state)
-            self.listener_event(ZHA_SEND_EVENT, action, event_args)
-            # show something in the sensor in HA
-            super()._update_attribute(0, action)
+            press_type = PRESS_TYPES.get(value)
+            if self.multi_press is not None and press_type == "single":
+                self.multi_press.press(self.endpoint.endpoint_id, value)
+            else:
+                self._send_press_event(self.endpoint.endpoint_id, press_type, value)
 
 
 class OppleCluster(CustomCluster):
@@ -16,7 +16,7 @@ from zigpy.zcl.clusters.general import (
     Time,
 )
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -40,12 +40,9 @@ _LOGGER = logging.getLogger(__name__)
 class Plug(XiaomiCustomDevice):
     """lumi.plug plug."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.voltage_bus = Bus()
-        self.consumption_bus = Bus()
-        self.power_bus = Bus()
-        super().__init__(*args, **kwargs)
+    voltage_bus = EventChannel()
+    consumption_bus = EventChannel()
+    power_bus = EventChannel()
 
     signature = {
         MODELS_INFO: [(LUMI, "lumi.plug")],
@@ -19,7 +19,7 @@ from zigpy.zcl.clusters.general import (
 from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 from zigpy.zcl.clusters.smartenergy import Metering
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -48,12 +48,9 @@ OPPLE_MFG_CODE = 0x115F
 class Plug(XiaomiCustomDevice):
     """lumi.plug.mmeu01 plug."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.voltage_bus = Bus()
-        self.consumption_bus = Bus()
-        self.power_bus = Bus()
-        super().__init__(*args, **kwargs)
+    voltage_bus = EventChannel()
+    consumption_bus = EventChannel()
+    power_bus = EventChannel()
 
     signature = {
         MODELS_INFO: [
@@ -17,7 +17,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -42,12 +42,9 @@ _LOGGER = logging.getLogger(__name__)
 class Relay(XiaomiCustomDevice):
     """lumi.relay.c2acn01 relay."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.voltage_bus = Bus()
-        self.consumption_bus = Bus()
-        self.power_bus = Bus()
-        super().__init__(*args, **kwargs)
+    voltage_bus = EventChannel()
+    consumption_bus = EventChannel()
+    power_bus = EventChannel()
 
     signature = {
         MODELS_INFO: [(LUMI, "lumi.relay.c2acn01")],
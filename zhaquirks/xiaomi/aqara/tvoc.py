@@ -8,7 +8,7 @@ from zigpy.zcl.clusters.measurement import RelativeHumidity, TemperatureMeasurem
 from zigpy.zcl.clusters.security import IasZone
 from zigpy.zdo.types import NodeDescriptor
 
-from zhaquirks import Bus, LocalDataCluster, PowerConfigurationCluster
+from zhaquirks import EventChannel, LocalDataCluster, PowerConfigurationCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -69,11 +69,8 @@ class EmulatedTVOCMeasurement(LocalDataCluster):
 class TVOCMonitor(XiaomiCustomDevice):
     """Aqara LUMI lumi.airmonitor.acn01."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.temperature_bus = Bus()
-        self.humidity_bus = Bus()
-        super().__init__(*args, **kwargs)
+    temperature_bus = EventChannel()
+    humidity_bus = EventChannel()
 
     signature = {
         # <SimpleDescriptor endpoint=1 profile=260 device_type=770
@@ -125,11 +122,8 @@ class TVOCMonitor(XiaomiCustomDevice):
 class TVOCMonitor2(XiaomiCustomDevice):
     """Aqara LUMI lumi.airmonitor.acn01."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.temperature_bus = Bus()
-        self.humidity_bus = Bus()
-        super().__init__(*args, **kwargs)
+    temperature_bus = EventChannel()
+    humidity_bus = EventChannel()
 
     signature = {
         # <SimpleDescriptor endpoint=1 profile=260 device_type=1026
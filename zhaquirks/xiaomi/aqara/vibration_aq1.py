@@ -16,7 +16,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.security import IasZone
 
-from zhaquirks import Bus, LocalDataCluster, MotionOnEvent
+from zhaquirks import EventChannel, LocalDataCluster, MotionOnEvent
 from zhaquirks.const import (
     CLUSTER_ID,
     COMMAND,
@@ -69,12 +69,9 @@ _LOGGER = logging.getLogger(__name__)
 class VibrationAQ1(XiaomiQuickInitDevice):
     """Xiaomi aqara smart motion sensor device."""
 
-    manufacturer_id_override = 0x115F
+    motion_bus = EventChannel()
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.motion_bus = Bus()
-        super().__init__(*args, **kwargs)
+    manufacturer_id_override = 0x115F
 
     class VibrationBasicCluster(BasicCluster):
         """Vibration cluster."""
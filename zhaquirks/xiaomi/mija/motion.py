@@ -12,7 +12,7 @@ from zigpy.zcl.clusters.general import (
     Scenes,
 )
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -40,10 +40,11 @@ _LOGGER = logging.getLogger(__name__)
 class Motion(XiaomiQuickInitDevice):
     """Custom device representing mija body sensors."""
 
+    motion_bus = EventChannel()
+
     def __init__(self, *args, **kwargs):
         """Init."""
         self.battery_size = 9
-        self.motion_bus = Bus()
         super().__init__(*args, **kwargs)
 
     signature = {
@@ -11,7 +11,7 @@ from zigpy.zcl.clusters.general import (
     Scenes,
 )
 
-from zhaquirks import Bus
+from zhaquirks import EventChannel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -41,11 +41,8 @@ _LOGGER = logging.getLogger(__name__)
 class Weather(XiaomiCustomDevice):
     """Xiaomi mija weather sensor device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.temperature_bus = Bus()
-        self.humidity_bus = Bus()
-        super().__init__(*args, **kwargs)
+    temperature_bus = EventChannel()
+    humidity_bus = EventChannel()
 
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=24321